@@ -0,0 +1,70 @@
+"""Per-keystroke cost of abbreviation expansion: the old regex lookup against the trie.
+
+Simulates typing a description one character at a time and runs the expansion
+check after every character, like the <KeyRelease> handler of the prompt does.
+
+Usage:
+    python benchmarks/bench_abbreviations.py
+"""
+
+import random
+import re
+import string
+import timeit
+
+from aw_watcher_afk_prompt.abbreviations import AbbreviationTrie
+
+ABBR_REGEX = r"(['\w]+)\s$"
+
+
+def regex_expand(text: str, cursor: int, abbreviations: dict[str, str]) -> tuple[int, int, str] | None:
+    """The expansion as done before the trie: two regex passes over the text and a dict lookup."""
+    abbr = re.search(ABBR_REGEX, text[:cursor])
+    if abbr and abbr.group(1) in abbreviations:
+        before_index = len(re.sub(ABBR_REGEX, "", text[:cursor]))
+        return before_index, cursor - 1, abbreviations[abbr.group(1)]
+    return None
+
+
+def trie_expand(text: str, cursor: int, trie: AbbreviationTrie) -> tuple[int, int, str] | None:
+    # The entry only asks the trie when the key typed was a whitespace character.
+    if not text[cursor - 1].isspace():
+        return None
+    return trie.match(text, cursor)
+
+
+def make_abbreviations(count: int) -> dict[str, str]:
+    rng = random.Random(42)
+    abbreviations = {}
+    while len(abbreviations) < count:
+        key = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 5)))
+        abbreviations[key] = " ".join("".join(rng.choices(string.ascii_lowercase, k=6)) for _ in range(3))
+    return abbreviations
+
+
+def typing_cost(expand, text: str, lookup, repeat: int = 20) -> float:
+    """Microseconds per keystroke to check every prefix of text."""
+
+    def type_text():
+        for cursor in range(1, len(text) + 1):
+            expand(text, cursor, lookup)
+
+    seconds = min(timeit.repeat(type_text, number=1, repeat=repeat))
+    return seconds / len(text) * 1e6
+
+
+def main() -> None:
+    print(f"{'abbreviations':>13}  {'text length':>11}  {'regex µs/key':>12}  {'trie µs/key':>11}  {'speedup':>7}")
+    for count in (10, 500, 5000):
+        abbreviations = make_abbreviations(count)
+        trie = AbbreviationTrie(abbreviations)
+        sample = list(abbreviations)[:5]
+        for words in (10, 60):
+            text = " ".join((sample + ["meeting", "with", "the", "team", "about"]) * (words // 10)) + " "
+            regex = typing_cost(regex_expand, text, abbreviations)
+            fast = typing_cost(trie_expand, text, trie)
+            print(f"{count:>13}  {len(text):>11}  {regex:>12.2f}  {fast:>11.2f}  {regex / fast:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Cost of a reverse search (Ctrl-R) through a large history.
+
+Fills a HistoryIndex with random messages, one per hour for a few years, and
+times word-prefix searches of increasing selectivity, as typed into the prompt.
+
+Usage:
+    python benchmarks/bench_history.py
+"""
+
+import datetime
+import random
+import string
+import tempfile
+import timeit
+from pathlib import Path
+
+from aw_watcher_afk_prompt.history import HistoryIndex
+
+NOW = datetime.datetime(2025, 1, 15, 12, 0, tzinfo=datetime.UTC)
+
+
+def make_index(path: Path, messages: int) -> tuple[HistoryIndex, list[str]]:
+    rng = random.Random(0)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8))) for _ in range(2000)]
+    index = HistoryIndex(path)
+    index.add_many((" ".join(rng.choices(words, k=rng.randint(1, 4))), NOW - datetime.timedelta(hours=i))
+                   for i in range(messages))
+    return index, words
+
+
+def main() -> None:
+    print(f"{'messages':>8}  {'query':>12}  {'matches':>7}  {'ms/search':>9}")
+    for messages in (2000, 20000):
+        with tempfile.TemporaryDirectory() as directory:
+            index, words = make_index(Path(directory) / "history.sqlite3", messages)
+            for query in ["a", "ab", words[0], f"{words[1][:2]} {words[2][:2]}"]:
+                seconds = min(timeit.repeat(lambda query=query: index.search(query), number=20, repeat=5)) / 20
+                print(f"{messages:>8}  {query:>12}  {len(index.search(query)):>7}  {seconds * 1e3:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Cost of predicting the answer that pre-fills the prompt.
+
+Builds a PredictionModel from a year of varied answers, ten hours a day, and
+times predict() for an absence, as done every time the prompt opens.
+
+Usage:
+    python benchmarks/bench_prediction.py
+"""
+
+import atexit
+import datetime
+import logging
+import tempfile
+import timeit
+from pathlib import Path
+
+import aw_core
+
+from aw_watcher_afk_prompt.prediction import PredictionModel
+from aw_watcher_afk_prompt.utils import LOCAL_TIMEZONE
+
+MONDAY = datetime.datetime(2025, 1, 13, tzinfo=LOCAL_TIMEZONE)
+BUCKET = "aw-watcher-afk-prompt_host"
+
+
+def at(day: int, hour: int, minute: int = 0) -> datetime.datetime:
+    return MONDAY + datetime.timedelta(days=day, hours=hour, minutes=minute)
+
+
+class FakeClient:
+    """Just enough of aw-server for PredictionModel.sync(): events in [start, end], newest first."""
+
+    def __init__(self, events: list[aw_core.Event]):
+        self.events = sorted(events, key=lambda e: e.timestamp, reverse=True)
+
+    def get_events(self, bucket_id, limit=-1, start=None, end=None):
+        found = [e for e in self.events if (start is None or e.timestamp + e.duration >= start) and e.timestamp <= end]
+        return found if limit < 0 else found[:limit]
+
+
+def make_model(path: Path, days: int, distinct: int) -> PredictionModel:
+    events = [
+        aw_core.Event(timestamp=at(day, hour, 15 * k), duration=datetime.timedelta(minutes=5 + (day + k) % 90),
+                      data={"status": "afk", "message": f"task {(day * 31 + hour * 7 + k * 13) % distinct}"})
+        for day in range(days) for hour in range(8, 18) for k in range(4)
+    ]
+    model = PredictionModel(path)
+    model.sync(FakeClient(events), BUCKET, now=at(days + 1, 0))
+    return model
+
+
+def main() -> None:
+    logging.getLogger("aw_watcher_afk_prompt").setLevel(logging.WARNING)
+    print(f"{'days':>4}  {'answers':>7}  {'µs/predict':>10}")
+    for days, distinct in ((30, 50), (365, 500)):
+        with tempfile.TemporaryDirectory() as directory:
+            model = make_model(Path(directory) / "prediction.json", days, distinct)
+            predict = lambda: model.predict(at(days + 1, 12), datetime.timedelta(minutes=40))  # noqa: E731
+            seconds = min(timeit.repeat(predict, number=100, repeat=5)) / 100
+            print(f"{days:>4}  {len(model.messages):>7}  {seconds * 1e6:>10.1f}")
+            atexit.unregister(model.flush)  # the directory is gone by then
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Cost of an edit in the split dialog: the old list recalculation against the Timeline.
+
+Every duration change used to rebuild the whole list of ActivityLine objects
+with TimeCalculator and check it with SplitActivityData.validate(). The dialog
+now changes two durations of a Timeline, materializes only the lines from the
+first changed one on, and checks the invariants it keeps count of.
+
+Usage:
+    python benchmarks/bench_split.py
+"""
+
+import timeit
+from datetime import UTC, datetime, timedelta
+
+from aw_watcher_afk_prompt.split_model import SplitActivityData, TimeCalculator, Timeline
+
+START = datetime(2025, 1, 15, 9, 0, tzinfo=UTC)
+
+
+def list_edit(activities, duration_seconds: float, index: int, minutes: int):
+    """An edit as done before the Timeline: recalculate the list and validate all of it."""
+    activities = TimeCalculator.adjust_duration(activities, index, minutes,
+                                                original_end=START + timedelta(seconds=duration_seconds))
+    SplitActivityData(START, duration_seconds, activities).validate()
+    return activities
+
+
+def timeline_edit(timeline: Timeline, index: int, minutes: int) -> None:
+    """An edit as the dialog does it now, including the lines it has to redisplay."""
+    first = timeline.set_duration(index, minutes)
+    timeline.activities(first)
+    timeline.validate()
+
+
+def edit_cost(lines: int, index: int, repeat: int = 5, number: int = 20) -> tuple[float, float]:
+    """Microseconds per edit of the line at index, for both models."""
+    duration_seconds = lines * 10 * 60
+    activities = TimeCalculator.split_equal(START, duration_seconds, lines)
+    timeline = Timeline.split_equal(START, duration_seconds, lines)
+
+    def edit_list():
+        nonlocal activities
+        for minutes in (11, 10):
+            activities = list_edit(activities, duration_seconds, index, minutes)
+
+    def edit_timeline():
+        for minutes in (11, 10):
+            timeline_edit(timeline, index, minutes)
+
+    old = min(timeit.repeat(edit_list, number=number, repeat=repeat)) / (2 * number) * 1e6
+    new = min(timeit.repeat(edit_timeline, number=number, repeat=repeat)) / (2 * number) * 1e6
+    return old, new
+
+
+def main() -> None:
+    print(f"{'lines':>5}  {'edited':>6}  {'list µs/edit':>12}  {'timeline µs/edit':>16}  {'speedup':>7}")
+    for lines in (2, 20, 100, 1000):
+        for index, where in ((0, "first"), (lines - 2, "last")):
+            old, new = edit_cost(lines, index)
+            print(f"{lines:>5}  {where:>6}  {old:>12.1f}  {new:>16.1f}  {old / new:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,130 @@
 # ruff: noqa: EM101, EM102
 import argparse
 import time
-from collections.abc import Iterable
-from tkinter import messagebox
+from collections.abc import Sequence
+from contextlib import ExitStack
 
 import aw_core
 from aw_client.client import ActivityWatchClient
 from aw_core.log import setup_logging
 from requests.exceptions import ConnectionError
 
-import aw_watcher_afk_prompt.dialog as aw_dialog
+from aw_watcher_afk_prompt.calendars import CalendarIndex, split_by_meetings
+from aw_watcher_afk_prompt.calls import CallDetector
+from aw_watcher_afk_prompt.classify import Classifier
 from aw_watcher_afk_prompt.config import load_config
+from aw_watcher_afk_prompt.context import CONTEXT_TITLES, WindowContextProvider
 from aw_watcher_afk_prompt.core import (
-    DATA_KEY,
     WATCHER_NAME,
     AWAfkPromptClient,
     AWAfkPromptError,
     logger,
 )
+from aw_watcher_afk_prompt.daemon import (
+    Endpoint,
+    EndpointPoller,
+    PendingPrompt,
+    connect_endpoints,
+    endpoints_from_config,
+)
+from aw_watcher_afk_prompt.history import HistoryIndex
+from aw_watcher_afk_prompt.prediction import PredictionModel
+from aw_watcher_afk_prompt.rules import RuleEngine
+from aw_watcher_afk_prompt.sources import AfkSource, default_sources, source_from_config
+from aw_watcher_afk_prompt.split_model import TimeCalculator
+from aw_watcher_afk_prompt.suggestions import SuggestionIndex
 from aw_watcher_afk_prompt.utils import format_duration, format_time_local
 
 
-def prompt(event: aw_core.Event, recent_events: Iterable[aw_core.Event]) -> str | None:
+def prompt(event: aw_core.Event, suggestions: SuggestionIndex, title: str = "AFK Checkin",
+           parts: Sequence[aw_core.Event] = (), search_index: HistoryIndex | None = None,
+           prediction: PredictionModel | None = None, calendar: CalendarIndex | None = None,
+           context: WindowContextProvider | None = None) -> str | None:
+    # Imported here so that the headless modes (like --list-gaps) never load Tk
+    import aw_watcher_afk_prompt.dialog as aw_dialog
+
     # TODO: Allow for customizing the prompt from the prompt interface.
     start_time_str = format_time_local(event.timestamp)
     end_time_str = format_time_local(event.timestamp + event.duration)
     prompt_text = f"What were you doing from {start_time_str} - {end_time_str} ({format_duration(event.duration)})?"
-    title = "AFK Checkin"
+
+    # Fetched while the dialog opens, it fills them in when they arrive
+    window_context = context.fetch_async(event.timestamp, event.timestamp + event.duration) if context else None
+    predictions = prediction.predict(event.timestamp, event.duration) if prediction else []
+
+    # Several AFK periods asked about together: offer a split at the real boundaries
+    split_activities = None
+    returns = [part.timestamp for part in parts[1:]]
+    if len(parts) > 1:
+        prompt_text += f"\n(You were away {len(parts)} times, use Split to describe them separately.)"
+        split_activities = TimeCalculator.split_at(event.timestamp, event.duration.total_seconds(), returns)
+
+    # Meetings in the calendar: split at their boundaries, named after them
+    meetings = calendar.meetings(event.timestamp, event.timestamp + event.duration) if calendar else []
+    if meetings:
+        lines = split_by_meetings(event.timestamp, event.duration.total_seconds(), meetings, returns)
+        if len(lines) > 1:
+            if len(parts) <= 1:
+                prompt_text += f"\n(Your calendar had {len(meetings)} meeting(s) then, use Split to log them.)"
+            split_activities = lines
+        elif lines[0].description:
+            predictions = [lines[0].description, *(p for p in predictions if p != lines[0].description)]
 
     # Pass afk_start and afk_duration_seconds to enable Split button
     return aw_dialog.ask_string(
         title,
         prompt_text,
-        [event.data.get(DATA_KEY, "") for event in recent_events],
+        suggestions.history(),
         afk_start=event.timestamp,
-        afk_duration_seconds=event.duration.total_seconds()
+        afk_duration_seconds=event.duration.total_seconds(),
+        split_activities=split_activities,
+        suggestions=suggestions,
+        search_index=search_index,
+        predictions=predictions,
+        context=window_context,
+    )
+
+
+def prompt_and_post(state: AWAfkPromptClient, event: aw_core.Event, title: str = "AFK Checkin",
+                    parts: Sequence[aw_core.Event] = (), calendar: CalendarIndex | None = None,
+                    context: WindowContextProvider | None = None) -> None:
+    """Ask the user about a gap (or several merged gaps) and post the answer."""
+    response = prompt(event, state.state.suggestions, title, parts, search_index=state.state.history,
+                      prediction=state.state.prediction, calendar=calendar, context=context)
+    if response is None:
+        # User cancelled
+        return
+    elif isinstance(response, tuple) and response[0] == "SPLIT_MODE":
+        # User used split mode
+        activities = response[1]
+        logger.info(f"Posting {len(activities)} split activities")
+        state.post_split_events(event, activities)
+    else:
+        # Normal single-entry mode
+        logger.info(response)
+        state.post_event(event, response)
+
+
+def review_and_post(backfill: list[PendingPrompt]) -> None:
+    """Let the user answer all backfilled gaps in one dialog, then post the answers per server."""
+    import aw_watcher_afk_prompt.dialog as aw_dialog
+
+    history = backfill[0].state.state.suggestions.history()
+    answers = aw_dialog.ask_backfill_review(
+        f"Backfill: {len(backfill)} unfilled AFK periods",
+        [pending.event for pending in backfill],
+        history,
+        format_time_local,
     )
+    if answers is None:
+        # User cancelled, the gaps will be found again on the next backfill
+        return
+    states = {id(pending.event): pending.state for pending in backfill}
+    by_state: dict[AWAfkPromptClient, list] = {}
+    for event, answer in answers:
+        by_state.setdefault(states[id(event)], []).append((event, answer))
+    for state, state_answers in by_state.items():
+        state.post_answers(state_answers)
 
 
 def parse_date(date_str: str):
@@ -59,18 +148,92 @@ def parse_date(date_str: str):
     return start, end
 
 
+def sources_from_config(config: dict) -> list[AfkSource]:
+    """The AFK input sources configured in the config file."""
+    return default_sources(
+        config.get("enable_lid_events", True),
+        extra=[source_from_config(entry) for entry in config.get("sources", [])],
+        multi_host=config.get("multi_host", False),
+    )
+
+
+def calendar_from_config(config: dict) -> CalendarIndex | None:
+    """The calendar files configured in the config file, parsed in the background."""
+    paths = config.get("calendar")
+    if not paths:
+        return None
+    calendar = CalendarIndex([paths] if isinstance(paths, str) else paths)
+    # Large calendars must not delay startup or prompts; meetings() answers from what is parsed so far
+    calendar.start()
+    return calendar
+
+
+def list_gaps(args: argparse.Namespace, config: dict) -> None:
+    """Print the unfilled AFK gaps of a date range, without any dialogs."""
+    from aw_watcher_afk_prompt.backfill import BackfillEngine
+    from aw_watcher_afk_prompt.core import resolve_source_buckets
+    from aw_watcher_afk_prompt.report import DAY_WINDOW, format_rows
+    from aw_watcher_afk_prompt.report import list_gaps as find_unfilled_gaps
+
+    date_from = args.date_from or "today"
+    start, _ = parse_date(date_from)
+    _, end = parse_date(args.date_to or date_from)
+    if end <= start:
+        raise ValueError(f"--to ({args.date_to}) is before --from ({date_from}).")
+
+    client = ActivityWatchClient(client_name=WATCHER_NAME + "_list", testing=args.testing)
+    with client:
+        engine = BackfillEngine(
+            client,
+            bucket_id=f"{WATCHER_NAME}_{client.client_hostname}",
+            source_buckets=resolve_source_buckets(sources_from_config(config), client.get_buckets()),
+            window=DAY_WINDOW,
+        )
+        rows = find_unfilled_gaps(engine, start, end, durration_thresh=args.length * 60)
+    print(format_rows(rows, args.format))  # noqa: T201
+
+
+def retag(args: argparse.Namespace, config: dict) -> None:
+    """Re-apply the [[categories]] of the config to the entries already posted."""
+    from aw_watcher_afk_prompt.edit import retag as retag_events
+
+    classifier = Classifier.from_config(config)
+    if classifier is None:
+        raise AWAfkPromptError("No [[categories]] in the config file, nothing to tag with.")
+    start = parse_date(args.date_from)[0] if args.date_from else None
+    end = parse_date(args.date_to)[1] if args.date_to else None
+    if start is not None and end is not None and end <= start:
+        raise ValueError(f"--to ({args.date_to}) is before --from ({args.date_from}).")
+
+    client = ActivityWatchClient(client_name=WATCHER_NAME + "_retag", testing=args.testing)
+    with client:
+        retag_events(client, f"{WATCHER_NAME}_{client.client_hostname}", classifier, start, end,
+                     progress=lambda read, updated: logger.info(f"Read {read} entries, updated {updated}"))
+
+
 def get_state_retries(client: ActivityWatchClient, enable_lid_events: bool = True,
-                      history_limit: int = 100) -> AWAfkPromptClient:
+                      history_limit: int = 100, sources: list[AfkSource] | None = None,
+                      store_namespace: str | None = None,
+                      cache_window_minutes: float = 1440,
+                      calls: CallDetector | None = None,
+                      rules: RuleEngine | None = None,
+                      classifier: Classifier | None = None) -> AWAfkPromptClient:
     """When the computer is starting up sometimes the aw-server is not ready for requests yet.
 
     So we sit and retry for a while before giving up.
     """
+    history = HistoryIndex(namespace=store_namespace)
+    prediction = PredictionModel(namespace=store_namespace)
     for _ in range(10):
         try:
             # This works because the constructor of AWAfkPromptState tries to get bucket names.
             # If it didn't we'd need to do something else here.
             return AWAfkPromptClient(client, enable_lid_events=enable_lid_events,
-                                   history_limit=history_limit)
+                                   history_limit=history_limit, sources=sources,
+                                   store_namespace=store_namespace,
+                                   cache_window_minutes=cache_window_minutes,
+                                   history=history, prediction=prediction, calls=calls,
+                                   rules=rules, classifier=classifier)
         except ConnectionError:
             logger.exception("Cannot connect to client.")
             time.sleep(10)  # 10 * 10 = wait for 100s before giving up.
@@ -100,6 +263,13 @@ def main() -> None:
         default=config.get("length", 5),
         help="The number of minutes you need to be away before reporting on it. (default: from config or 5)",
     )
+    parser.add_argument(
+        "--merge-distance",
+        type=float,
+        default=config.get("merge_distance", 0),
+        help="Ask about AFK periods separated by at most this many minutes of activity in one prompt;"
+        " prompts then wait this long after you return. (default: from config or 0, off)",
+    )
     parser.add_argument("--testing", action="store_true", help="Run in testing mode.")
     parser.add_argument("--verbose", action="store_true", help="I want to see EVERYTHING!")
     parser.add_argument(
@@ -142,6 +312,38 @@ def main() -> None:
         default="today",
         help="Date to edit entries for (default: today). Format: YYYY-MM-DD or 'today', 'yesterday'.",
     )
+    parser.add_argument(
+        "--list-gaps",
+        action="store_true",
+        help="Print the unfilled AFK periods of a date range and exit, without any dialogs.",
+    )
+    parser.add_argument(
+        "--from",
+        dest="date_from",
+        type=str,
+        default=None,
+        help="First day for --list-gaps (default: today) and --retag (default: the first entry)."
+        " Format: YYYY-MM-DD or 'today', 'yesterday'.",
+    )
+    parser.add_argument(
+        "--to",
+        dest="date_to",
+        type=str,
+        default=None,
+        help="Last day (inclusive) for --list-gaps, --edit and --retag"
+        " (default: same as --from or --edit-date, now for --retag).",
+    )
+    parser.add_argument(
+        "--retag",
+        action="store_true",
+        help="Re-apply the [[categories]] of the config to the posted entries (all, or --from/--to) and exit.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["table", "json", "csv"],
+        default="table",
+        help="Output format for --list-gaps (default: table).",
+    )
     args = parser.parse_args()
 
     # Set up logging
@@ -153,6 +355,24 @@ def main() -> None:
         log_file=True,
     )
 
+    # List gaps mode - print unfilled AFK periods and exit
+    if args.list_gaps:
+        try:
+            list_gaps(args, config)
+        except (ValueError, AWAfkPromptError) as e:
+            logger.error(str(e))
+            raise SystemExit(1) from e
+        return
+
+    # Retag mode - re-apply the category rules to the posted entries and exit
+    if args.retag:
+        try:
+            retag(args, config)
+        except (ValueError, AWAfkPromptError) as e:
+            logger.error(str(e))
+            raise SystemExit(1) from e
+        return
+
     # Test dialog mode - show dialog immediately for UI testing
     if args.test_dialog:
         from datetime import UTC, datetime, timedelta
@@ -196,19 +416,18 @@ def main() -> None:
 
     # Edit mode - review and edit past entries
     if args.edit:
-        from datetime import UTC, datetime
-
-        import aw_transform
-
         from aw_watcher_afk_prompt.dialog import ask_batch_edit
+        from aw_watcher_afk_prompt.edit import apply_changes, compute_changes, fetch_events
 
         try:
-            start_date, end_date = parse_date(args.edit_date)
+            start_date, _ = parse_date(args.edit_date)
+            _, end_date = parse_date(args.date_to or args.edit_date)
         except ValueError as e:
             logger.error(str(e))
             return
+        period = f"{args.edit_date} to {args.date_to}" if args.date_to else args.edit_date
 
-        logger.info(f"Edit mode: reviewing entries from {args.edit_date}")
+        logger.info(f"Edit mode: reviewing entries from {period}")
 
         try:
             client = ActivityWatchClient(
@@ -217,35 +436,31 @@ def main() -> None:
             with client:
                 bucket_id = f"{WATCHER_NAME}_{client.client_hostname}"
 
-                # Fetch events for the date range
-                events = client.get_events(bucket_id, limit=1000, start=start_date, end=end_date)
-                events = aw_transform.sort_by_timestamp(events)
+                # Fetch all events for the date range, page by page
+                events = fetch_events(client, bucket_id, start_date, end_date)
 
                 if not events:
-                    logger.info(f"No entries found for {args.edit_date}")
+                    logger.info(f"No entries found for {period}")
                     return
 
                 logger.info(f"Found {len(events)} entries to review")
 
                 # Show batch edit dialog
-                title = f"Edit Entries - {args.edit_date}"
+                title = f"Edit Entries - {period}"
                 result = ask_batch_edit(title, events, format_time_local)
 
                 if result is None:
                     logger.info("Edit cancelled")
                     return
 
-                # Process changes
-                edited_count = 0
-                for event, new_value in result:
-                    current_msg = event.data.get(DATA_KEY, "")
-                    if new_value != current_msg:
-                        event.data[DATA_KEY] = new_value
-                        client.insert_event(bucket_id, event)
-                        logger.info(f"Updated: '{current_msg}' -> '{new_value}'")
-                        edited_count += 1
-
-                logger.info(f"Edit complete: {edited_count} entries updated")
+                # Only send what changed, tagged for the new messages
+                changes = compute_changes(result, classifier=Classifier.from_config(config))
+                if not changes:
+                    logger.info("Edit complete: nothing changed")
+                    return
+                logger.info(f"Saving {len(changes)} changes ({changes.summary()})")
+                apply_changes(client, bucket_id, changes,
+                              progress=lambda done, total: logger.info(f"Saved {done}/{total} changes"))
 
         except Exception as e:
             logger.error(f"Edit mode error: {e}")
@@ -254,62 +469,70 @@ def main() -> None:
         return
 
     try:
-        client = ActivityWatchClient(  # pyright: ignore[reportPrivateImportUsage]
-            client_name=WATCHER_NAME, testing=args.testing
-        )
-        with client:
-            state = get_state_retries(
-                client,
-                enable_lid_events=config.get("enable_lid_events", True),
-                history_limit=args.history_limit
-            )
+        enable_lid_events = config.get("enable_lid_events", True)
+        sources = sources_from_config(config)
+        calendar = calendar_from_config(config)
+        calls = CallDetector.from_config(config)
+        rules = RuleEngine.from_config(config)
+        classifier = Classifier.from_config(config)
+        endpoints = endpoints_from_config(config, testing=args.testing)
+
+        with ExitStack() as stack:
+            clients = {
+                endpoint: stack.enter_context(ActivityWatchClient(  # pyright: ignore[reportPrivateImportUsage]
+                    client_name=WATCHER_NAME, testing=endpoint.testing, host=endpoint.host, port=endpoint.port
+                ))
+                for endpoint in endpoints
+            }
+            states = connect_endpoints(endpoints, lambda endpoint: get_state_retries(
+                clients[endpoint],
+                enable_lid_events=enable_lid_events,
+                history_limit=args.history_limit,
+                sources=sources,
+                store_namespace=endpoint.store_namespace,
+                cache_window_minutes=max(args.depth, args.backfill_depth if args.backfill else 0),
+                calls=calls,
+                rules=rules,
+                classifier=classifier,
+            ))
             logger.info("Successfully connected to the server.")
+            poller = EndpointPoller(states)
+            context_titles = config.get("context_titles", CONTEXT_TITLES)
+            contexts = {
+                endpoint: WindowContextProvider.for_client(state.client, context_titles)
+                for endpoint, state in states.items()
+            } if context_titles > 0 else {}
+
+            def title(endpoint: Endpoint) -> str:
+                # Only tell the servers apart when there is more than one
+                return "AFK Checkin" if len(states) == 1 else f"AFK Checkin ({endpoint.name})"
 
             # Backfill mode: on startup, prompt for old unfilled AFK periods
             if args.backfill:
                 logger.info(f"Backfill mode enabled, looking back {args.backfill_depth} minutes")
-                backfill_events = list(state.get_new_afk_events_to_note(
-                    seconds=args.backfill_depth * 60, durration_thresh=args.length * 60
-                ) or [])
+                poller.backfill(seconds=args.backfill_depth * 60, durration_thresh=args.length * 60)
                 # Sort oldest first for chronological backfill
-                backfill_events.sort(key=lambda e: e.timestamp)
-                if backfill_events:
-                    logger.info(f"Found {len(backfill_events)} unfilled AFK periods to backfill")
-                    for event in backfill_events:
-                        response = prompt(event, state.state.recent_events)
-                        if response is None:
-                            # User cancelled - skip this one
-                            continue
-                        elif isinstance(response, tuple) and response[0] == "SPLIT_MODE":
-                            activities = response[1]
-                            logger.info(f"Posting {len(activities)} split activities")
-                            state.post_split_events(event, activities)
-                        else:
-                            logger.info(response)
-                            state.post_event(event, response)
+                backfill = sorted(poller.pending(), key=lambda p: p.event.timestamp)
+                if len(backfill) == 1:
+                    logger.info("Found 1 unfilled AFK period to backfill")
+                    prompt_and_post(backfill[0].state, backfill[0].event, title(backfill[0].endpoint),
+                                    calendar=calendar, context=contexts.get(backfill[0].endpoint))
+                elif backfill:
+                    logger.info(f"Found {len(backfill)} unfilled AFK periods to backfill")
+                    review_and_post(backfill)
                 else:
                     logger.info("No unfilled AFK periods found for backfill")
 
             # Normal operation loop
             while True:
-                for event in state.get_new_afk_events_to_note(
-                    seconds=args.depth * 60, durration_thresh=args.length * 60
-                ):
-                    response = prompt(event, state.state.recent_events)
-                    if response is None:
-                        # User cancelled
-                        continue
-                    elif isinstance(response, tuple) and response[0] == "SPLIT_MODE":
-                        # User used split mode
-                        activities = response[1]
-                        logger.info(f"Posting {len(activities)} split activities")
-                        state.post_split_events(event, activities)
-                    else:
-                        # Normal single-entry mode
-                        logger.info(response)
-                        state.post_event(event, response)
+                poller.poll(seconds=args.depth * 60, durration_thresh=args.length * 60)
+                for pending in poller.pending(merge_distance=args.merge_distance * 60):
+                    prompt_and_post(pending.state, pending.event, title(pending.endpoint), pending.parts,
+                                    calendar=calendar, context=contexts.get(pending.endpoint))
                 time.sleep(args.frequency)
     except Exception as e:
+        from tkinter import messagebox
+
         messagebox.showerror("AW Watcher Ask Away: Error", f"An unhandled exception occurred: {e}")
         raise
 
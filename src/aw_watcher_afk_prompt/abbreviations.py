@@ -0,0 +1,256 @@
+"""The user's abbreviations, their expansions and the expansion engine.
+
+Kept out of dialog.py so the store can be used (and tested) without Tk. Changes
+are written to the config directory after a short delay, so a burst of edits in
+the settings pane costs one write, and every write is atomic.
+
+Expansion runs on every keystroke, so it must not depend on the length of the
+text or the number of abbreviations. The store keeps a trie of the reversed
+abbreviations, which is walked backwards from the cursor: a lookup only touches
+the characters of the abbreviation being typed.
+"""
+
+import atexit
+import bisect
+import json
+import logging
+import threading
+from collections import UserDict
+from pathlib import Path
+from typing import NamedTuple
+
+import appdirs
+
+from aw_watcher_afk_prompt.utils import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+SAVE_DELAY = 1.0
+"""Seconds to wait after the last change before writing the abbreviations file."""
+
+
+def _is_word_char(char: str) -> bool:
+    # ' counts as part of a word, so with an abbreviation "s" the "s" of "what's" is not expanded.
+    return char.isalnum() or char in "_'"
+
+
+class Expansion(NamedTuple):
+    """Replace text[start:end] by replacement."""
+
+    start: int
+    end: int
+    replacement: str
+
+
+def match_case(typed: str, expansion: str) -> str:
+    """Give the expansion the case the abbreviation was typed in.
+
+    "MTG" expands to "TEAM MEETING", "Mtg" to "Team meeting" and "mtg" to the
+    expansion as stored.
+    """
+    letters = [char for char in typed if char.isalpha()]
+    if len(letters) > 1 and all(char.isupper() for char in letters):
+        return expansion.upper()
+    if letters and letters[0].isupper():
+        return expansion[:1].upper() + expansion[1:]
+    return expansion
+
+
+class AbbreviationTrie:
+    """Finds the abbreviation typed just before the cursor.
+
+    The abbreviations are stored reversed and lowercased, so matching walks the
+    text backwards from the cursor and stops as soon as no abbreviation continues;
+    it costs O(length of the longest abbreviation), whatever the text or the number
+    of abbreviations. Abbreviations may contain spaces ("o o o" for "out of office").
+
+    Matching ignores case: an abbreviation typed in another case than it was stored
+    in is expanded with match_case(), an exact match is expanded as stored.
+    """
+
+    def __init__(self, items: dict[str, str] | None = None):
+        self._root: dict = {}
+        self._size = 0
+        for key, expansion in (items or {}).items():
+            self.add(key, expansion)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: str, expansion: str) -> None:
+        node = self._root
+        for char in reversed(key.lower()):
+            node = node.setdefault(char, {})
+        terminal = node.setdefault(None, {})
+        if key not in terminal:
+            self._size += 1
+        terminal[key] = expansion
+
+    def remove(self, key: str) -> None:
+        path = [self._root]
+        for char in reversed(key.lower()):
+            if char not in path[-1]:
+                return
+            path.append(path[-1][char])
+        terminal = path[-1].get(None, {})
+        if terminal.pop(key, None) is None:
+            return
+        self._size -= 1
+        if not terminal:
+            del path[-1][None]
+        # Prune the branches that no longer lead to an abbreviation
+        for char, parent, node in zip(key.lower(), reversed(path[:-1]), reversed(path[1:]), strict=True):
+            if node:
+                break
+            del parent[char]
+
+    def match(self, text: str, cursor: int) -> Expansion | None:
+        """The expansion of the abbreviation ending right before the cursor, if any.
+
+        Like typing in a chat client, an abbreviation is expanded when it is
+        followed by a single whitespace character (the one just typed) and is a
+        whole word: not preceded by a letter, digit, _ or '. The longest matching
+        abbreviation wins.
+
+        Args:
+            text: The text of the entry
+            cursor: The cursor position in text
+
+        Returns:
+            The text range to replace (the whitespace excluded) and its replacement
+        """
+        end = cursor - 1
+        if end < 1 or not text[end].isspace():
+            return None
+        node = self._root
+        found = None
+        i = end
+        while i > 0 and (node := node.get(text[i - 1].lower())) is not None:
+            i -= 1
+            if None in node and (i == 0 or not _is_word_char(text[i - 1])):
+                found = (i, node[None])
+        if found is None:
+            return None
+        start, candidates = found
+        typed = text[start:end]
+        if typed in candidates:
+            return Expansion(start, end, candidates[typed])
+        expansion = candidates.get(typed.lower(), next(iter(candidates.values())))
+        return Expansion(start, end, match_case(typed, expansion))
+
+
+class AbbreviationStore(UserDict[str, str]):
+    """A class to store abbreviations and their expansions.
+
+    And to manage saving this information to the config directory. The keys are
+    also kept sorted, so views can find the position of an entry without sorting
+    the whole set.
+    """
+
+    def __init__(self, config_file: Path | None = None, save_delay: float = SAVE_DELAY):
+        """
+        Args:
+            config_file: Where to keep the abbreviations (default: abbreviations.json in the config directory)
+            save_delay: Seconds to wait after the last change before saving
+        """
+        super().__init__()
+        if config_file is None:
+            config_dir = Path(appdirs.user_config_dir("aw-watcher-afk-prompt"))
+            config_dir.mkdir(parents=True, exist_ok=True)
+            config_file = config_dir / "abbreviations.json"
+        self._config_file = config_file
+        self._save_delay = save_delay
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._dirty = False
+        self.sorted_keys: list[str] = []
+        self.trie = AbbreviationTrie()
+        self._load_from_config()
+        atexit.register(self.flush)
+
+    def _load_from_config(self) -> None:
+        if self._config_file.exists():
+            with self._config_file.open() as f:
+                try:
+                    self.data.update(json.load(f))
+                except json.JSONDecodeError:
+                    logger.exception("Failed to load abbreviations from config file.")
+        self.sorted_keys = sorted(self.data)
+        self.trie = AbbreviationTrie(self.data)
+
+    def _schedule_save(self) -> None:
+        self._dirty = True
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self._save_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            data = dict(self.data)
+            self._dirty = False
+        try:
+            write_json_atomic(self._config_file, data)
+        except OSError:
+            logger.exception("Failed to save abbreviations to config file.")
+
+    def __setitem__(self, key: str, value: str) -> None:
+        with self._lock:
+            if key not in self.data:
+                bisect.insort(self.sorted_keys, key)
+            self.data[key] = value
+            self.trie.add(key, value)
+            self._schedule_save()
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            del self.data[key]
+            del self.sorted_keys[bisect.bisect_left(self.sorted_keys, key)]
+            self.trie.remove(key)
+            self._schedule_save()
+
+    def index(self, key: str) -> int:
+        """Position of the key in sorted_keys."""
+        return bisect.bisect_left(self.sorted_keys, key)
+
+    def filter(self, query: str) -> list[str]:
+        """The sorted keys whose abbreviation or expansion contains the query, ignoring case."""
+        query = query.strip().lower()
+        if not query:
+            return list(self.sorted_keys)
+        return [key for key in self.sorted_keys if query in key.lower() or query in self.data[key].lower()]
+
+    def rename(self, old: str, new: str, value: str) -> None:
+        """Replace an abbreviation by another one, with a single save."""
+        with self._lock:
+            if old in self.data:
+                del self.data[old]
+                del self.sorted_keys[bisect.bisect_left(self.sorted_keys, old)]
+                self.trie.remove(old)
+            if new not in self.data:
+                bisect.insort(self.sorted_keys, new)
+            self.data[new] = value
+            self.trie.add(new, value)
+            self._schedule_save()
+
+    def expand(self, text: str, cursor: int) -> Expansion | None:
+        """The expansion of the abbreviation typed right before the cursor, see AbbreviationTrie.match()."""
+        return self.trie.match(text, cursor)
+
+
+_store: AbbreviationStore | None = None
+
+
+def get_abbreviations() -> AbbreviationStore:
+    """The abbreviations of the user, loaded on first use and shared by all dialogs."""
+    global _store
+    if _store is None:
+        _store = AbbreviationStore()
+    return _store
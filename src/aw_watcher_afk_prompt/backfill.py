@@ -0,0 +1,169 @@
+"""Finding unanswered gaps over a long stretch of history.
+
+The live polling path looks at the newest events of each bucket, which is fine for
+the last few minutes but not for a day or a week of history. The backfill engine
+instead splits the range into time windows and fetches every (bucket, window) pair
+concurrently with explicit start/end bounds, so the whole range is covered no
+matter how many heartbeats it contains.
+"""
+
+import datetime
+import logging
+from collections.abc import Callable, Hashable
+
+import aw_core
+from aw_client.client import ActivityWatchClient
+from requests.exceptions import HTTPError
+
+from aw_watcher_afk_prompt.core import (
+    AWAfkPromptClient,
+    find_activity_gaps,
+    get_events_concurrently,
+    get_utc_now,
+    is_afk,
+)
+from aw_watcher_afk_prompt.intervals import CoverageIndex
+from aw_watcher_afk_prompt.sources import AfkSource
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = datetime.timedelta(hours=6)
+LEAD_IN_LIMIT = 20
+"""How many events before the range to fetch per bucket, to find where a gap running into the range began."""
+LEAD_IN_MAX_LIMIT = 1000
+"""The lead-in limit is doubled up to this while a bucket returns only AFK heartbeats."""
+
+
+def split_range(start: datetime.datetime, end: datetime.datetime,
+                window: datetime.timedelta) -> list[tuple[datetime.datetime, datetime.datetime]]:
+    """Split [start, end) into consecutive windows of at most the given length."""
+    windows = []
+    while start < end:
+        windows.append((start, min(start + window, end)))
+        start += window
+    return windows
+
+
+class BackfillEngine:
+    """Finds the gaps of a time range that have not been answered yet.
+
+    Windows are stitched back together before gaps are computed: an event crossing a
+    window boundary is returned for both windows and is deduplicated by bucket and
+    id, so a gap spanning several windows (or days) comes out as one gap. A lead-in
+    fetch per bucket finds the last events before the range, so a gap that started
+    before the range keeps its real start. Like the live path, the lead-in limit is
+    doubled while a bucket returns nothing but AFK heartbeats.
+    """
+
+    def __init__(self, client: ActivityWatchClient, bucket_id: str, source_buckets: dict[str, AfkSource],
+                 coverage: CoverageIndex | None = None, window: datetime.timedelta = DEFAULT_WINDOW,
+                 answer: Callable[[list[aw_core.Event], list[aw_core.Event]], list[aw_core.Event]] | None = None):
+        """
+        Args:
+            client: The ActivityWatch client
+            bucket_id: Our own bucket, holding the answers posted so far
+            source_buckets: Maps each bucket to read AFK information from to its source
+            coverage: Intervals known to be handled in addition to our bucket (optional)
+            window: Length of the time windows fetched concurrently
+            answer: Called with the unanswered gaps and the source events, answers what
+                it can (e.g. by rules) and returns the gaps left to ask about (optional)
+        """
+        self.client = client
+        self.bucket_id = bucket_id
+        self.source_buckets = source_buckets
+        self.coverage = coverage if coverage is not None else CoverageIndex()
+        self.window = window
+        self.answer = answer
+
+    @classmethod
+    def for_prompt_client(cls, prompt_client: AWAfkPromptClient,
+                          window: datetime.timedelta = DEFAULT_WINDOW) -> "BackfillEngine":
+        """Backfill with the sources, bucket, coverage and rules of a prompt client."""
+        return cls(prompt_client.client, prompt_client.bucket_id, prompt_client.source_buckets,
+                   prompt_client.state.coverage, window, answer=prompt_client.answer_by_rules)
+
+    def fetch(self, start: datetime.datetime, end: datetime.datetime) -> tuple[list[aw_core.Event], CoverageIndex]:
+        """Fetch the normalized source events and our own posted events for [start, end)."""
+        windows = split_range(start, end, self.window)
+        requests: dict[Hashable, tuple[str, dict]] = {}
+        for bucket in [*self.source_buckets, self.bucket_id]:
+            for i, (window_start, window_end) in enumerate(windows):
+                requests[bucket, i] = (bucket, {"start": window_start, "end": window_end})
+        for bucket in self.source_buckets:
+            requests[bucket, "lead-in"] = (bucket, {"end": start, "limit": LEAD_IN_LIMIT})
+        results = get_events_concurrently(self.client, requests)
+        self._extend_lead_ins(start, results)
+
+        events: dict[Hashable, aw_core.Event] = {}
+        posted: dict[Hashable, aw_core.Event] = {}
+        for (bucket, _), result in results.items():
+            if bucket == self.bucket_id:
+                if isinstance(result, Exception):
+                    raise result
+                for event in result:
+                    posted[event.id if event.id is not None else event.timestamp] = event
+                continue
+            source = self.source_buckets[bucket]
+            if isinstance(result, Exception):
+                if source.required or not isinstance(result, HTTPError):
+                    raise result
+                logger.warning(f"Failed to get {source.name} events for backfill, continuing without them")
+                continue
+            for event in result:
+                key = event.id if event.id is not None else event.timestamp
+                events[bucket, key] = source.normalize(event, bucket)
+        logger.debug(f"Backfill fetched {len(events)} source events and {len(posted)} posted events "
+                     f"in {len(windows)} windows")
+        return list(events.values()), CoverageIndex(posted.values())
+
+    def _extend_lead_ins(self, start: datetime.datetime, results: dict[Hashable, list | Exception]) -> None:
+        """Fetch the lead-ins without a non-afk event again with a doubled limit, in place."""
+        limit = LEAD_IN_LIMIT
+        buckets = list(self.source_buckets)
+        while True:
+            buckets = [bucket for bucket in buckets if self._lead_in_too_short(bucket, results[bucket, "lead-in"], limit)]
+            limit *= 2
+            if not buckets:
+                return
+            if limit > LEAD_IN_MAX_LIMIT:
+                logger.warning(f"Reached max lead-in limit ({LEAD_IN_MAX_LIMIT}) without finding gap boundaries")
+                return
+            logger.debug(f"Only AFK heartbeats before the backfill range, increasing lead-in limit to {limit}")
+            results.update(get_events_concurrently(
+                self.client, {(bucket, "lead-in"): (bucket, {"end": start, "limit": limit}) for bucket in buckets}))
+
+    def _lead_in_too_short(self, bucket: str, result: list | Exception, limit: int) -> bool:
+        if isinstance(result, Exception) or len(result) < limit:
+            return False
+        source = self.source_buckets[bucket]
+        return all(is_afk(source.normalize(event, bucket)) for event in result)
+
+    def find_gaps(self, depth: datetime.timedelta, durration_thresh: float,
+                  now: datetime.datetime | None = None) -> list[aw_core.Event]:
+        """Find the unanswered gaps ending within depth of now.
+
+        Args:
+            depth: How far back to look
+            durration_thresh: Gaps shorter than this many seconds are ignored
+            now: End of the range (default: the current time)
+
+        Returns:
+            The gaps, oldest first
+        """
+        end = now or get_utc_now()
+        return self.find_gaps_between(end - depth, end, durration_thresh)
+
+    def find_gaps_between(self, start: datetime.datetime, end: datetime.datetime,
+                          durration_thresh: float) -> list[aw_core.Event]:
+        """Find the unanswered gaps ending within [start, end), oldest first."""
+        events, posted = self.fetch(start, end)
+        gaps = [gap for gap in find_activity_gaps(events)
+                if gap.timestamp + gap.duration > start and gap.duration.total_seconds() > durration_thresh]
+
+        posted_covered = posted.covers_batch(gaps)
+        seen_covered = self.coverage.covers_batch(gaps)
+        unseen = [gap for gap, *covered in zip(gaps, posted_covered, seen_covered, strict=True) if not any(covered)]
+        logger.info(f"Backfill found {len(gaps)} gaps, {len(unseen)} not answered yet")
+        if self.answer is not None and unseen:
+            unseen = self.answer(unseen, events)
+        return unseen
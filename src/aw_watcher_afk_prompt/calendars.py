@@ -0,0 +1,470 @@
+"""Meetings from local calendar files, to pre-fill the split of an AFK period.
+
+The `calendar` config option names .ics files or directories of them (e.g. a
+vdirsyncer folder or an exported calendar). Every file is parsed once and kept
+with its modification time; later refreshes only stat the files and parse again
+the ones that changed. The meetings of all files go into an IntervalIndex, so
+finding the meetings of a gap is a binary search.
+
+Only what is needed to find meetings is read: SUMMARY, DTSTART, DTEND or
+DURATION, STATUS, RRULE (DAILY, WEEKLY, MONTHLY and YEARLY with INTERVAL,
+COUNT, UNTIL, BYDAY and WKST), EXDATE and RECURRENCE-ID. All-day and cancelled
+events are skipped. Recurring events are expanded from LOOKBACK ago up to
+HORIZON ahead, and again once that horizon is near. Occurrences keep their wall
+clock time across DST changes; floating times and unknown TZIDs are taken to be
+in the local timezone.
+"""
+
+import datetime
+import logging
+import os
+import re
+import threading
+import zoneinfo
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import aw_core
+
+from aw_watcher_afk_prompt.intervals import IntervalIndex
+from aw_watcher_afk_prompt.split_model import ActivityLine, TimeCalculator
+from aw_watcher_afk_prompt.utils import LOCAL_TIMEZONE
+
+logger = logging.getLogger(__name__)
+
+TITLE_KEY = "title"
+"""Key of the meeting title in the data of the calendar events."""
+LOOKBACK = datetime.timedelta(days=31)
+"""How far back recurring events are expanded; should cover the backfill depth."""
+HORIZON = datetime.timedelta(days=7)
+"""How far ahead recurring events are expanded."""
+CHECK_INTERVAL = 60.0
+"""Seconds between two checks for changed calendar files."""
+MAX_OCCURRENCES = 100_000
+"""Safety limit on the occurrences generated for one recurring event."""
+
+
+
+def _local_zone() -> datetime.tzinfo:
+    """The local timezone with its DST rules, or its current fixed offset if they cannot be found."""
+    key = os.environ.get("TZ", "").lstrip(":")
+    try:
+        if key:
+            return zoneinfo.ZoneInfo(key)
+        with open("/etc/localtime", "rb") as file:
+            return zoneinfo.ZoneInfo.from_file(file, key="localtime")
+    except (OSError, ValueError, zoneinfo.ZoneInfoNotFoundError):
+        # E.g. Windows, without a tz database
+        return LOCAL_TIMEZONE
+
+
+LOCAL_ZONE = _local_zone()
+"""The zone of floating times, so that their recurrences follow the local DST changes."""
+
+_WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+_DURATION = re.compile(r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?")
+
+
+def _unfold(text: str) -> Iterator[str]:
+    """The content lines of an ICS file, with folded lines joined."""
+    line = None
+    for raw in text.splitlines():
+        if raw[:1] in (" ", "\t") and line is not None:
+            line += raw[1:]
+            continue
+        if line:
+            yield line
+        line = raw
+    if line:
+        yield line
+
+
+def _parse_line(line: str) -> tuple[str, dict[str, str], str]:
+    """Split a content line into its name, parameters and value."""
+    quoted = False
+    for i, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            head, value = line[:i], line[i + 1:]
+            break
+    else:
+        return line.upper(), {}, ""
+    name, *params = head.split(";")
+    parameters = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parameters[key.upper()] = param_value.strip('"')
+    return name.upper(), parameters, value
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def _timezone(tzid: str | None) -> datetime.tzinfo:
+    if not tzid:
+        return LOCAL_ZONE
+    try:
+        return zoneinfo.ZoneInfo(tzid)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        # E.g. the Windows zone names of Outlook exports
+        return LOCAL_ZONE
+
+
+def _parse_datetime(value: str, params: dict[str, str]) -> datetime.datetime | datetime.date:
+    """A DATE-TIME (aware, floating times in the local timezone) or a DATE."""
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.datetime.strptime(value, "%Y%m%d").date()
+    if value.endswith("Z"):
+        return datetime.datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=datetime.UTC)
+    return datetime.datetime.strptime(value, "%Y%m%dT%H%M%S").replace(tzinfo=_timezone(params.get("TZID")))
+
+
+def _parse_until(value: str, start: datetime.datetime) -> datetime.datetime:
+    """The UNTIL of a recurrence rule: a UTC time, or a floating time or date in the timezone of DTSTART."""
+    value = value.strip()
+    if len(value) == 8:
+        day = datetime.datetime.strptime(value, "%Y%m%d").date()
+        return datetime.datetime.combine(day, datetime.time.max, start.tzinfo)
+    if value.endswith("Z"):
+        return datetime.datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=datetime.UTC)
+    return datetime.datetime.strptime(value, "%Y%m%dT%H%M%S").replace(tzinfo=start.tzinfo)
+
+
+def _parse_duration(value: str) -> datetime.timedelta | None:
+    match = _DURATION.fullmatch(value.strip())
+    if match is None:
+        return None
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = datetime.timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+                                  minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -duration if sign == "-" else duration
+
+
+@dataclass
+class _VEvent:
+    uid: str = ""
+    summary: str = ""
+    start: datetime.datetime | datetime.date | None = None
+    end: datetime.datetime | datetime.date | None = None
+    duration: datetime.timedelta | None = None
+    cancelled: bool = False
+    rrule: dict[str, str] | None = None
+    exdates: set[datetime.datetime] = field(default_factory=set)
+    recurrence_id: datetime.datetime | None = None
+
+    def length(self) -> datetime.timedelta:
+        if self.duration is not None:
+            return self.duration
+        if isinstance(self.end, datetime.datetime) and isinstance(self.start, datetime.datetime):
+            return self.end - self.start
+        return datetime.timedelta(0)
+
+
+def _vevents(text: str) -> Iterator[_VEvent]:
+    event = None
+    depth = 0  # Inside a VALARM or another component nested in the VEVENT
+    for line in _unfold(text):
+        name, params, value = _parse_line(line)
+        if name == "BEGIN":
+            if value.upper() == "VEVENT":
+                event, depth = _VEvent(), 0
+            elif event is not None:
+                depth += 1
+            continue
+        if name == "END":
+            if value.upper() == "VEVENT" and event is not None:
+                yield event
+                event = None
+            elif event is not None:
+                depth -= 1
+            continue
+        if event is None or depth:
+            continue
+        try:
+            if name == "UID":
+                event.uid = value
+            elif name == "SUMMARY":
+                event.summary = _unescape(value).strip()
+            elif name == "DTSTART":
+                event.start = _parse_datetime(value, params)
+            elif name == "DTEND":
+                event.end = _parse_datetime(value, params)
+            elif name == "DURATION":
+                event.duration = _parse_duration(value)
+            elif name == "STATUS":
+                event.cancelled = value.upper() == "CANCELLED"
+            elif name == "RRULE":
+                event.rrule = dict(part.partition("=")[::2] for part in value.upper().split(";") if part)
+            elif name == "EXDATE":
+                event.exdates.update(d for d in (_parse_datetime(v, params) for v in value.split(","))
+                                     if isinstance(d, datetime.datetime))
+            elif name == "RECURRENCE-ID":
+                recurrence_id = _parse_datetime(value, params)
+                if isinstance(recurrence_id, datetime.datetime):
+                    event.recurrence_id = recurrence_id
+        except ValueError as e:
+            logger.debug(f"Skipping calendar property {name}:{value}: {e}")
+
+
+def _add_months(day: datetime.date, months: int) -> datetime.date | None:
+    """The same day of the month, months later, or None if that month is too short."""
+    month = day.month - 1 + months
+    try:
+        return day.replace(year=day.year + month // 12, month=month % 12 + 1)
+    except ValueError:
+        return None
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> datetime.date | None:
+    """The n-th (or -n-th from the end) weekday of a month."""
+    first = datetime.date(year, month, 1)
+    if n > 0:
+        day = first + datetime.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    else:
+        last = (_add_months(first, 1) or first) - datetime.timedelta(days=1)
+        day = last - datetime.timedelta(days=(last.weekday() - weekday) % 7 + 7 * (-n - 1))
+    return day if day.month == month else None
+
+
+def _occurrence_days(start: datetime.date, rule: dict[str, str]) -> Iterator[datetime.date] | None:
+    """The days of a recurrence rule, in order, or None if the rule is not supported."""
+    frequency = rule.get("FREQ")
+    interval = int(rule.get("INTERVAL", "1"))
+    by_day = [(int(d[:-2] or 0), _WEEKDAYS[d[-2:]]) for d in rule.get("BYDAY", "").split(",") if d]
+    week_start = _WEEKDAYS.get(rule.get("WKST", "MO"))
+    if set(rule) - {"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYDAY", "WKST"} or interval < 1 or week_start is None:
+        return None
+
+    def generate() -> Iterator[datetime.date]:
+        for period in range(MAX_OCCURRENCES):
+            if frequency == "DAILY":
+                yield start + datetime.timedelta(days=period * interval)
+            elif frequency == "WEEKLY":
+                # Weeks begin on WKST, which decides the weeks INTERVAL skips
+                week = (start - datetime.timedelta(days=(start.weekday() - week_start) % 7)
+                        + datetime.timedelta(weeks=period * interval))
+                offsets = {(weekday - week_start) % 7 for _, weekday in by_day} or {(start.weekday() - week_start) % 7}
+                for offset in sorted(offsets):
+                    day = week + datetime.timedelta(days=offset)
+                    if day >= start:
+                        yield day
+            elif frequency == "MONTHLY":
+                month = _add_months(start.replace(day=1), period * interval)
+                if not by_day:
+                    day = _add_months(start, period * interval)
+                    if day is not None:
+                        yield day
+                    continue
+                days = [_nth_weekday(month.year, month.month, weekday, n) for n, weekday in by_day if n]
+                for day in sorted(day for day in days if day is not None and day >= start):
+                    yield day
+            elif frequency == "YEARLY":
+                day = _add_months(start, 12 * period * interval)
+                if day is not None:
+                    yield day
+
+    if frequency not in ("DAILY", "WEEKLY", "MONTHLY", "YEARLY"):
+        return None
+    if frequency in ("DAILY", "YEARLY") and by_day:
+        return None
+    if frequency == "MONTHLY" and by_day and not all(n for n, _ in by_day):
+        return None
+    return generate()
+
+
+def _expand(vevent: _VEvent, since: datetime.datetime, until: datetime.datetime,
+            overridden: set[datetime.datetime]) -> Iterator[datetime.datetime]:
+    """The start times of an event; for a recurring event those overlapping [since, until)."""
+    start = vevent.start
+    length = vevent.length()
+    days = _occurrence_days(start.date(), vevent.rrule) if vevent.rrule else None
+    if days is None:
+        if vevent.rrule:
+            logger.debug(f"Unsupported recurrence rule of {vevent.summary!r}, using its first occurrence only")
+        yield start
+        return
+    count = int(vevent.rrule.get("COUNT", "0")) or None
+    try:
+        rule_until = _parse_until(vevent.rrule["UNTIL"], start) if "UNTIL" in vevent.rrule else None
+    except ValueError:
+        logger.debug(f"Invalid UNTIL in the recurrence rule of {vevent.summary!r}, using its first occurrence only")
+        yield start
+        return
+    for number, day in enumerate(days, 1):
+        occurrence = datetime.datetime.combine(day, start.timetz())
+        if occurrence >= until or (rule_until is not None and occurrence > rule_until):
+            return
+        if occurrence + length > since and occurrence not in vevent.exdates and occurrence not in overridden:
+            yield occurrence
+        if count is not None and number >= count:
+            return
+
+
+def parse_ics(text: str, since: datetime.datetime, until: datetime.datetime) -> list[aw_core.Event]:
+    """The meetings of an ICS calendar; recurring ones only where they overlap [since, until).
+
+    Args:
+        text: The content of the .ics file
+        since: Start of the range recurring events are expanded over
+        until: End of that range
+
+    Returns:
+        One event per meeting (occurrence), with the title under TITLE_KEY, in no particular order
+    """
+    vevents = [vevent for vevent in _vevents(text) if isinstance(vevent.start, datetime.datetime)]
+    overridden: dict[str, set[datetime.datetime]] = {}
+    for vevent in vevents:
+        if vevent.recurrence_id is not None:
+            overridden.setdefault(vevent.uid, set()).add(vevent.recurrence_id)
+
+    meetings = []
+    for vevent in vevents:
+        if vevent.cancelled:
+            continue
+        length = vevent.length()
+        if length <= datetime.timedelta(0):
+            continue
+        exceptions = overridden.get(vevent.uid, set()) if vevent.recurrence_id is None else set()
+        for start in _expand(vevent, since, until, exceptions):
+            meetings.append(aw_core.Event(timestamp=start.astimezone(datetime.UTC), duration=length,
+                                          data={TITLE_KEY: vevent.summary}))
+    return meetings
+
+
+class CalendarIndex:
+    """The meetings of a set of .ics files and directories, indexed by time.
+
+    refresh() only parses the files that changed since the last call. start()
+    runs it in a background thread every check_interval seconds; meetings() is
+    called on the prompt path, so it never touches the files and answers from
+    the last complete refresh.
+    """
+
+    def __init__(self, paths: Iterable[Path | str], check_interval: float = CHECK_INTERVAL):
+        """
+        Args:
+            paths: .ics files, or directories searched for them recursively
+            check_interval: Seconds between two background checks for changed files
+        """
+        self.paths = [Path(path).expanduser() for path in paths]
+        self.check_interval = check_interval
+        self._files: dict[Path, tuple[tuple[int, int], list[aw_core.Event]]] = {}
+        self._index = IntervalIndex()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._since = self._until = datetime.datetime.min.replace(tzinfo=datetime.UTC)
+
+    def _calendar_files(self) -> Iterator[Path]:
+        for path in self.paths:
+            if path.is_dir():
+                yield from sorted(path.rglob("*.ics"))
+            elif path.exists():
+                yield path
+
+    def refresh(self, now: datetime.datetime | None = None) -> bool:
+        """Parse the calendar files that changed, were added or removed.
+
+        Args:
+            now: The current time, for the range recurring events are expanded over
+
+        Returns:
+            Whether the meetings changed
+        """
+        now = now or datetime.datetime.now(datetime.UTC)
+        with self._lock:
+            # Once the horizon is near every file is expanded again
+            expand_all = now + HORIZON / 2 > self._until
+            if expand_all:
+                self._since, self._until = now - LOOKBACK, now + HORIZON
+            files = {}
+            changed = False
+            for path in self._calendar_files():
+                try:
+                    stat = path.stat()
+                    key = (stat.st_mtime_ns, stat.st_size)
+                    cached = self._files.get(path)
+                    if cached is not None and cached[0] == key and not expand_all:
+                        files[path] = cached
+                        continue
+                    files[path] = (key, parse_ics(path.read_text(encoding="utf-8", errors="replace"),
+                                                  self._since, self._until))
+                    changed = True
+                except OSError as e:
+                    logger.warning(f"Failed to read calendar {path}: {e}")
+            changed = changed or files.keys() != self._files.keys()
+            if changed:
+                self._files = files
+                self._index = IntervalIndex(event for _, events in files.values() for event in events)
+                logger.info(f"Calendar: {len(self._index)} meetings in {len(files)} files")
+            return changed
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh the calendars")
+            if self._stopped.wait(self.check_interval):
+                return
+
+    def start(self) -> None:
+        """Refresh in a background thread, right away and then every check_interval seconds."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="calendar-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refreshes."""
+        self._stopped.set()
+
+    def meetings(self, start: datetime.datetime, end: datetime.datetime) -> list[aw_core.Event]:
+        """The meetings overlapping [start, end), sorted by start, as of the last refresh."""
+        return self._index.overlapping(start, end)
+
+
+def split_by_meetings(start: datetime.datetime, duration_seconds: float, meetings: list[aw_core.Event],
+                      boundaries: Iterable[datetime.datetime] = ()) -> list[ActivityLine]:
+    """Split an AFK period at the starts and ends of the meetings it overlaps.
+
+    The parts covered by a meeting are described by its title (the one that
+    started last, when meetings overlap), the other parts are left empty.
+
+    Args:
+        start: Start of the AFK period
+        duration_seconds: Length of the AFK period in seconds
+        meetings: The meetings overlapping the period, from CalendarIndex.meetings()
+        boundaries: More times to split at, e.g. the returns of a merged prompt
+
+    Returns:
+        The activity lines, as TimeCalculator.split_at() makes them
+    """
+    end = start + datetime.timedelta(seconds=duration_seconds)
+    boundaries = set(boundaries)
+    times = set(boundaries)
+    for meeting in meetings:
+        times.update((meeting.timestamp, meeting.timestamp + meeting.duration))
+    # The same rule as split_at(), so that no boundary is dropped there and the descriptions stay aligned
+    starts = [start]
+    for boundary in sorted(times):
+        if boundary - starts[-1] >= datetime.timedelta(minutes=1) and end - boundary >= datetime.timedelta(minutes=1):
+            starts.append(boundary)
+
+    def title(part_start: datetime.datetime, part_end: datetime.datetime) -> str:
+        middle = part_start + (part_end - part_start) / 2
+        covering = [m for m in meetings if m.timestamp <= middle < m.timestamp + m.duration]
+        return max(covering, key=lambda m: m.timestamp).data[TITLE_KEY] if covering else ""
+
+    kept, descriptions = [], []
+    for i, part_start in enumerate(starts):
+        description = title(part_start, starts[i + 1] if i + 1 < len(starts) else end)
+        # Merge neighbouring parts of the same meeting, unless they were asked to be split
+        if descriptions and description and description == descriptions[-1] and part_start not in boundaries:
+            continue
+        kept.append(part_start)
+        descriptions.append(description)
+    return TimeCalculator.split_at(start, duration_seconds, kept[1:], descriptions)
@@ -0,0 +1,125 @@
+"""Recognizing video calls in the aw-watcher-window data.
+
+During a call one mostly listens: aw-watcher-afk reports an AFK period every
+time the keyboard and mouse are left alone for a few minutes, and each of them
+would get its own prompt. The window watcher keeps reporting the focused window
+all along, so a gap spent mostly in a window whose title or app matches one of
+the call patterns is a gap spent in a call.
+
+The patterns are compiled once, into one regular expression for the titles and
+one for the apps. This module only looks at events; fetching the window bucket
+is done by core, once per poll.
+
+Like report.py this module must not import tkinter.
+"""
+
+import datetime
+import re
+from collections.abc import Iterable
+
+import aw_core
+
+CALL_TITLES = (
+    r"Zoom Meeting",
+    r"^Meet [-–] ",
+    r"Meeting .*\| Microsoft Teams",
+    r"Huddle",
+    r"Jitsi Meet",
+    r"Webex",
+)
+"""Window titles of the common video call applications, matched case-insensitively."""
+CALL_ACTIONS = ("merge", "label", "off")
+CALL_LABEL = "call"
+CALL_SLACK = datetime.timedelta(minutes=2)
+"""Call windows at most this far apart belong to the same call, e.g. when glancing
+at another window during it. A call also counts as ongoing while its window was
+seen this recently."""
+MIN_COVERAGE = 0.5
+"""Share of a gap that must be spent in a call window for it to count as a call."""
+
+
+def _compile(patterns: Iterable[str]) -> re.Pattern[str] | None:
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    try:
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Invalid call pattern in {patterns!r}: {e}") from e
+
+
+def _end(event: aw_core.Event) -> datetime.datetime:
+    return event.timestamp + event.duration
+
+
+class CallDetector:
+    """Finds the calls in window watcher events and the gaps they cover."""
+
+    def __init__(self, titles: Iterable[str] = CALL_TITLES, apps: Iterable[str] = (),
+                 action: str = "merge", label: str = CALL_LABEL, min_coverage: float = MIN_COVERAGE):
+        """
+        Args:
+            titles: Regular expressions for the window titles of calls
+            apps: Regular expressions for the apps that are only open during calls
+            action: "merge" to ask once about all the gaps of a call when it is over,
+                "label" to post them as label without asking
+            label: The message posted for gaps in a call with the "label" action
+            min_coverage: Share of a gap that must be spent in a call
+        """
+        if action not in CALL_ACTIONS:
+            raise ValueError(f"Unknown call action {action!r}, expected one of {CALL_ACTIONS}")
+        self.titles = _compile(titles)
+        self.apps = _compile(apps)
+        self.action = action
+        self.label = label
+        self.min_coverage = min_coverage
+
+    @classmethod
+    def from_config(cls, config: dict) -> "CallDetector | None":
+        """The call detection configured in the config file, or None if it is turned off."""
+        action = config.get("call_action", "merge")
+        if action == "off":
+            return None
+        return cls(
+            titles=config.get("call_titles", CALL_TITLES),
+            apps=config.get("call_apps", ()),
+            action=action,
+            label=config.get("call_label", CALL_LABEL),
+        )
+
+    def is_call(self, event: aw_core.Event) -> bool:
+        """Whether a window event belongs to a call."""
+        if self.titles is not None and self.titles.search(event.data.get("title", "")):
+            return True
+        return self.apps is not None and bool(self.apps.search(event.data.get("app", "")))
+
+    def find_calls(self, windows: Iterable[aw_core.Event]) -> list[aw_core.Event]:
+        """The calls in window events, oldest first.
+
+        Returns:
+            One event per call, with the app and title of its first window
+        """
+        calls: list[aw_core.Event] = []
+        for event in sorted((e for e in windows if self.is_call(e)), key=lambda e: e.timestamp):
+            if calls and event.timestamp - _end(calls[-1]) <= CALL_SLACK:
+                calls[-1].duration = max(_end(calls[-1]), _end(event)) - calls[-1].timestamp
+                continue
+            calls.append(aw_core.Event(timestamp=event.timestamp, duration=event.duration,
+                                       data={"app": event.data.get("app", ""), "title": event.data.get("title", "")}))
+        return calls
+
+    def covering(self, gap: aw_core.Event, calls: Iterable[aw_core.Event]) -> aw_core.Event | None:
+        """The call a gap was spent in, or None if it was not spent in a call."""
+        if gap.duration <= datetime.timedelta(0):
+            return None
+        overlapping = [call for call in calls if call.timestamp < _end(gap) and _end(call) > gap.timestamp]
+        covered = sum((min(_end(call), _end(gap)) - max(call.timestamp, gap.timestamp) for call in overlapping),
+                      datetime.timedelta(0))
+        if covered / gap.duration < self.min_coverage:
+            return None
+        return overlapping[0]
+
+    def in_call(self, windows: Iterable[aw_core.Event], now: datetime.datetime) -> bool:
+        """Whether the newest window event is a call that is still going on."""
+        newest = max(windows, key=lambda e: e.timestamp, default=None)
+        return newest is not None and self.is_call(newest) and _end(newest) >= now - CALL_SLACK
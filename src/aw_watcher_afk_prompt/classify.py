@@ -0,0 +1,134 @@
+"""Tagging the posted answers with categories from rules in the config file.
+
+Consumers of the bucket, like timewarrior exporters, would otherwise have to
+re-classify the free-text messages every time they read them. Each
+``[[categories]]`` table of the config names a category, the messages belonging
+to it and extra tags:
+
+    [[categories]]
+    name = "meetings"
+    match = ["meeting", "^1:1", "stand-?up"]   # regular expressions
+    keywords = ["sync", "call"]               # whole words
+    tags = ["work"]
+
+Matching ignores case. Every event we post gets the name of the first matching
+category as ``category`` and the tags of all matching categories as ``tags`` in
+its data, next to the split metadata. Run ``--retag`` after changing the rules
+to re-apply them to the entries already posted.
+
+All categories are compiled into one regular expression of optional lookaheads,
+one per category, so classifying a message is a single match call however many
+categories there are. Categories with capturing groups in their patterns are
+matched on their own instead, as the combined expression would renumber the
+groups and their backreferences would point at the wrong ones.
+
+Like report.py this module must not import tkinter.
+"""
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import aw_core
+
+CATEGORY_KEY = "category"
+"""Event data field holding the category of the message."""
+TAGS_KEY = "tags"
+"""Event data field holding the tags of the message."""
+
+
+@dataclass(frozen=True)
+class Category:
+    """One category and the messages belonging to it.
+
+    Attributes:
+        name: Name of the category, stored as ``category`` and as a tag
+        patterns: Regular expressions, one of which must be found in the message
+        tags: Extra tags for the messages of this category
+    """
+
+    name: str
+    patterns: tuple[str, ...]
+    tags: tuple[str, ...] = ()
+
+
+def category_from_config(entry: dict[str, Any]) -> Category:
+    """Create a category from a ``[[categories]]`` table in the config file."""
+    try:
+        name = entry["name"]
+    except KeyError:
+        raise ValueError(f"Category config is missing the 'name' key: {entry}") from None
+    patterns = [*entry.get("match", ()), *(rf"\b{re.escape(keyword)}\b" for keyword in entry.get("keywords", ()))]
+    if not patterns:
+        raise ValueError(f"Category {name!r} needs at least one match pattern or keyword")
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Category {name!r}: invalid pattern {pattern!r}: {e}") from None
+    return Category(name=name, patterns=tuple(patterns), tags=tuple(entry.get("tags", ())))
+
+
+class Classifier:
+    """Maps messages to a category and tags."""
+
+    def __init__(self, categories: Iterable[Category]):
+        self.categories = list(categories)
+        self._separate: dict[int, list[re.Pattern]] = {}
+        """The patterns of the categories with capturing groups, by category index."""
+        combined = []
+        for i, category in enumerate(self.categories):
+            patterns = [re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in category.patterns]
+            if any(pattern.groups for pattern in patterns):
+                self._separate[i] = patterns
+            else:
+                combined.append(i)
+        # The lookahead of each category is optional, so the match always succeeds
+        # and the groups that took part tell which categories matched.
+        try:
+            self._matcher = re.compile(
+                "".join(f"(?=(?:.*?(?P<c{i}>{'|'.join(f'(?:{p})' for p in self.categories[i].patterns)}))?)"
+                        for i in combined),
+                re.IGNORECASE | re.DOTALL,
+            )
+        except re.error as e:
+            # Patterns that are fine on their own can still clash, e.g. with inline flags
+            raise ValueError(f"Cannot combine the category patterns: {e}") from None
+
+    @classmethod
+    def from_config(cls, config: dict) -> "Classifier | None":
+        """The categories of the config file, or None if there are none."""
+        categories = [category_from_config(entry) for entry in config.get("categories", [])]
+        return cls(categories) if categories else None
+
+    def classify(self, message: str) -> tuple[str | None, list[str]]:
+        """The category and tags of a message.
+
+        Returns:
+            The first matching category (None if none matches) and the sorted names
+            and tags of all matching categories
+        """
+        match = self._matcher.match(message)
+        groups = match.groupdict() if match else {}
+        matching = [category for i, category in enumerate(self.categories)
+                    if (any(pattern.search(message) for pattern in self._separate[i]) if i in self._separate
+                        else groups.get(f"c{i}") is not None)]
+        return (matching[0].name if matching else None,
+                sorted({tag for category in matching for tag in (category.name, *category.tags)}))
+
+    def apply(self, event: aw_core.Event, message: str) -> bool:
+        """Write the category and tags of a message into the data of its event.
+
+        Returns:
+            Whether the data changed
+        """
+        category, tags = self.classify(message)
+        before = (event.data.get(CATEGORY_KEY), event.data.get(TAGS_KEY))
+        if category is None:
+            event.data.pop(CATEGORY_KEY, None)
+            event.data.pop(TAGS_KEY, None)
+        else:
+            event.data[CATEGORY_KEY] = category
+            event.data[TAGS_KEY] = tags
+        return before != (event.data.get(CATEGORY_KEY), event.data.get(TAGS_KEY))
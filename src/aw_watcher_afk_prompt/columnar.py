@@ -0,0 +1,130 @@
+"""Columnar gap analysis for long histories.
+
+The streaming detector (squash_overlaps, get_gaps and CoverageIndex) works on
+aw_core.Event objects one at a time, which is fine for a poll but slow for weeks of
+history. This module does the same computations on arrays of start/end times:
+unions, gaps, coverage matches and duration filters are a few vectorized numpy
+operations. Times are integer microseconds since the epoch, so results are exact.
+
+numpy is optional (pip install aw-watcher-afk-prompt[columnar]). The callers pick
+this engine through use_columnar(), which is only true when numpy is installed and
+the input is large enough for the conversion to pay off.
+"""
+
+import datetime
+from collections.abc import Sequence
+
+import aw_core
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+COLUMNAR_THRESHOLD = 2000
+"""Number of events (or gaps plus handled intervals) from which the columnar engine is used."""
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.UTC)
+AWAY_STATUSES = ("afk", "system-afk")
+
+
+def use_columnar(size: int) -> bool:
+    """Check whether the columnar engine should handle an input of the given size."""
+    return np is not None and size >= COLUMNAR_THRESHOLD
+
+
+def to_arrays(events: Sequence[aw_core.Event]) -> tuple["np.ndarray", "np.ndarray"]:
+    """Return the (start, end) arrays of the events, in microseconds since the epoch."""
+    starts = np.rint(np.fromiter((e.timestamp.timestamp() for e in events), dtype=np.float64, count=len(events))
+                     * 1e6).astype(np.int64)
+    durations = np.rint(np.fromiter((e.duration.total_seconds() for e in events), dtype=np.float64,
+                                    count=len(events)) * 1e6).astype(np.int64)
+    return starts, starts + durations
+
+
+def to_events(starts: "np.ndarray", ends: "np.ndarray") -> list[aw_core.Event]:
+    """Turn (start, end) arrays back into events without data, like get_gaps() returns."""
+    return [
+        aw_core.Event(None, EPOCH + datetime.timedelta(microseconds=int(start)),
+                      datetime.timedelta(microseconds=int(end - start)))
+        for start, end in zip(starts.tolist(), ends.tolist(), strict=True)
+    ]
+
+
+def union(starts: "np.ndarray", ends: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+    """Merge overlapping (and touching) intervals, like squash_overlaps()."""
+    if len(starts) == 0:
+        return starts, ends
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    # A new merged interval begins wherever an interval starts after everything before it ended.
+    begins = np.concatenate(([True], starts[1:] > reach[:-1]))
+    group_starts = starts[begins]
+    last_of_group = np.concatenate((np.flatnonzero(begins)[1:] - 1, [len(starts) - 1]))
+    return group_starts, reach[last_of_group]
+
+
+def gaps(starts: "np.ndarray", ends: "np.ndarray",
+         min_duration: float = 0) -> tuple["np.ndarray", "np.ndarray"]:
+    """Return the gaps between the intervals, like get_gaps(), longer than min_duration seconds."""
+    starts, ends = union(starts, ends)
+    gap_starts, gap_ends = ends[:-1], starts[1:]
+    keep = gap_ends - gap_starts > max(min_duration * 1e6, 0)
+    return gap_starts[keep], gap_ends[keep]
+
+
+def activity_gaps(events: Sequence[aw_core.Event], min_duration: float = 0) -> list[aw_core.Event]:
+    """Gaps between the non-afk events, ignoring zero length events.
+
+    Same result as get_gaps(squash_overlaps(...)) on the filtered events.
+    """
+    active = np.fromiter(
+        (e.data["status"] not in AWAY_STATUSES and e.duration.total_seconds() > 0 for e in events),
+        dtype=bool, count=len(events),
+    )
+    starts, ends = to_arrays(events)
+    return to_events(*gaps(starts[active], ends[active], min_duration))
+
+
+def covered(gap_starts: "np.ndarray", gap_ends: "np.ndarray", handled_starts: "np.ndarray",
+            handled_ends: "np.ndarray", overlap_thresh: float = 0.95) -> "np.ndarray":
+    """For every gap, whether a handled interval overlaps it by more than overlap_thresh.
+
+    Overlap is measured against the shorter of the two, like overlaps_significantly().
+    Candidate pairs are found by binary search: a handled interval can only overlap
+    a gap if it starts before the gap ends and at most the longest handled duration
+    before the gap starts.
+    """
+    result = np.zeros(len(gap_starts), dtype=bool)
+    if len(gap_starts) == 0 or len(handled_starts) == 0:
+        return result
+    order = np.argsort(handled_starts, kind="stable")
+    handled_starts, handled_ends = handled_starts[order], handled_ends[order]
+    max_duration = int((handled_ends - handled_starts).max())
+
+    first = np.searchsorted(handled_starts, gap_starts - max_duration, side="left")
+    last = np.searchsorted(handled_starts, gap_ends, side="left")
+    counts = np.maximum(last - first, 0)
+    if counts.sum() == 0:
+        return result
+
+    # Expand to one row per (gap, candidate) pair.
+    gap_index = np.repeat(np.arange(len(gap_starts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    handled_index = np.repeat(first, counts) + offsets
+
+    overlap = (np.minimum(gap_ends[gap_index], handled_ends[handled_index])
+               - np.maximum(gap_starts[gap_index], handled_starts[handled_index]))
+    shorter = np.minimum(gap_ends[gap_index] - gap_starts[gap_index],
+                         handled_ends[handled_index] - handled_starts[handled_index])
+    match = overlap > 0
+    match[match] = overlap[match] / shorter[match] > overlap_thresh
+    result[gap_index[match]] = True
+    return result
+
+
+def covered_events(gap_events: Sequence[aw_core.Event], handled: Sequence[aw_core.Event],
+                   overlap_thresh: float = 0.95) -> list[bool]:
+    """Like CoverageIndex.covers_batch(), for event lists."""
+    return covered(*to_arrays(gap_events), *to_arrays(handled), overlap_thresh).tolist()
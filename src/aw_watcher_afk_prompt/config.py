@@ -12,6 +12,12 @@ frequency = 5.0
 # Number of minutes you need to be away before reporting on it
 length = 5.0
 
+# Number of minutes of activity between two AFK periods for them to be asked about
+# in one prompt (with a split pre-filled at the real boundaries), e.g. when you
+# came back for a moment and left again. Off (0) by default: when on, every prompt
+# waits this long after you return, in case you leave again.
+merge_distance = 0.0
+
 # Enable integration with aw-watcher-lid for lid/suspend events
 # OPTIONAL: Requires aw-watcher-lid to be installed and running
 # See: https://github.com/tobixen/aw-watcher-lid
@@ -29,6 +35,79 @@ enable_backfill = true
 # How far back (in minutes) to look for unfilled AFK periods in backfill mode
 # Default: 1440 (24 hours)
 backfill_depth = 1440
+
+# Merge the aw-watcher-afk buckets of all hosts reporting to this server
+# (e.g. a desktop and a laptop, or an old bucket left behind after a hostname change).
+# You count as active whenever any host says you are active.
+# When disabled, more than one aw-watcher-afk bucket is an error.
+multi_host = false
+
+# Watch several aw-server endpoints from one process (optional)
+# Each server gets its own state and seen events store, prompts are shown one at a time.
+# Without any [[servers]] the default server from the aw-client config is used.
+# [[servers]]
+# host = "localhost"
+# port = 5600
+# [[servers]]
+# host = "localhost"
+# port = 5666
+# testing = true
+
+# Number of windows (from aw-watcher-window) used right before and after the AFK
+# period to show in the prompt, as a reminder of what you were doing. 0 to disable.
+context_titles = 3
+
+# Calendar files (optional): an .ics file, a directory of them, or a list of both.
+# AFK periods overlapping meetings open with the split pre-filled at the meeting
+# boundaries, named after the meetings. Changed files are picked up within a minute.
+# calendar = "~/.calendars/work"
+
+# Video calls: AFK periods spent mostly in a call window (seen in aw-watcher-window)
+# are not asked about one by one. "merge" asks once about the whole call when it is
+# over, "label" posts them as `call_label` without asking, "off" asks as usual.
+call_action = "merge"
+call_label = "call"
+# Regular expressions (case-insensitive) for the window titles and apps of calls.
+# The titles default to Zoom, Google Meet, Teams meetings, Slack huddles, Jitsi and Webex.
+# call_titles = ["Zoom Meeting", "^Meet [-–] "]
+# call_apps = ["zoom.us"]
+
+# Rules answering routine AFK periods without asking (optional)
+# The answer is posted with the rule name in the event data. A period matched by
+# rules with different answers is asked about as usual. All conditions are optional:
+# after/before: time of day the period starts in (may wrap around midnight)
+# min_duration/max_duration: minutes; weekdays: ["mon", ..., "sun"]
+# source: "afk", "lid" or a [[sources]] name that reported the away time
+# previous: regular expression for the answer before the period
+# [[rules]]
+# name = "night"
+# message = "sleep"
+# after = "20:00"
+# before = "06:00"
+# min_duration = 480
+
+# Categories for the posted answers (optional)
+# Every answer matching `match` (regular expressions) or `keywords` (whole words),
+# ignoring case, is posted with `category` (the first matching one) and `tags` (the
+# names and tags of all matching ones) in its data. Run with --retag after changing
+# the categories to update the answers already posted.
+# [[categories]]
+# name = "meetings"
+# match = ["meeting", "stand-?up"]
+# keywords = ["sync", "1:1"]
+# tags = ["work"]
+
+# Additional AFK input sources (optional)
+# Each source reads the buckets whose id contains `bucket`, and treats events where
+# the `status_key` field has one of the `away` values as away time. Use
+# fetch = "window" for watchers that only post on state changes.
+# Example for a screensaver watcher:
+# [[sources]]
+# name = "screensaver"
+# bucket = "aw-watcher-screensaver"
+# status_key = "status"
+# away = ["locked"]
+# fetch = "window"
 """.strip()
 
 
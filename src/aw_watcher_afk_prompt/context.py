@@ -0,0 +1,122 @@
+"""The windows used right before and after an AFK period, as a reminder in the prompt.
+
+Only a narrow slice of the aw-watcher-window bucket is read at each edge of the
+gap, both edges at the same time, in a background thread: the dialog shows up
+right away and fills in the context when it arrives. Slices that lie entirely
+in the past cannot change any more and are cached.
+
+Like report.py this module must not import tkinter.
+"""
+
+import datetime
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import aw_core
+from aw_client.client import ActivityWatchClient
+
+from aw_watcher_afk_prompt.core import find_window_bucket, get_events_concurrently, get_utc_now
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_WINDOW = datetime.timedelta(minutes=15)
+"""How far before and after the gap to look for windows."""
+CONTEXT_TITLES = 3
+"""Windows to show on each side of the gap."""
+CACHE_SIZE = 32
+TITLE_LENGTH = 60
+"""Window titles are shortened to this many characters."""
+
+
+@dataclass(frozen=True)
+class WindowContext:
+    """The windows around a gap.
+
+    Attributes:
+        before: The last windows before the gap, oldest first
+        after: The first windows after the gap, oldest first
+    """
+
+    before: list[str] = field(default_factory=list)
+    after: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.before or self.after)
+
+
+def describe(event: aw_core.Event) -> str:
+    """'app: title' of a window event, shortened."""
+    app = event.data.get("app", "")
+    title = event.data.get("title", "")
+    if len(title) > TITLE_LENGTH:
+        title = title[:TITLE_LENGTH - 1] + "…"
+    return f"{app}: {title}" if app and title else app or title
+
+
+def _distinct(events: list[aw_core.Event]) -> list[str]:
+    """The windows in chronological order, switching back and forth between two windows shown once per switch."""
+    labels: list[str] = []
+    for event in sorted(events, key=lambda e: e.timestamp):
+        label = describe(event)
+        if label and (not labels or labels[-1] != label):
+            labels.append(label)
+    return labels
+
+
+class WindowContextProvider:
+    """Fetches the windows around gaps from one window watcher bucket."""
+
+    def __init__(self, client: ActivityWatchClient, bucket_id: str, titles: int = CONTEXT_TITLES,
+                 window: datetime.timedelta = CONTEXT_WINDOW, cache_size: int = CACHE_SIZE):
+        """
+        Args:
+            client: The ActivityWatch client
+            bucket_id: The window watcher bucket
+            titles: Windows to show on each side of the gap
+            window: How far before and after the gap to look
+            cache_size: Number of gaps to remember the context of
+        """
+        self.client = client
+        self.bucket_id = bucket_id
+        self.titles = titles
+        self.window = window
+        self._cache: OrderedDict[tuple[datetime.datetime, datetime.datetime], WindowContext] = OrderedDict()
+        self._cache_size = cache_size
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="window-context")
+
+    @classmethod
+    def for_client(cls, client: ActivityWatchClient, titles: int = CONTEXT_TITLES) -> "WindowContextProvider | None":
+        """A provider for the window watcher of the client's host, or None if there is no window watcher."""
+        bucket_id = find_window_bucket(client.get_buckets(), client.client_hostname)
+        if bucket_id is None:
+            logger.info("No window watcher bucket found, the prompt will not show the windows around the gap")
+            return None
+        return cls(client, bucket_id, titles)
+
+    def fetch(self, start: datetime.datetime, end: datetime.datetime) -> WindowContext:
+        """The windows around the gap [start, end); both edges are fetched concurrently."""
+        key = (start, end)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        results = get_events_concurrently(self.client, {
+            "before": (self.bucket_id, {"start": start - self.window, "end": start, "limit": -1}),
+            "after": (self.bucket_id, {"start": end, "end": end + self.window, "limit": -1}),
+        })
+        for result in results.values():
+            if isinstance(result, Exception):
+                raise result
+        context = WindowContext(before=_distinct(results["before"])[-self.titles:],
+                                after=_distinct(results["after"])[:self.titles])
+        # Until the slice after the gap is over, new windows can still show up in it
+        if end + self.window <= get_utc_now():
+            self._cache[key] = context
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return context
+
+    def fetch_async(self, start: datetime.datetime, end: datetime.datetime) -> Future[WindowContext]:
+        """Start fetching the windows around a gap in the background."""
+        return self._executor.submit(self.fetch, start, end)
@@ -2,13 +2,13 @@
 import datetime
 import json
 import logging
-from collections import deque
-from collections.abc import Iterable, Iterator
+from collections.abc import Hashable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from functools import cached_property
 from itertools import pairwise
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import appdirs
 import aw_core
@@ -16,18 +16,32 @@ import aw_transform
 from aw_client.client import ActivityWatchClient
 from requests.exceptions import HTTPError
 
-from aw_watcher_afk_prompt.utils import LOCAL_TIMEZONE
-
-# Import ActivityLine for split mode support
-try:
-    from aw_watcher_afk_prompt.split_dialog import ActivityLine
-except ImportError:
-    # Fallback if split_dialog not available
-    ActivityLine = None
+from aw_watcher_afk_prompt import columnar
+from aw_watcher_afk_prompt.calls import CallDetector
+from aw_watcher_afk_prompt.classify import Classifier
+from aw_watcher_afk_prompt.intervals import CoverageIndex, IntervalIndex
+from aw_watcher_afk_prompt.rules import RULE_KEY, RuleEngine
+from aw_watcher_afk_prompt.sources import (
+    AFK_WATCHER_SOURCE,
+    FETCH_WINDOW,
+    LID_WATCHER_SOURCE,
+    AfkSource,
+    default_sources,
+)
+from aw_watcher_afk_prompt.suggestions import SuggestionIndex
+from aw_watcher_afk_prompt.utils import LOCAL_TIMEZONE, write_json_atomic
+
+if TYPE_CHECKING:
+    # history.py imports this module
+    from aw_watcher_afk_prompt.history import HistoryIndex
+    from aw_watcher_afk_prompt.prediction import PredictionModel
 
 WATCHER_NAME = "aw-watcher-afk-prompt"
+ACTIVE_HOST_SLACK = datetime.timedelta(minutes=1)
+"""In multi-host mode, a host counts as active if its activity runs up to this close to the newest data."""
 DATA_KEY = "message"
 """What field in the event data to store the user's message in."""
+WINDOW_WATCHER = "aw-watcher-window"
 
 
 class AWAfkPromptError(Exception):
@@ -38,39 +52,154 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def find_source_buckets(source: AfkSource, buckets: dict[str, Any]) -> list[str]:
+    """Find the buckets belonging to a source.
+
+    Raises AWAfkPromptError if a required source has no bucket, or if several buckets
+    match a source that only allows one.
+    """
+    matching = source.find_buckets(buckets)
+    logger.debug(f"All buckets: {list(buckets.keys())}")
+    logger.debug(f"Matching {source.name} buckets: {matching}")
+    if not matching and source.required:
+        message = f"Cannot find the {source.name} bucket. {source.hint}".strip()
+        logger.error(message)
+        raise AWAfkPromptError(message)
+    if len(matching) > 1 and not source.multiple:
+        logger.error(f"Found too many {source.name} buckets: {matching}")
+        raise AWAfkPromptError(f"Found too many {source.name} buckets: {matching}.")
+    return matching
+
+
+def find_source_bucket(source: AfkSource, buckets: dict[str, Any]) -> str | None:
+    """Find the single bucket belonging to a source.
+
+    Returns None if not found and the source is optional.
+    """
+    matching = find_source_buckets(source, buckets)
+    return matching[0] if matching else None
+
+
 def find_afk_bucket(buckets: dict[str, Any]) -> str:
     # Find aw-watcher-afk bucket, excluding our own bucket and lid bucket
-    afk_buckets = [
-        bucket for bucket in buckets
-        if "aw-watcher-afk" in bucket
-        and "lid" not in bucket
-        and "afk-prompt" not in bucket  # Exclude our own bucket
-        and "ask-away" not in bucket  # Exclude old bucket name
-    ]
-    logger.debug(f"All buckets: {list(buckets.keys())}")
-    logger.debug(f"Matching AFK buckets: {afk_buckets}")
-    match afk_buckets:
-        case []:
-            logger.error("Cannot find the afk bucket. Is aw-watcher-afk running?")
-            raise AWAfkPromptError("Cannot find the afk bucket. Is aw-watcher-afk running?")
-        case [bucket]:
-            return bucket
-        case _:
-            logger.error(f"Found too many afk buckets: {afk_buckets}")
-            raise AWAfkPromptError(f"Found too many afk buckets: {afk_buckets}.")
+    return find_source_bucket(AFK_WATCHER_SOURCE, buckets)
 
 
-def find_lid_bucket(buckets: dict[str, Any]):
+def find_lid_bucket(buckets: dict[str, Any]) -> str | None:
     """Find the lid watcher bucket (aw-watcher-lid).
 
     Returns None if not found (lid watcher is optional).
     """
-    lid_buckets = [bucket for bucket in buckets if "lid" in bucket]
-    if len(lid_buckets) == 0:
-        return None
-    if len(lid_buckets) == 1:
-        return lid_buckets[0]
-    raise AWAfkPromptError(f"Found too many lid buckets: {buckets}.")
+    return find_source_bucket(LID_WATCHER_SOURCE, buckets)
+
+
+def find_window_bucket(buckets: dict[str, Any], hostname: str) -> str | None:
+    """The window watcher bucket of the host, or of any host if it has none."""
+    candidates = sorted(bucket for bucket in buckets if bucket.startswith(WINDOW_WATCHER))
+    for bucket in candidates:
+        if buckets[bucket].get("hostname") == hostname or bucket == f"{WINDOW_WATCHER}_{hostname}":
+            return bucket
+    return candidates[0] if candidates else None
+
+
+def resolve_source_buckets(sources: Iterable[AfkSource], buckets: dict[str, Any]) -> dict[str, AfkSource]:
+    """Map each bucket on the server we should read to its source.
+
+    A bucket is only claimed by the first source matching it. Optional sources
+    without a bucket are left out.
+    """
+    resolved: dict[str, AfkSource] = {}
+    for source in sources:
+        matching = find_source_buckets(source, {b: v for b, v in buckets.items() if b not in resolved})
+        if not matching:
+            logger.info(f"No bucket found for the optional {source.name} source")
+        for bucket in matching:
+            resolved[bucket] = source
+    return resolved
+
+
+def get_events_concurrently(
+    client: ActivityWatchClient, requests: dict[Hashable, tuple[str, dict[str, Any]]]
+) -> dict[Hashable, list[aw_core.Event] | Exception]:
+    """Run several get_events requests at the same time.
+
+    Args:
+        client: The ActivityWatch client
+        requests: Maps a caller chosen key to a (bucket_id, get_events keyword arguments) tuple
+
+    Returns:
+        Maps each key to the fetched events, or to the exception raised by the request
+    """
+
+    def fetch(bucket_id: str, kwargs: dict[str, Any]) -> list[aw_core.Event] | Exception:
+        try:
+            return client.get_events(bucket_id, **kwargs)
+        except Exception as e:
+            return e
+
+    if len(requests) <= 1:
+        # No point in handing a single request over to another thread.
+        return {key: fetch(bucket_id, kwargs) for key, (bucket_id, kwargs) in requests.items()}
+    futures = {key: _get_fetch_pool().submit(fetch, bucket_id, kwargs)
+               for key, (bucket_id, kwargs) in requests.items()}
+    return {key: future.result() for key, future in futures.items()}
+
+
+_fetch_pool: ThreadPoolExecutor | None = None
+
+
+def _get_fetch_pool() -> ThreadPoolExecutor:
+    global _fetch_pool
+    if _fetch_pool is None:
+        _fetch_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix=f"{WATCHER_NAME}-fetch")
+    return _fetch_pool
+
+
+class BucketCursor:
+    """Incrementally fetched events from one bucket.
+
+    The first fetch of a bucket is a regular one. After that we only ask the server
+    for events from the newest event we already have, so polling a bucket costs one
+    small request no matter how much history we keep. Heartbeats extend the newest
+    event in place on the server, which is why the cursor is its start and not its end.
+
+    Events are kept while they end after the retention start. In addition the newest
+    non-afk event before that is kept, since it marks where an ongoing gap began.
+    Buckets without afk statuses, like the window watcher, have no such boundary.
+    """
+
+    def __init__(self, bucket_id: str, keep_boundary: bool = True):
+        self.bucket_id = bucket_id
+        self.keep_boundary = keep_boundary
+        self._events: dict[Any, aw_core.Event] = {}
+
+    @property
+    def cursor(self) -> datetime.datetime | None:
+        """Start of the newest event we have, or None if nothing was fetched yet."""
+        if not self._events:
+            return None
+        return max(e.timestamp for e in self._events.values())
+
+    @staticmethod
+    def _key(event: aw_core.Event) -> Any:
+        return event.id if event.id is not None else event.timestamp
+
+    def update(self, events: Iterable[aw_core.Event]) -> None:
+        """Merge freshly fetched events, replacing older versions of the same events."""
+        for event in events:
+            self._events[self._key(event)] = event
+
+    def trim(self, retain_from: datetime.datetime) -> None:
+        """Forget events that ended before retain_from, except the last activity boundary."""
+        old = [e for e in self._events.values() if e.timestamp + e.duration < retain_from]
+        boundary = max((e for e in old if not is_afk(e)), key=lambda e: e.timestamp, default=None) \
+            if self.keep_boundary else None
+        for event in old:
+            if event is not boundary:
+                del self._events[self._key(event)]
+
+    def events(self) -> list[aw_core.Event]:
+        return aw_transform.sort_by_timestamp(list(self._events.values()))
 
 
 def is_afk(event: aw_core.Event) -> bool:
@@ -98,6 +227,30 @@ def get_gaps(events: list[aw_core.Event]) -> Iterator[aw_core.Event]:
             yield aw_core.Event(None, first_end, second.timestamp - first_end)
 
 
+def find_activity_gaps(events: list[aw_core.Event]) -> list[aw_core.Event]:
+    """Find the gaps between the non-afk events.
+
+    Large inputs are handed to the columnar engine if numpy is available.
+    """
+    if columnar.use_columnar(len(events)):
+        return columnar.activity_gaps(events)
+
+    # Filter out events that have zero length. Sometimes a zero length not-afk event is generated if you open
+    # up your computer from being suspended but don't do anything with it. This event is overwritten soon and
+    # doesn't exist in later queries. If we don't filter them out we can ask the user to fill the time in twice.
+    events = [e for e in events if e.duration.total_seconds() > 0]
+
+    # Use gaps in non-afk events instead of the afk-events themselves to handle when the computer
+    # is suspended or powered off.
+    non_afk_events = squash_overlaps([e for e in events if not is_afk(e)])
+    logger.debug(f"Non-AFK events after squash: {len(non_afk_events)}")
+    for evt in non_afk_events[-3:]:  # Last 3 events
+        start = evt.timestamp.astimezone(LOCAL_TIMEZONE).strftime("%H:%M:%S")
+        end = (evt.timestamp + evt.duration).astimezone(LOCAL_TIMEZONE).strftime("%H:%M:%S")
+        logger.debug(f"  Event: {start} - {end} ({evt.duration.total_seconds():.1f}s)")
+    return list(get_gaps(non_afk_events))
+
+
 class SeenEventsStore:
     """Persistent storage for seen events to survive restarts.
 
@@ -105,17 +258,21 @@ class SeenEventsStore:
     re-prompting for events that were already handled in previous sessions.
     """
 
-    def __init__(self, max_age_days: int = 7):
+    def __init__(self, max_age_days: int = 7, namespace: str | None = None):
         """Initialize the seen events store.
 
         Args:
             max_age_days: Events older than this will be cleaned up on load
+            namespace: Keep a separate store per namespace (e.g. per aw-server endpoint)
         """
         config_dir = Path(appdirs.user_config_dir("aw-watcher-afk-prompt"))
         config_dir.mkdir(parents=True, exist_ok=True)
-        self._store_file = config_dir / "seen_events.json"
+        filename = "seen_events.json" if namespace is None else f"seen_events_{namespace}.json"
+        self._store_file = config_dir / filename
         self._max_age_days = max_age_days
         self._seen: dict[str, dict] = {}
+        self._intervals = CoverageIndex()
+        """The seen events, parsed once on load instead of on every lookup."""
         self._load()
 
     def _load(self) -> None:
@@ -128,10 +285,11 @@ class SeenEventsStore:
                     cutoff = datetime.datetime.now(datetime.UTC) - datetime.timedelta(days=self._max_age_days)
                     for key, value in data.items():
                         try:
-                            ts = datetime.datetime.fromisoformat(value["timestamp"])
-                            if ts > cutoff:
+                            interval = self._to_event(value)
+                            if interval.timestamp > cutoff:
                                 self._seen[key] = value
-                        except (KeyError, ValueError):
+                                self._intervals.add(interval)
+                        except (KeyError, TypeError, ValueError):
                             continue
                     logger.info(f"Loaded {len(self._seen)} seen events from persistent store")
             except (json.JSONDecodeError, OSError) as e:
@@ -140,11 +298,17 @@ class SeenEventsStore:
     def _save(self) -> None:
         """Save seen events to file."""
         try:
-            with self._store_file.open("w") as f:
-                json.dump(self._seen, f, indent=2)
+            write_json_atomic(self._store_file, self._seen, indent=2)
         except OSError as e:
             logger.warning(f"Failed to save seen events: {e}")
 
+    @staticmethod
+    def _to_event(value: dict) -> aw_core.Event:
+        return aw_core.Event(
+            timestamp=datetime.datetime.fromisoformat(value["timestamp"]),
+            duration=datetime.timedelta(seconds=value["duration"]),
+        )
+
     def _make_key(self, event: aw_core.Event) -> str:
         """Create a unique key for an event based on timestamp."""
         return event.timestamp.isoformat()
@@ -156,39 +320,42 @@ class SeenEventsStore:
             "timestamp": event.timestamp.isoformat(),
             "duration": event.duration.total_seconds(),
         }
+        self._intervals.add(self._to_event(self._seen[key]))
         self._save()
 
     def has_overlap(self, event: aw_core.Event, overlap_thresh: float = 0.95) -> bool:
         """Check if we've seen an event that overlaps significantly with this one."""
-        new_start = event.timestamp
-        new_end = event.timestamp + event.duration
+        return self._intervals.covers(event, overlap_thresh)
 
-        for value in self._seen.values():
-            try:
-                seen_start = datetime.datetime.fromisoformat(value["timestamp"])
-                seen_end = seen_start + datetime.timedelta(seconds=value["duration"])
-
-                # Calculate overlap
-                overlap_start = max(seen_start, new_start)
-                overlap_end = min(seen_end, new_end)
-                overlap = (overlap_end - overlap_start).total_seconds()
-
-                if overlap <= 0:
-                    continue
-
-                # Compare against smaller duration
-                min_duration = min(event.duration.total_seconds(), value["duration"])
-                if min_duration > 0 and overlap / min_duration > overlap_thresh:
-                    return True
-            except (KeyError, ValueError):
-                continue
-
-        return False
+    def intervals(self) -> list[aw_core.Event]:
+        """Return the seen events as (timestamp, duration) events, sorted by start."""
+        return list(self._intervals)
 
 
 class AWAfkPromptClient:
     def __init__(self, client: ActivityWatchClient, enable_lid_events: bool = True,
-                 history_limit: int = 100):
+                 history_limit: int = 100, sources: list[AfkSource] | None = None,
+                 multi_host: bool = False, store_namespace: str | None = None,
+                 cache_window_minutes: float = 1440, history: "HistoryIndex | None" = None,
+                 prediction: "PredictionModel | None" = None, calls: CallDetector | None = None,
+                 rules: RuleEngine | None = None, classifier: Classifier | None = None):
+        """
+        Args:
+            client: The ActivityWatch client
+            enable_lid_events: Whether to use aw-watcher-lid (ignored if sources is given)
+            history_limit: Maximum number of events to fetch from each dynamic-limit bucket
+            sources: The AFK input sources to merge (default: afk and, if enabled, lid)
+            multi_host: Merge the afk buckets of all hosts (ignored if sources is given)
+            store_namespace: Namespace of the persistent seen events store
+            cache_window_minutes: How far back to keep our own posted events in memory,
+                should cover the backfill depth
+            history: The full-history search index, brought up to date with the bucket and
+                updated with every post
+            prediction: The model pre-filling the prompt, brought up to date like history
+            calls: Recognizes the gaps spent in video calls from the window watcher bucket
+            rules: Answers routine gaps without asking
+            classifier: Tags every posted event with the category of its message
+        """
         self.client = client
         self.bucket_id = f"{WATCHER_NAME}_{self.client.client_hostname}"
         self.enable_lid_events = enable_lid_events
@@ -200,29 +367,69 @@ class AWAfkPromptClient:
             client.create_bucket(self.bucket_id, event_type="afktask")
 
         # Initialize persistent seen events store
-        self.seen_store = SeenEventsStore()
+        self.seen_store = SeenEventsStore(namespace=store_namespace)
+
+        # Load what we have posted within the cache window, both for history display
+        # and to avoid asking again about gaps that have already been answered.
+        self.cache_window = datetime.timedelta(minutes=cache_window_minutes)
+        recent_events = IntervalIndex(
+            client.get_events(self.bucket_id, start=get_utc_now() - self.cache_window)
+        )
+        self.state = AWAfkPromptState(recent_events, self.seen_store, history, prediction)
+        for index in (history, prediction):
+            if index is None:
+                continue
+            try:
+                index.sync(client, self.bucket_id)
+            except Exception as e:
+                # The prompt works without them, it only knows less about the past
+                logger.warning(f"Failed to update {type(index).__name__}: {e}")
+
+        self.sources = sources if sources is not None else default_sources(enable_lid_events, multi_host=multi_host)
+        self.source_buckets = resolve_source_buckets(self.sources, self._all_buckets)
+        """Maps each bucket we read AFK information from to its source."""
 
-        # Load recent events for history display (still using deque for in-memory)
-        recent_events = deque(maxlen=100)
-        recent_events.extend(aw_transform.sort_by_timestamp(
-            client.get_events(self.bucket_id, limit=100)
-        ))
-        self.state = AWAfkPromptState(recent_events, self.seen_store)
+        self._cursors = {bucket: BucketCursor(bucket) for bucket in self.source_buckets}
 
-        self.afk_bucket_id = find_afk_bucket(self._all_buckets)
+        self.afk_bucket_ids = [bucket for bucket, source in self.source_buckets.items()
+                               if source.name == AFK_WATCHER_SOURCE.name]
+        if not self.afk_bucket_ids:
+            raise AWAfkPromptError(f"The sources ({', '.join(source.name for source in self.sources)}) "
+                                   f"must include the {AFK_WATCHER_SOURCE.name!r} source")
+        self.afk_bucket_id = self.afk_bucket_ids[0]
+        if len(self.afk_bucket_ids) > 1:
+            logger.info(f"Multi-host mode, merging afk buckets: {self.afk_bucket_ids}")
 
         # Check for optional lid watcher integration (aw-watcher-lid)
         # See: https://github.com/tobixen/aw-watcher-lid
-        self.lid_bucket_id = None
-        if enable_lid_events:
-            self.lid_bucket_id = find_lid_bucket(self._all_buckets)
-            if self.lid_bucket_id:
-                logger.info(f"Lid watcher detected: {self.lid_bucket_id}")
-            else:
-                logger.info("Lid watcher not found, will only use regular AFK events")
+        self.lid_bucket_id = next((bucket for bucket, source in self.source_buckets.items()
+                                   if source.name == LID_WATCHER_SOURCE.name), None)
+        if self.lid_bucket_id:
+            logger.info(f"Lid watcher detected: {self.lid_bucket_id}")
+        elif any(source.name == LID_WATCHER_SOURCE.name for source in self.sources):
+            logger.info("Lid watcher not found, will only use regular AFK events")
         else:
             logger.info("Lid watcher integration disabled in config")
 
+        for bucket, source in self.source_buckets.items():
+            if source.name not in (AFK_WATCHER_SOURCE.name, LID_WATCHER_SOURCE.name):
+                logger.info(f"Using {source.name} source: {bucket}")
+
+        self.rules = rules
+        self.calls = calls
+        self.classifier = classifier
+        self.window_bucket_id: str | None = None
+        self._window_cursor: BucketCursor | None = None
+        self._windows_from: datetime.datetime | None = None
+        self._call_gaps: dict[datetime.datetime, aw_core.Event] = {}
+        """Gaps spent in the ongoing call, by start, to ask about once the call is over."""
+        if calls is not None:
+            self.window_bucket_id = find_window_bucket(self._all_buckets, client.client_hostname)
+            if self.window_bucket_id is None:
+                logger.info("No window watcher bucket found, calls will not be detected")
+            else:
+                logger.info(f"Detecting calls in {self.window_bucket_id}")
+
     @cached_property
     def _all_buckets(self) -> dict[str, Any]:
         return self.client.get_buckets()
@@ -236,6 +443,7 @@ class AWAfkPromptClient:
             # Update event with message
             event.data[DATA_KEY] = message
             event["id"] = None  # Wipe the ID so we don't edit the AFK event
+            self._classify([event])
 
             # Post to ActivityWatch FIRST
             self.client.insert_event(self.bucket_id, event)
@@ -243,6 +451,7 @@ class AWAfkPromptClient:
 
             # Only mark as seen AFTER successful posting
             self.state.mark_event_as_seen(event)
+            self.state.trim(get_utc_now() - self.cache_window)
 
         except Exception as e:
             logger.error(f"Failed to post event: {e}")
@@ -250,6 +459,73 @@ class AWAfkPromptClient:
             # Don't mark as seen - event will be prompted again
             raise
 
+    @staticmethod
+    def _split_events(original_event: aw_core.Event, activities: list) -> list[aw_core.Event]:
+        """Create the events to post for the activities an AFK event was split into."""
+        # Generate a unique split ID based on original event timestamp
+        split_id = str(original_event.timestamp.timestamp())
+        return [
+            # Create a new event for this activity with split metadata
+            aw_core.Event(
+                timestamp=activity.start_time,
+                duration=datetime.timedelta(
+                    minutes=activity.duration_minutes,
+                    seconds=activity.duration_seconds
+                ),
+                data={
+                    DATA_KEY: activity.description,
+                    "split": True,
+                    "split_count": len(activities),
+                    "split_index": i,
+                    "split_id": split_id,
+                }
+            )
+            for i, activity in enumerate(activities)
+        ]
+
+    def _classify(self, events: list[aw_core.Event]) -> None:
+        """Write the category and tags of the messages into the events about to be posted."""
+        if self.classifier is not None:
+            for event in events:
+                self.classifier.apply(event, event.data.get(DATA_KEY, ""))
+
+    def post_answers(self, answers: list[tuple[aw_core.Event, str | list]]) -> None:
+        """Post the answers to many AFK events in one batched insert.
+
+        Only marks the events as "seen" after the whole batch was posted, so if the
+        insert fails every event will be prompted again.
+
+        Args:
+            answers: (AFK event, answer) pairs, where the answer is a description or
+                the list of ActivityLine objects from split mode
+        """
+        events = []
+        split_events = []
+        for event, answer in answers:
+            if isinstance(answer, str):
+                event.data[DATA_KEY] = answer
+                event["id"] = None  # Wipe the ID so we don't edit the AFK event
+                events.append(event)
+            else:
+                split_events.extend(self._split_events(event, answer))
+        if not events and not split_events:
+            return
+        self._classify(events + split_events)
+
+        try:
+            self.client.insert_events(self.bucket_id, events + split_events)
+        except Exception as e:
+            logger.error(f"Failed to post {len(answers)} answers: {e}")
+            logger.error("Events will be prompted again on the next iteration")
+            raise
+        logger.info(f"Successfully posted {len(answers)} answers ({len(events) + len(split_events)} events)")
+
+        for event, _ in answers:
+            self.state.mark_event_as_seen(event)
+        for event in split_events:
+            self.state.record_posted(event)
+        self.state.trim(get_utc_now() - self.cache_window)
+
     def post_split_events(self, original_event: aw_core.Event, activities: list):
         """Post multiple events from split mode with error handling.
 
@@ -257,36 +533,17 @@ class AWAfkPromptClient:
             original_event: The original AFK event that was split
             activities: List of ActivityLine objects from split mode
         """
-        if ActivityLine is None:
-            logger.error("ActivityLine not available, cannot post split events")
-            return
-
         posted_count = 0
         failed_count = 0
+        posted_events = []
 
-        # Generate a unique split ID based on original event timestamp
-        split_id = str(original_event.timestamp.timestamp())
-
-        for i, activity in enumerate(activities):
+        split_events = self._split_events(original_event, activities)
+        self._classify(split_events)
+        for i, (activity, event) in enumerate(zip(activities, split_events, strict=True)):
             try:
-                # Create a new event for this activity with split metadata
-                event = aw_core.Event(
-                    timestamp=activity.start_time,
-                    duration=datetime.timedelta(
-                        minutes=activity.duration_minutes,
-                        seconds=activity.duration_seconds
-                    ),
-                    data={
-                        DATA_KEY: activity.description,
-                        "split": True,
-                        "split_count": len(activities),
-                        "split_index": i,
-                        "split_id": split_id,
-                    }
-                )
-
                 # Post to ActivityWatch
                 self.client.insert_event(self.bucket_id, event)
+                posted_events.append(event)
                 logger.info(f"Posted activity {i+1}/{len(activities)}: '{activity.description}' "
                           f"({activity.duration_minutes}m {activity.duration_seconds}s)")
                 posted_count += 1
@@ -299,39 +556,77 @@ class AWAfkPromptClient:
         # Only mark original event as seen if ALL activities were posted successfully
         if failed_count == 0:
             self.state.mark_event_as_seen(original_event)
+            for event in posted_events:
+                self.state.record_posted(event)
+            self.state.trim(get_utc_now() - self.cache_window)
             logger.info(f"Successfully posted all {posted_count} split activities")
         else:
             logger.warning(f"Posted {posted_count}/{len(activities)} activities, "
                          f"{failed_count} failed. Event will be prompted again.")
             # Don't mark as seen - user will be prompted again
 
-    def _fetch_events_with_dynamic_limit(self, initial_limit: int = 10, max_limit: int = 1000):
-        """Fetch events with dynamic limit scaling.
+    def _fetch_events_with_dynamic_limit(self, initial_limit: int = 10, max_limit: int = 1000,
+                                         window_start: datetime.datetime | None = None):
+        """Fetch events from all sources with dynamic limit scaling.
 
         If we only get AFK heartbeats without any non-afk events to mark the
         boundary, we need more events to detect the gap properly. This method
         automatically doubles the limit until we find at least one non-afk event
         or hit the max limit.
 
+        All buckets are fetched concurrently. Every bucket has a BucketCursor, so once
+        a bucket has been fetched only the events since the previous poll are
+        downloaded. Sources using the window fetch strategy start out with the events
+        from window_start, the others start out with dynamic limit scaling: buckets
+        fetched by limit are fetched again with the larger limit until a boundary is
+        found, and only the next poll continues from their cursor.
+
         Returns:
-            Tuple of (all_events, limit_used)
+            Tuple of (all_events, limit_used), where all_events are normalized to
+            afk/not-afk events and sorted by timestamp
         """
         limit = initial_limit
+        first_round = True
+        limited: set[str] = set()
+        """Buckets fetched by limit in this call, to fetch again with the doubled limit."""
 
         while limit <= max_limit:
-            # Fetch AFK events
-            afk_events = self.client.get_events(self.afk_bucket_id, limit=limit)
-
-            # Fetch lid events if enabled
-            lid_events = []
-            if self.lid_bucket_id:
-                try:
-                    lid_events = self.client.get_events(self.lid_bucket_id, limit=limit)
-                except HTTPError:
-                    logger.warning("Failed to get lid events, continuing with AFK events only")
+            requests = {}
+            for bucket, source in self.source_buckets.items():
+                cursor = self._cursors[bucket]
+                if bucket in limited:
+                    requests[bucket] = (bucket, {"limit": limit})
+                elif not first_round:
+                    continue
+                elif cursor.cursor is not None:
+                    requests[bucket] = (bucket, {"start": cursor.cursor})
+                elif source.fetch == FETCH_WINDOW:
+                    requests[bucket] = (bucket, {"start": window_start})
+                else:
+                    requests[bucket] = (bucket, {"limit": limit})
+                    limited.add(bucket)
+            results = get_events_concurrently(self.client, requests)
+
+            exhausted = True
+            for bucket, result in results.items():
+                source = self.source_buckets[bucket]
+                if isinstance(result, Exception):
+                    if source.required or not isinstance(result, HTTPError):
+                        raise result
+                    logger.warning(f"Failed to get {source.name} events, continuing without them")
+                    continue
+                if requests[bucket][1].get("limit") == limit and len(result) >= limit:
+                    exhausted = False
+                self._cursors[bucket].update(source.normalize(e, bucket) for e in result)
+            first_round = False
 
             # Merge and sort
-            all_events = aw_transform.sort_by_timestamp(afk_events + lid_events)
+            if window_start is not None:
+                for cursor in self._cursors.values():
+                    cursor.trim(window_start)
+            all_events = aw_transform.sort_by_timestamp(
+                [e for cursor in self._cursors.values() for e in cursor.events()]
+            )
 
             if not all_events:
                 return all_events, limit
@@ -347,8 +642,8 @@ class AWAfkPromptClient:
 
             # All events are AFK - we might be missing the gap start
             # But first check if we got fewer events than requested (no more to fetch)
-            if len(afk_events) < limit:
-                logger.debug(f"Only AFK events found, but no more events available (got {len(afk_events)})")
+            if exhausted:
+                logger.debug(f"Only AFK events found, but no more events available (got {len(all_events)})")
                 return all_events, limit
 
             # Double the limit and try again
@@ -359,11 +654,122 @@ class AWAfkPromptClient:
         logger.warning(f"Reached max limit ({max_limit}) without finding gap boundaries")
         return all_events, limit
 
+    def _is_currently_afk(self, events: list[aw_core.Event]) -> bool:
+        """Check whether the user is away right now, given events sorted by timestamp.
+
+        With a single afk bucket this is simply the status of the most recent event.
+        With several hosts the most recent event may come from a host the user has
+        left while they are busy on another one, so the user counts as active as long
+        as any host has an activity event running up to the newest data.
+        """
+        most_recent = events[-1]  # Last element is most recent
+        if not is_afk(most_recent):
+            return False
+        if len(self.afk_bucket_ids) <= 1:
+            return True
+        newest_end = max(e.timestamp + e.duration for e in events)
+        return not any(
+            not is_afk(e) and e.timestamp + e.duration >= newest_end - ACTIVE_HOST_SLACK for e in events
+        )
+
+    def _apply_rules(self, rules: RuleEngine, gaps: list[aw_core.Event],
+                     events: list[aw_core.Event]) -> Iterator[aw_core.Event]:
+        """Post the gaps a rule answers, with the rule name in the event data, and pass on the others."""
+        away = [e for e in events if is_afk(e)] if rules.uses_sources else []
+        for gap in gaps:
+            end = gap.timestamp + gap.duration
+            sources = frozenset(e.data.get("source", "") for e in away
+                                if e.timestamp < end and e.timestamp + e.duration > gap.timestamp)
+            previous = self.state.recent_events.last_before(gap.timestamp) if rules.uses_previous else None
+            rule = rules.decide(gap.timestamp, gap.duration, sources,
+                                previous.data.get(DATA_KEY, "") if previous is not None else "")
+            if rule is None:
+                yield gap
+                continue
+            logger.info(f"Rule {rule.name!r} answers the gap at "
+                        f"{gap.timestamp.astimezone(LOCAL_TIMEZONE).strftime('%H:%M')}: {rule.message}")
+            gap.data[RULE_KEY] = rule.name
+            try:
+                self.post_event(gap, rule.message)
+            except Exception:
+                logger.exception(f"Failed to post the answer of rule {rule.name!r}, "
+                                 f"the gap will be found again later")
+
+    def answer_by_rules(self, gaps: list[aw_core.Event], events: list[aw_core.Event]) -> list[aw_core.Event]:
+        """Post the gaps the configured rules answer and return the others.
+
+        Args:
+            gaps: Unanswered gaps
+            events: The normalized source events the gaps were found in
+        """
+        if self.rules is None:
+            return gaps
+        return list(self._apply_rules(self.rules, gaps, events))
+
+    def _fetch_windows(self, bucket_id: str, start: datetime.datetime) -> list[aw_core.Event]:
+        """The window watcher events since start.
+
+        Fetched incrementally like the AFK buckets, so one poll costs one small request
+        however many gaps are checked against it.
+        """
+        cursor = self._window_cursor
+        if cursor is None or self._windows_from is None or start < self._windows_from:
+            cursor = self._window_cursor = BucketCursor(bucket_id, keep_boundary=False)
+            since = start
+        else:
+            since = cursor.cursor
+        cursor.update(self.client.get_events(bucket_id, start=since, limit=-1))
+        cursor.trim(start)
+        self._windows_from = start
+        return cursor.events()
+
+    def _handle_calls(self, detector: CallDetector, window_bucket_id: str,
+                      gaps: list[aw_core.Event]) -> Iterator[aw_core.Event]:
+        """Take the gaps spent in video calls out of the prompts.
+
+        With the "label" action they are posted right away. With the "merge" action they
+        are held until the call is over, then asked about as one gap spanning all of them.
+        """
+        if not gaps and not self._call_gaps:
+            return
+        start = min(gap.timestamp for gap in [*gaps, *self._call_gaps.values()])
+        try:
+            windows = self._fetch_windows(window_bucket_id, start)
+        except HTTPError:
+            logger.warning("Failed to get window events, cannot tell which gaps were calls")
+            yield from gaps
+            return
+        calls = detector.find_calls(windows)
+
+        for gap in gaps:
+            call = detector.covering(gap, calls)
+            if call is None:
+                yield gap
+            elif detector.action == "label":
+                logger.info(f"Gap at {gap.timestamp.astimezone(LOCAL_TIMEZONE).strftime('%H:%M')} "
+                            f"was a call in {call.data['app'] or call.data['title']}")
+                try:
+                    self.post_event(gap, detector.label)
+                except Exception:
+                    logger.exception(f"Failed to post the call label {detector.label!r}, "
+                                     f"the gap will be found again later")
+            else:
+                self._call_gaps[gap.timestamp] = gap
+
+        if self._call_gaps and not detector.in_call(windows, get_utc_now()):
+            held = list(self._call_gaps.values())
+            self._call_gaps.clear()
+            first = min(gap.timestamp for gap in held)
+            last = max(gap.timestamp + gap.duration for gap in held)
+            logger.info(f"Call is over, asking about its {len(held)} gaps at once")
+            yield aw_core.Event(timestamp=first, duration=last - first)
+
     def get_new_afk_events_to_note(self, seconds: float, durration_thresh: float) -> Iterator[aw_core.Event] | None:
         """Check whether we recently finished a large AFK event.
 
-        Fetches events from both regular AFK watcher and lid watcher (if enabled),
-        then merges them to get a complete picture of away time.
+        Fetches events from all AFK input sources (the regular AFK watcher, the lid
+        watcher if enabled, and any configured extra sources), then merges them to get
+        a complete picture of away time.
 
         Uses dynamic limit scaling: starts with a small limit and automatically
         increases if only AFK heartbeats are found (indicating a long AFK period
@@ -380,14 +786,15 @@ class AWAfkPromptClient:
             # Fetch events with dynamic limit scaling
             all_events, limit_used = self._fetch_events_with_dynamic_limit(
                 initial_limit=10,
-                max_limit=self.history_limit
+                max_limit=self.history_limit,
+                window_start=get_utc_now() - datetime.timedelta(seconds=seconds),
             )
 
             # Check if currently AFK (from either source)
             # Most recent event is LAST after sorting (ascending order)
             if all_events:
                 most_recent = all_events[-1]  # Last element is most recent
-                currently_afk = is_afk(most_recent)
+                currently_afk = self._is_currently_afk(all_events)
                 logger.debug(f"Most recent event: {most_recent.timestamp.astimezone(LOCAL_TIMEZONE).strftime('%H:%M:%S')} | "
                            f"status={most_recent.data.get('status')} | currently_afk={currently_afk}")
                 if currently_afk:
@@ -395,7 +802,12 @@ class AWAfkPromptClient:
                     logger.debug("Currently AFK, waiting for user to return")
                     return
 
-            yield from self.state.get_unseen_afk_events(all_events, seconds, durration_thresh)
+            gaps = self.state.get_unseen_afk_events(all_events, seconds, durration_thresh)
+            if self.rules is not None:
+                gaps = self._apply_rules(self.rules, list(gaps), all_events)
+            if self.calls is not None and self.window_bucket_id is not None:
+                gaps = self._handle_calls(self.calls, self.window_bucket_id, list(gaps))
+            yield from gaps
         except HTTPError:
             logger.exception("Failed to get events from the server.")
             return
@@ -403,19 +815,30 @@ class AWAfkPromptClient:
 
 class AWAfkPromptState:
     def __init__(self, recent_events: Iterable[aw_core.Event],
-                 seen_store: SeenEventsStore | None = None):
-        self.recent_events = recent_events if isinstance(recent_events, deque) else deque(recent_events, 100)
+                 seen_store: SeenEventsStore | None = None, history: "HistoryIndex | None" = None,
+                 prediction: "PredictionModel | None" = None):
+        self.recent_events = recent_events if isinstance(recent_events, IntervalIndex) else IntervalIndex(recent_events)
         """The recent events we have posted to the aw-watcher-afk-prompt bucket.
 
         This is used to avoid asking the user to log an absence that they have already logged.
 
-        Sorted from earliest to most recent."""
+        Sorted from earliest to most recent, and indexed by time so that only events
+        near a gap are compared against it."""
         self.seen_store = seen_store
+        self.coverage = CoverageIndex([*self.recent_events, *(seen_store.intervals() if seen_store else [])])
+        """Every interval known to be handled: posted to our bucket (this or an earlier
+        session), remembered by the seen events store, or split-posted."""
+        self.suggestions = SuggestionIndex.from_messages(
+            (event.data.get(DATA_KEY, ""), event.timestamp + event.duration) for event in self.recent_events
+        )
+        """The messages posted so far, deduplicated and ranked, for the prompt history."""
+        self.history = history
+        """Every message ever posted, for the reverse search of the prompt."""
+        self.prediction = prediction
+        """The answers by time of day and duration, to pre-fill the prompt."""
 
     def has_event(self, new: aw_core.Event, overlap_thresh: float = 0.95) -> bool:
-        """Check whether we have already posted an event that overlaps with the new event.
-
-        Checks both in-memory recent events AND persistent storage.
+        """Check whether we have already handled an event that overlaps with the new event.
 
         The self.recent_events data structure used to be a dictionary with keys as timestamp/durration.
         This method merely checked to see if the new event's (timestamp, durration) tuple was in the dictionary.
@@ -434,37 +857,41 @@ class AWAfkPromptState:
         extend over time as new activity data comes in. If we compared against the new (larger)
         duration, we'd fail to recognize the same gap and ask the user again.
         """  # noqa: E501
-        # First check persistent store (if available)
-        if self.seen_store and self.seen_store.has_overlap(new, overlap_thresh):
-            return True
-
-        # Then check in-memory recent events
-        for recent in self.recent_events:
-            overlap_start = max(recent.timestamp, new.timestamp)
-            overlap_end = min(recent.timestamp + recent.duration, new.timestamp + new.duration)
-            overlap = overlap_end - overlap_start
-            if overlap.total_seconds() <= 0:
-                continue  # No overlap
-            min_duration = min(recent.duration, new.duration)
-            if overlap / min_duration > overlap_thresh:
-                return True
-        return False
+        return self.coverage.covers(new, overlap_thresh)
 
     def mark_event_as_seen(self, event: aw_core.Event) -> None:
         """Mark an event as seen (add to recent_events) to prevent re-prompting.
 
         This should only be called AFTER the event has been successfully posted.
-        Saves to both in-memory deque and persistent store.
+        Saves to both the in-memory indexes and persistent store.
         """
         if not self.has_event(event):
             logger.debug(f"Marking event as seen: {event}")
-            self.recent_events.append(event)
+            self.record_posted(event)
             # Also persist to file
             if self.seen_store:
                 self.seen_store.add(event)
         else:
             logger.debug(f"Event already marked as seen: {event}")
 
+    def record_posted(self, event: aw_core.Event) -> None:
+        """Remember an event posted to our bucket, for history and coverage, without persisting it."""
+        self.recent_events.add(event)
+        self.coverage.add(event)
+        self.suggestions.add(event.data.get(DATA_KEY, ""), event.timestamp + event.duration)
+        if self.history is not None:
+            self.history.add(event.data.get(DATA_KEY, ""), event.timestamp + event.duration)
+        if self.prediction is not None:
+            self.prediction.add(event)
+
+    def trim(self, before: datetime.datetime) -> None:
+        """Forget posted history that ended before the given time.
+
+        The coverage index is kept as is, like the seen events store it mirrors,
+        so old gaps are still recognized for the rest of the session.
+        """
+        self.recent_events.trim(before)
+
     def get_unseen_afk_events(self, events: list[aw_core.Event], recency_thresh: float, durration_thresh: float) -> Iterator[aw_core.Event]:
         """Check whether we recently finished a large AFK event.
 
@@ -483,32 +910,20 @@ class AWAfkPromptState:
         ]
         logger.debug(f"Checking for unseen in: {events_log}")
 
-        # Filter out events that have zero length. Sometimes a zero length not-afk event is generated if you open
-        # up your computer from being suspended but don't do anything with it. This event is overwritten soon and
-        # doesn't exist in later queries. If we don't filter them out we can ask the user to fill the time in twice.
-        events = [e for e in events if e.duration.total_seconds() > 0]
-
-        # Use gaps in non-afk events instead of the afk-events themselves to handle when the computer
-        # is suspended or powered off.
-        non_afk_events = squash_overlaps([e for e in events if not is_afk(e)])
-        logger.debug(f"Non-AFK events after squash: {len(non_afk_events)}")
-        for evt in non_afk_events[-3:]:  # Last 3 events
-            start = evt.timestamp.astimezone(LOCAL_TIMEZONE).strftime("%H:%M:%S")
-            end = (evt.timestamp + evt.duration).astimezone(LOCAL_TIMEZONE).strftime("%H:%M:%S")
-            logger.debug(f"  Event: {start} - {end} ({evt.duration.total_seconds():.1f}s)")
-        pseudo_afk_events = list(get_gaps(non_afk_events))
+        pseudo_afk_events = find_activity_gaps(events)
         logger.debug(f"Gaps found: {len(pseudo_afk_events)}")
         for gap in pseudo_afk_events:
             logger.debug(f"  Gap: {gap.timestamp.astimezone(LOCAL_TIMEZONE).strftime('%H:%M:%S')} | {gap.duration.total_seconds():.1f}s")
 
-        pseudo_afk_events = [e for e in pseudo_afk_events if not self.has_event(e)]
+        covered = self.coverage.covers_batch(pseudo_afk_events)
+        pseudo_afk_events = [e for e, seen in zip(pseudo_afk_events, covered, strict=True) if not seen]
         logger.debug(f"Gaps after filtering seen: {len(pseudo_afk_events)}")
         buffered_now = get_utc_now() - datetime.timedelta(seconds=recency_thresh)
         for event in pseudo_afk_events:
-            long_enough = event.duration.seconds > durration_thresh
+            long_enough = event.duration.total_seconds() > durration_thresh
             recent_enough = event.timestamp + event.duration > buffered_now
             logger.debug(f"  Checking gap at {event.timestamp.astimezone(LOCAL_TIMEZONE).strftime('%H:%M:%S')}: "
-                       f"long_enough={long_enough} ({event.duration.seconds}s > {durration_thresh}s), "
+                       f"long_enough={long_enough} ({event.duration.total_seconds():.0f}s > {durration_thresh}s), "
                        f"recent_enough={recent_enough}")
             if long_enough and recent_enough:
                 logger.debug(f"Found event to note: {event}")
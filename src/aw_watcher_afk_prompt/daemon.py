@@ -0,0 +1,230 @@
+"""Serving several aw-server endpoints from one process.
+
+Each endpoint gets its own client, state and seen events store namespace. Polling
+happens concurrently in worker threads, while all prompts go through one shared
+queue that is drained by the main (Tk) thread, so there is never more than one
+dialog on screen.
+"""
+
+import datetime
+import logging
+import queue
+import re
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+import aw_core
+from requests.exceptions import ConnectionError
+
+from aw_watcher_afk_prompt.backfill import BackfillEngine
+from aw_watcher_afk_prompt.core import AWAfkPromptClient, AWAfkPromptError, get_utc_now
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """One aw-server to watch.
+
+    Attributes:
+        host: Server host name (None: from the aw-client config)
+        port: Server port (None: from the aw-client config)
+        testing: Whether this is a testing server (affects the aw-client config defaults)
+    """
+
+    host: str | None = None
+    port: int | None = None
+    testing: bool = False
+
+    @property
+    def name(self) -> str:
+        """Human readable name, used in logs and prompt titles."""
+        if self.host is None and self.port is None:
+            return "testing server" if self.testing else "default server"
+        return f"{self.host or 'localhost'}:{self.port or ''}".rstrip(":")
+
+    @property
+    def store_namespace(self) -> str | None:
+        """Namespace of the seen events store.
+
+        The default endpoint keeps the un-namespaced store, so existing setups keep their history.
+        """
+        if self.host is None and self.port is None:
+            return None
+        return re.sub(r"\W+", "_", self.name)
+
+
+def endpoints_from_config(config: dict[str, Any], testing: bool = False) -> list[Endpoint]:
+    """Read the ``[[servers]]`` tables from the config, falling back to the default server.
+
+    Example:
+
+        [[servers]]
+        host = "localhost"
+        port = 5666
+        testing = true
+    """
+    servers = config.get("servers") or []
+    if not servers:
+        return [Endpoint(testing=testing)]
+    return [
+        Endpoint(host=server.get("host"), port=server.get("port"), testing=server.get("testing", testing))
+        for server in servers
+    ]
+
+
+@dataclass
+class PendingPrompt:
+    """A gap waiting to be prompted for, together with where to post the answer.
+
+    When several gaps close to each other are asked about together, event spans all
+    of them and parts holds the original gaps.
+    """
+
+    endpoint: Endpoint
+    state: AWAfkPromptClient
+    event: aw_core.Event
+    parts: list[aw_core.Event] = field(default_factory=list)
+
+
+def coalesce_prompts(prompts: list[PendingPrompt], merge_distance: datetime.timedelta) -> list[PendingPrompt]:
+    """Merge the gaps of an endpoint that are at most merge_distance of activity apart.
+
+    "Went to the door, came back, left again" then gives one prompt instead of two
+    dialogs in a row. The order of the prompts is kept, a merged prompt takes the
+    place of its first gap.
+    """
+    merged: list[tuple[int, PendingPrompt]] = []
+    last_by_endpoint: dict[Endpoint, PendingPrompt] = {}
+    for index, prompt in sorted(enumerate(prompts), key=lambda item: item[1].event.timestamp):
+        last = last_by_endpoint.get(prompt.endpoint)
+        if last is not None and prompt.event.timestamp - (last.event.timestamp + last.event.duration) <= merge_distance:
+            last.parts = [*(last.parts or [last.event]), *(prompt.parts or [prompt.event])]
+            last.event = aw_core.Event(
+                timestamp=last.event.timestamp,
+                duration=prompt.event.timestamp + prompt.event.duration - last.event.timestamp,
+            )
+            continue
+        prompt = replace(prompt, parts=list(prompt.parts))
+        merged.append((index, prompt))
+        last_by_endpoint[prompt.endpoint] = prompt
+    return [prompt for _, prompt in sorted(merged, key=lambda item: item[0])]
+
+
+class EndpointPoller:
+    """Polls any number of endpoints concurrently and queues up the gaps to prompt for."""
+
+    def __init__(self, states: dict[Endpoint, AWAfkPromptClient]):
+        self.states = states
+        self.prompts: queue.Queue[PendingPrompt] = queue.Queue()
+        self._held: list[PendingPrompt] = []
+        self._executor = ThreadPoolExecutor(max_workers=len(states), thread_name_prefix="endpoint-poll") \
+            if len(states) > 1 else None
+
+    def _poll_one(self, endpoint: Endpoint, state: AWAfkPromptClient,
+                  seconds: float, durration_thresh: float) -> list[aw_core.Event]:
+        try:
+            return list(state.get_new_afk_events_to_note(seconds=seconds, durration_thresh=durration_thresh) or [])
+        except ConnectionError:
+            logger.exception(f"Cannot connect to {endpoint.name}, will retry on the next poll")
+            return []
+
+    def _backfill_one(self, endpoint: Endpoint, state: AWAfkPromptClient,
+                      seconds: float, durration_thresh: float) -> list[aw_core.Event]:
+        try:
+            return BackfillEngine.for_prompt_client(state).find_gaps(datetime.timedelta(seconds=seconds), durration_thresh)
+        except ConnectionError:
+            logger.exception(f"Cannot connect to {endpoint.name}, skipping its backfill")
+            return []
+
+    def _run(self, check: Callable[..., list[aw_core.Event]], *args: Any) -> int:
+        """Run a check on all endpoints and queue the gaps it returns."""
+        if self._executor is None:
+            results = {endpoint: check(endpoint, state, *args) for endpoint, state in self.states.items()}
+        else:
+            futures = {endpoint: self._executor.submit(check, endpoint, state, *args)
+                       for endpoint, state in self.states.items()}
+            results = {endpoint: future.result() for endpoint, future in futures.items()}
+        count = 0
+        for endpoint, events in results.items():
+            for event in events:
+                self.prompts.put(PendingPrompt(endpoint, self.states[endpoint], event))
+                count += 1
+        return count
+
+    def poll(self, seconds: float, durration_thresh: float) -> int:
+        """Check all endpoints once and queue the gaps found.
+
+        Returns:
+            The number of gaps queued
+        """
+        return self._run(self._poll_one, seconds, durration_thresh)
+
+    def backfill(self, seconds: float, durration_thresh: float) -> int:
+        """Queue the unanswered gaps of the last seconds of history on all endpoints.
+
+        Unlike poll(), this fetches the whole range in concurrent time windows, see BackfillEngine.
+
+        Returns:
+            The number of gaps queued
+        """
+        return self._run(self._backfill_one, seconds, durration_thresh)
+
+    def pending(self, merge_distance: float = 0,
+                now: datetime.datetime | None = None) -> Iterator[PendingPrompt]:
+        """Drain the prompt queue in the order the gaps were found.
+
+        Args:
+            merge_distance: Gaps of one endpoint separated by at most this many seconds
+                of activity are merged into one prompt (0: never merge). A gap is held
+                back until that much activity has passed after it, so that leaving again
+                soon after coming back still ends up in the same prompt.
+            now: The current time (default: now)
+        """
+        prompts = []
+        while True:
+            try:
+                prompts.append(self.prompts.get_nowait())
+            except queue.Empty:
+                break
+        if merge_distance <= 0:
+            yield from prompts
+            return
+
+        # Held gaps are usually detected again, the newest version of a gap wins.
+        unique = {(p.endpoint, p.event.timestamp): p for p in [*self._held, *prompts]}
+        merged = coalesce_prompts(list(unique.values()), datetime.timedelta(seconds=merge_distance))
+        if len(merged) < len(unique):
+            logger.info(f"Merged {len(unique)} gaps into {len(merged)} prompts")
+
+        now = now or get_utc_now()
+        self._held = []
+        for prompt in merged:
+            if now - (prompt.event.timestamp + prompt.event.duration) < datetime.timedelta(seconds=merge_distance):
+                self._held.extend(replace(prompt, event=part, parts=[]) for part in prompt.parts or [prompt.event])
+            else:
+                yield prompt
+
+
+def connect_endpoints(endpoints: list[Endpoint],
+                      connect: Callable[[Endpoint], AWAfkPromptClient]) -> dict[Endpoint, AWAfkPromptClient]:
+    """Connect to all endpoints concurrently.
+
+    An endpoint that cannot be reached is logged and left out, unless none can be reached.
+    """
+    if len(endpoints) == 1:
+        return {endpoints[0]: connect(endpoints[0])}
+    states = {}
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+        futures = {endpoint: executor.submit(connect, endpoint) for endpoint in endpoints}
+        for endpoint, future in futures.items():
+            try:
+                states[endpoint] = future.result()
+                logger.info(f"Connected to {endpoint.name}")
+            except Exception:
+                logger.exception(f"Giving up on {endpoint.name}")
+    if not states:
+        raise AWAfkPromptError("Could not connect to any of the configured servers.")
+    return states
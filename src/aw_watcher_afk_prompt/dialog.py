@@ -1,19 +1,26 @@
-import json
+import bisect
 import logging
 import re
 import time
 import tkinter as tk
-from collections import UserDict
-from itertools import chain
-from pathlib import Path
+from concurrent.futures import Future
 from tkinter import messagebox, simpledialog, ttk
 
-import appdirs
-
-from aw_watcher_afk_prompt.widgets import EnhancedEntry
+from aw_watcher_afk_prompt.abbreviations import get_abbreviations
+from aw_watcher_afk_prompt.context import WindowContext
+from aw_watcher_afk_prompt.edit import EditBuffer
+from aw_watcher_afk_prompt.history import HistoryIndex, ReverseSearch
+from aw_watcher_afk_prompt.suggestions import SuggestionIndex
+from aw_watcher_afk_prompt.utils import format_duration
+from aw_watcher_afk_prompt.widgets import EnhancedEntry, VirtualList
 
 logger = logging.getLogger(__name__)
 
+CONTEXT_POLL_MS = 50
+"""How often the prompt checks whether the windows around the gap have arrived."""
+CONTEXT_TIMEOUT = 5.0
+"""Seconds after which the prompt stops waiting for the windows around the gap."""
+
 root = tk.Tk()
 root.withdraw()
 
@@ -24,40 +31,6 @@ def open_link(link: str) -> None:
     webbrowser.open(link)
 
 
-class _AbbreviationStore(UserDict[str, str]):
-    """A class to store abbreviations and their expansions.
-
-    And to manage saving this information to the config directory.
-    """
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(self, *args, **kwargs)
-        config_dir = Path(appdirs.user_config_dir("aw-watcher-afk-prompt"))
-        config_dir.mkdir(parents=True, exist_ok=True)
-        self._config_file = config_dir / "abbreviations.json"
-        self._load_from_config()
-
-    def _load_from_config(self) -> None:
-        if self._config_file.exists():
-            with self._config_file.open() as f:
-                try:
-                    self.update(json.load(f))
-                except json.JSONDecodeError:
-                    logger.exception("Failed to load abbreviations from config file.")
-
-    def _save_to_config(self) -> None:
-        with self._config_file.open("w") as f:
-            json.dump(self.data, f, indent=4)
-
-    def __setitem__(self, key: str, value: str) -> None:
-        self.data[key] = value
-        self._save_to_config()
-
-    def __delitem__(self, key: str) -> None:
-        super().__delitem__(key)
-        self._save_to_config()
-
-
 class ConfigDialog(simpledialog.Dialog):
     def __init__(self, master):
         super().__init__(master, "Configuration")
@@ -74,6 +47,10 @@ class ConfigDialog(simpledialog.Dialog):
         self.abbr_pane = AbbreviationPane(abbr_tab)
         self.abbr_pane.grid()
 
+    def apply(self):
+        # Save the rows still being edited
+        self.abbr_pane.rows.flush()
+
 
 class AddAbbreviationDialog(simpledialog.Dialog):
     def __init__(self, master, expansion: str | None = None):
@@ -99,89 +76,146 @@ class AddAbbreviationDialog(simpledialog.Dialog):
         self.result = (self.abbr.get(), self.expansion.get())
 
 
+class _AbbreviationRow(ttk.Frame):
+    """One recycled row of the abbreviation pane, editable in place."""
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.key: str | None = None
+        self.abbr = EnhancedEntry(self, width=12)
+        self.abbr.grid(row=0, column=0, sticky=tk.W)
+        self.expansion = EnhancedEntry(self, width=40)
+        self.expansion.grid(row=0, column=1, sticky=tk.W)
+        self.delete = ttk.Button(self, text="-", width=3)
+        self.delete.grid(row=0, column=2)
+
+
 # TODO: Link the abbreviations json file for editing directly.
 class AbbreviationPane(ttk.Frame):
+    """Settings pane listing the abbreviations.
+
+    The list is filtered as you type in the search box and only the visible rows
+    exist as widgets (see VirtualList). Abbreviations are edited in place: a row is
+    saved when it loses focus, on Return and when it scrolls out of view. Adding or
+    deleting an entry updates the row list in place instead of redrawing it.
+    """
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        # Set up a canvas so we can get a scroll bar.
-        # TODO: Think of a better way to display these abbreviations?
-        self.canvas = tk.Canvas(self, borderwidth=0, background="#ffffff")
-        self.canvas.grid(row=0, column=0, sticky=tk.N + tk.S + tk.E + tk.W)
-        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.canvas.yview)
-        self.scrollbar.grid(row=0, column=1, sticky=tk.N + tk.S)
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        self.canvas.bind("<Configure>", lambda _: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        self.canvas.bind_all("<MouseWheel>", lambda e: self.canvas.yview_scroll(int(-1 * (e.delta / 120)), "units"))
-        # enable scroll on a track pad
-        self.canvas.bind_all("<Button-4>", lambda _: self.canvas.yview_scroll(-1, "units"))
-        self.canvas.bind_all("<Button-5>", lambda _: self.canvas.yview_scroll(1, "units"))
-
-        self.frame = ttk.Frame(self.canvas)
-        self.frame.grid(row=0, column=0, sticky=tk.N + tk.S + tk.E + tk.W)
-
-        self.canvas.create_window((0, 0), window=self.frame, anchor="nw")
-
-        ttk.Label(self.frame, text="Abbr", justify=tk.LEFT).grid(row=0, column=0, sticky=tk.W)
-        ttk.Label(self.frame, text="Expansion", justify=tk.LEFT).grid(row=0, column=1, sticky=tk.W)
-
-        self.new_abbr = ttk.Entry(self.frame)
-        self.new_abbr.grid(row=1, column=0)
-        self.new_expansion = ttk.Entry(self.frame)
-        self.new_expansion.grid(row=1, column=1)
-        ttk.Button(self.frame, text="+", command=self.add_abbreviation).grid(row=1, column=2)
-
-        self.other_rows = []
-
-        self.draw_abbreviations()
-
-    def _make_del_function(self, key):
-        def del_function():
-            abbreviations.pop(key)
-            self.draw_abbreviations()
-
-        return del_function
-
-    def draw_abbreviations(self):
-        for child in chain(*self.other_rows):
-            child.destroy()
-        self.other_rows = []
-
-        for i, (abbr_key, abbr_value) in enumerate(sorted(abbreviations.items())):
-            row_index = i + 2
-            # TODO: Allow _editing_ abbreviations in place instead of remove and re-add.
-            # Maybe by using a readonly entry and double clicking to activate it?
-            abbr = ttk.Label(self.frame, text=abbr_key, justify=tk.LEFT)
-            abbr.grid(row=row_index, column=0, sticky=tk.W)
-            expansion = ttk.Label(self.frame, text=abbr_value, justify=tk.LEFT)
-            expansion.grid(row=row_index, column=1, sticky=tk.W)
-            button = ttk.Button(self.frame, text="-", command=self._make_del_function(abbr_key))
-            button.grid(row=row_index, column=2)
-            self.other_rows.append((abbr, expansion, button))
+        ttk.Label(self, text="Search").grid(row=0, column=0, sticky=tk.W)
+        self.query = tk.StringVar()
+        self.query.trace_add("write", lambda *_: self.apply_filter())
+        EnhancedEntry(self, textvariable=self.query).grid(row=0, column=1, sticky=tk.W + tk.E)
+
+        ttk.Label(self, text="Abbr", justify=tk.LEFT).grid(row=1, column=0, sticky=tk.W)
+        ttk.Label(self, text="Expansion", justify=tk.LEFT).grid(row=1, column=1, sticky=tk.W)
+
+        self.new_abbr = ttk.Entry(self, width=12)
+        self.new_abbr.grid(row=2, column=0, sticky=tk.W)
+        self.new_expansion = ttk.Entry(self, width=40)
+        self.new_expansion.grid(row=2, column=1, sticky=tk.W)
+        self.new_expansion.bind("<Return>", lambda _: self.add_abbreviation() or "break")
+        ttk.Button(self, text="+", width=3, command=self.add_abbreviation).grid(row=2, column=2)
+
+        self.keys = abbreviations.filter("")
+        self.rows = VirtualList(self, self._make_row, self._bind_row, self._save_row,
+                                row_count=len(self.keys), visible_rows=15)
+        self.rows.grid(row=3, column=0, columnspan=3, sticky=tk.N + tk.S + tk.E + tk.W)
+
+    def _make_row(self, parent) -> _AbbreviationRow:
+        row = _AbbreviationRow(parent)
+        row.delete.configure(command=lambda: self.delete_abbreviation(row.key))
+        for entry in (row.abbr, row.expansion):
+            entry.bind("<FocusOut>", lambda _: self._save_visible_row(row))
+            entry.bind("<Return>", lambda _: self._save_visible_row(row) or "break")
+        return row
+
+    def _bind_row(self, row: _AbbreviationRow, index: int) -> None:
+        row.key = self.keys[index]
+        row.abbr.set_text(row.key)
+        row.expansion.set_text(abbreviations.get(row.key, ""))
+
+    def _save_row(self, row: _AbbreviationRow, index: int) -> None:  # noqa: ARG002
+        """Save in-place edits of a row to the store."""
+        key, new_key, expansion = row.key, row.abbr.get().strip(), row.expansion.get().strip()
+        if key is None or key not in abbreviations or not new_key or not expansion:
+            return
+        if new_key != key:
+            abbreviations.rename(key, new_key, expansion)
+            self.keys.remove(key)
+            if new_key not in self.keys:
+                bisect.insort(self.keys, new_key)
+            row.key = new_key
+        elif abbreviations[key] != expansion:
+            abbreviations[key] = expansion
+
+    def _save_visible_row(self, row: _AbbreviationRow) -> None:
+        index = self.rows.index_of(row)
+        if index is not None:
+            old_key = row.key
+            self._save_row(row, index)
+            if row.key != old_key:
+                # A rename may move the row, show the list in its new order
+                self.rows.refresh()
+
+    def apply_filter(self) -> None:
+        self.rows.flush()
+        self.keys = abbreviations.filter(self.query.get())
+        self.rows.first = 0
+        self.rows.refresh(len(self.keys))
+
+    def delete_abbreviation(self, key: str | None) -> None:
+        if key is None or key not in abbreviations:
+            return
+        self.rows.flush()
+        del abbreviations[key]
+        if key in self.keys:
+            self.keys.remove(key)
+        self.rows.refresh(len(self.keys))
 
     def add_abbreviation(self):
-        abbr = self.new_abbr.get()
-        expansion = self.new_expansion.get()
+        abbr = self.new_abbr.get().strip()
+        expansion = self.new_expansion.get().strip()
         if not abbr or not expansion:
             return
+        self.rows.flush()
         abbreviations[abbr] = expansion
         self.new_abbr.delete(0, tk.END)
         self.new_expansion.delete(0, tk.END)
-        self.draw_abbreviations()
+        # Show the new entry even if it does not match the current search
+        if abbr not in self.keys:
+            bisect.insort(self.keys, abbr)
+        self.rows.refresh(len(self.keys))
+        self.rows.see(self.keys.index(abbr))
+        self.new_abbr.focus_set()
 
 
 # Singleton
-abbreviations = _AbbreviationStore()
+abbreviations = get_abbreviations()
 
 
 # TODO: This widget pops up off-center when using multiple screes on Linux, possibly other platforms.
 # See https://stackoverflow.com/questions/30312875/tkinter-winfo-screenwidth-when-used-with-dual-monitors/57866046#57866046
 class AWAfkPromptDialog(simpledialog.Dialog):
     def __init__(self, title: str, prompt: str, history: list[str],
-                 afk_start=None, afk_duration_seconds=None) -> None:
+                 afk_start=None, afk_duration_seconds=None, suggestions: SuggestionIndex | None = None,
+                 search_index: HistoryIndex | None = None, predictions: list[str] | None = None,
+                 context: Future[WindowContext] | None = None) -> None:
         self.prompt = prompt
+        self.context = context
+        self.predictions = predictions or []
+        if self.predictions:
+            # Up walks the other likely answers first, the likeliest is already in the entry
+            alternatives = self.predictions[1:]
+            history = [entry for entry in history if entry not in alternatives] + list(reversed(alternatives))
         self.history = history
         self.history_index = len(history)
+        self.suggestions = suggestions
+        self.search_index = search_index
+        self._search: ReverseSearch | None = None  # Set while reverse searching (Ctrl-R)
+        self._shown: str | None = None  # The history entry last put in the entry by Up/Down
+        self._completing = False  # Set while an inline completion waits to be accepted
         self.afk_start = afk_start
         self.afk_duration_seconds = afk_duration_seconds
         self.split_mode = False  # Track if user wants split mode
@@ -200,7 +234,7 @@ class AWAfkPromptDialog(simpledialog.Dialog):
         w.grid(row=0, padx=5, sticky=tk.W)
 
         # Input field (EnhancedEntry provides Ctrl+Backspace and Ctrl+w shortcuts)
-        self.entry = EnhancedEntry(master, name="entry", width=40)
+        self.entry = EnhancedEntry(master, name="entry", width=40, abbreviations=abbreviations)
         self.entry.grid(row=1, padx=5, sticky=tk.W + tk.E)
 
         # README link
@@ -225,8 +259,35 @@ class AWAfkPromptDialog(simpledialog.Dialog):
         self.bind("<Control-j>", self.next_entry)
         self.bind("<Control-k>", self.previous_entry)
 
-        # Expand abbreviations the user types
-        self.entry.bind("<KeyRelease>", self.expand_abbreviations)
+        # Shell-style reverse search through every message ever posted (Ctrl-R)
+        if self.search_index is not None:
+            self.search_label = ttk.Label(master, justify=tk.LEFT)
+            self.search_label.grid(row=2, padx=5, sticky=tk.W)
+            self.search_label.grid_remove()
+            self.entry.bind("<Control-r>", self.reverse_search)
+            self.entry.bind("<KeyPress>", self._search_key)
+
+        # Pre-fill the likeliest answer, selected so that typing replaces it
+        if self.predictions:
+            self.set_text(self.predictions[0])
+            self.entry.selection_range(0, tk.END)
+            if len(self.predictions) > 1:
+                hint = ttk.Label(master, text=f"Also likely: {', '.join(self.predictions[1:])} (Up)",
+                                 foreground="gray", justify=tk.LEFT)
+                hint.grid(row=3, padx=5, sticky=tk.W)
+
+        # The windows used around the gap, filled in when they have been fetched
+        if self.context is not None:
+            self.context_label = ttk.Label(master, text="Looking up the windows around the gap…",
+                                           foreground="gray", justify=tk.LEFT)
+            self.context_label.grid(row=4, padx=5, sticky=tk.W)
+            self._context_deadline = time.monotonic() + CONTEXT_TIMEOUT
+            self.after(CONTEXT_POLL_MS, self._show_context)
+
+        # Complete earlier messages inline while typing, Tab accepts the completion
+        if self.suggestions is not None:
+            self.entry.bind("<KeyRelease>", self.complete_inline, add="+")
+            self.entry.bind("<Tab>", self.accept_completion)
 
         # Add a new abbreviation from a highlighted section of text.
         self.entry.bind("<Control-n>", self.save_new_abbreviation)
@@ -236,6 +297,30 @@ class AWAfkPromptDialog(simpledialog.Dialog):
 
         return self.entry
 
+    def _show_context(self) -> None:
+        if not self.winfo_exists():
+            return  # Answered before the windows arrived
+        if not self.context.done():
+            if time.monotonic() < self._context_deadline:
+                self.after(CONTEXT_POLL_MS, self._show_context)
+            else:
+                self.context_label.grid_remove()
+            return
+        try:
+            context = self.context.result()
+        except Exception as e:
+            logger.warning(f"Failed to fetch the windows around the gap: {e}")
+            context = None
+        if not context:
+            self.context_label.grid_remove()
+            return
+        lines = []
+        if context.before:
+            lines.append("Before: " + " → ".join(context.before))
+        if context.after:
+            lines.append("After: " + " → ".join(context.after))
+        self.context_label.configure(text="\n".join(lines))
+
     def save_new_abbreviation(self, event=None, *, long: bool = False):  # noqa: ARG002
         if self.entry.selection_present():
             # Get the highlighted Text
@@ -264,8 +349,9 @@ class AWAfkPromptDialog(simpledialog.Dialog):
             abbr, expansion = result
             abbr = abbr.strip()
             expansion = expansion.strip()
-            if not re.fullmatch(r"\w+", abbr):
-                messagebox.showerror("Invalid abbreviation", "Abbreviations must be alphanumeric and without spaces.")
+            if not re.fullmatch(r"\w+( \w+)*", abbr):
+                messagebox.showerror("Invalid abbreviation",
+                                     "Abbreviations must be alphanumeric words separated by single spaces.")
                 return
 
             if existing := abbreviations.get(abbr):
@@ -279,32 +365,108 @@ class AWAfkPromptDialog(simpledialog.Dialog):
         # Refocus on the main text entry
         self.entry.focus_set()
 
-    def expand_abbreviations(self, event=None):  # noqa: ARG002
-        text = self.entry.get()
-        cursor_index = self.entry.index(tk.INSERT)
-
-        # Get the potential appreviation
-        abbr_regex = r"(['\w]+)\s$"  # Include ' so if you has s as an abbreviation "what's" doesn't expand to what is.
-        abbr = re.search(abbr_regex, text[:cursor_index])
-        if abbr and abbr.group(1) in abbreviations:
-            before_index = len(re.sub(abbr_regex, "", text[:cursor_index]))
-            self.entry.delete(before_index, cursor_index - 1)
-            self.entry.insert(before_index, abbreviations[abbr.group(1)])
-
     def set_text(self, text: str):
         self.entry.set_text(text)
 
+    def _typed_text(self) -> str:
+        """The text of the entry without an inline completion that was not accepted."""
+        if self.entry.selection_present():
+            return self.entry.get()[:self.entry.index(tk.SEL_FIRST)]
+        return self.entry.get()
+
+    def reverse_search(self, event=None):  # noqa: ARG002
+        """Start a reverse search, or step to the next older match when already searching."""
+        if self._search is None:
+            self._search = ReverseSearch(self.search_index, self.entry.get())
+            self.search_label.grid()
+        elif not self._search.next():
+            self.bell()
+        self._show_search()
+        return "break"
+
+    def _show_search(self) -> None:
+        self.search_label.configure(text=self._search.label)
+        if self._search.current is not None:
+            self.set_text(self._search.current)
+            # At the start, so the abbreviations never see the match as typed text
+            self.entry.icursor(0)
+
+    def _end_search(self, restore: bool = False) -> None:
+        if restore:
+            self.set_text(self._search.original)
+        self._search = None
+        self.search_label.grid_remove()
+
+    def _search_key(self, event):
+        if self._search is None:
+            return None
+        control = event.state & 0x4
+        if event.keysym == "Escape" or (control and event.keysym == "g"):
+            # Back to what was typed before the search
+            self._end_search(restore=True)
+            return "break"
+        if event.keysym == "BackSpace":
+            self._search.backspace()
+        elif event.char and event.char.isprintable() and not control:
+            self._search.type(event.char)
+        elif event.keysym.endswith(("_L", "_R")):
+            return "break"  # Modifiers alone, e.g. the Control of the next Ctrl-R
+        else:
+            # Anything else (Return, Tab, arrows...) accepts the match and does its usual job
+            self._end_search()
+            return None
+        self._show_search()
+        return "break"
+
+    def complete_inline(self, event=None):
+        if self._search is not None:
+            return
+        # Only complete after typing at the end of the text
+        if event is not None and not (event.char and event.char.isprintable()):
+            return
+        text = self.entry.get()
+        if not text or self.entry.index(tk.INSERT) != len(text):
+            return
+        completion = self.suggestions.complete(text)
+        if completion is None or not completion.lower().startswith(text.lower()):
+            return
+        self.entry.insert(tk.END, completion[len(text):])
+        self.entry.icursor(len(text))
+        self.entry.selection_range(len(text), tk.END)
+        self._completing = True
+
+    def accept_completion(self, event=None):  # noqa: ARG002
+        if not self.entry.selection_present():
+            return None  # Move the focus as usual
+        self._completing = False
+        self.entry.selection_clear()
+        self.entry.icursor(tk.END)
+        return "break"
+
+    def _filter_history(self) -> None:
+        """Narrow Up/Down down to the earlier messages matching what was typed."""
+        if self.suggestions is None:
+            return
+        text = self._typed_text()
+        if text.strip() and text != self._shown:
+            self.history = list(reversed(self.suggestions.suggest(text, limit=50)))
+            self.history_index = len(self.history)
+
     def previous_entry(self, event=None):  # noqa: ARG002
+        self._filter_history()
         if not self.history:
             return
         self.history_index = max(0, self.history_index - 1)
-        self.set_text(self.history[self.history_index])
+        self._shown = self.history[self.history_index]
+        self.set_text(self._shown)
 
     def next_entry(self, event=None):  # noqa: ARG002
+        self._filter_history()
         if not self.history:
             return
         self.history_index = min(len(self.history) - 1, self.history_index + 1)
-        self.set_text(self.history[self.history_index])
+        self._shown = self.history[self.history_index]
+        self.set_text(self._shown)
 
     def open_an_issue(self, event=None):  # noqa: ARG002
         open_link("https://github.com/tobixen/aw-watcher-afk-prompt/issues/new")
@@ -323,7 +485,8 @@ class AWAfkPromptDialog(simpledialog.Dialog):
 
     # If you want to retrieve the entered text when the dialog closes:
     def apply(self):
-        text = self.entry.get().strip()
+        # An inline completion still selected was not accepted (Tab), unlike a pre-filled prediction
+        text = (self._typed_text() if self._completing else self.entry.get()).strip()
         if not text:
             # Don't accept blank entries - show error and keep dialog open
             messagebox.showerror("Empty Entry", "Please enter a description of what you were doing, or click 'Unknown' to mark as unknown.")
@@ -388,84 +551,90 @@ class AWAfkPromptDialog(simpledialog.Dialog):
         box.pack()
 
 
+class _EditRow(ttk.Frame):
+    """One recycled row of the batch edit dialog: time, duration, entry and delete box."""
+
+    def __init__(self, master, time_width: int = 8):
+        super().__init__(master)
+        self.time = ttk.Label(self, width=time_width)
+        self.time.grid(row=0, column=0, padx=5, pady=2, sticky="w")
+        self.duration = ttk.Label(self, width=6)
+        self.duration.grid(row=0, column=1, padx=5, pady=2, sticky="w")
+        self.entry = EnhancedEntry(self, width=50)
+        self.entry.grid(row=0, column=2, padx=5, pady=2, sticky="ew")
+        self.deleted = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self, variable=self.deleted).grid(row=0, column=3, padx=5, pady=2)
+
+
 class BatchEditDialog(simpledialog.Dialog):
-    """Dialog for editing multiple entries at once."""
+    """Dialog for editing multiple entries at once.
+
+    Only the visible rows exist as widgets (see VirtualList); the edits live in an
+    EditBuffer, so opening a month of entries is as fast as opening a day.
+    """
 
     def __init__(self, title: str, events: list, format_time_func) -> None:
         """Initialize batch edit dialog.
 
         Args:
             title: Dialog window title
-            events: List of aw_core.Event objects to edit
+            events: List of aw_core.Event objects to edit, sorted by timestamp
             format_time_func: Function to format timestamps for display
         """
-        self.events = events
+        self.buffer = EditBuffer(events)
         self.format_time = format_time_func
-        self.entries: list[ttk.Entry] = []
-        self.result: list[tuple] | None = None  # List of (event, new_value) tuples
+        self.result: list[tuple] | None = None  # List of (event, new_value or None to delete) tuples
         super().__init__(root, title)
 
+    def _time_label(self, index: int) -> str:
+        time_str = self.format_time(self.buffer.events[index].timestamp)
+        if self.buffer.multi_day:
+            return f"{self.buffer.days[index]:%a %m-%d} {time_str}"
+        return time_str
+
+    def _make_row(self, parent) -> _EditRow:
+        row = _EditRow(parent, time_width=16 if self.buffer.multi_day else 8)
+        row.entry.bind("<Down>", lambda _: self._move_focus(row, 1))
+        row.entry.bind("<Up>", lambda _: self._move_focus(row, -1))
+        return row
+
+    def _bind_row(self, row: _EditRow, index: int) -> None:
+        row.time.configure(text=self._time_label(index))
+        row.duration.configure(text=f"{self.buffer.events[index].duration.total_seconds() / 60:.0f}m")
+        row.entry.set_text(self.buffer.values[index])
+        row.deleted.set(self.buffer.deleted[index])
+
+    def _unbind_row(self, row: _EditRow, index: int) -> None:
+        self.buffer.set(index, row.entry.get(), row.deleted.get())
+
+    def _move_focus(self, row: _EditRow, step: int) -> str:
+        index = self.rows.index_of(row)
+        if index is not None and 0 <= index + step < len(self.buffer):
+            target = self.rows.see(index + step)
+            if target is not None:
+                target.entry.focus_set()
+        return "break"
+
     def body(self, master):
         master = ttk.Frame(master)
         master.grid()
 
-        # Create scrollable frame
-        canvas = tk.Canvas(master, width=600, height=400)
-        scrollbar = ttk.Scrollbar(master, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        # Mouse wheel scrolling
-        def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-
-        canvas.bind_all("<MouseWheel>", _on_mousewheel)
-        canvas.bind_all("<Button-4>", lambda e: canvas.yview_scroll(-1, "units"))
-        canvas.bind_all("<Button-5>", lambda e: canvas.yview_scroll(1, "units"))
-
-        # Header
-        ttk.Label(scrollable_frame, text="Time", font=("", 9, "bold")).grid(
-            row=0, column=0, padx=5, pady=2, sticky="w"
-        )
-        ttk.Label(scrollable_frame, text="Duration", font=("", 9, "bold")).grid(
-            row=0, column=1, padx=5, pady=2, sticky="w"
-        )
-        ttk.Label(scrollable_frame, text="Description", font=("", 9, "bold")).grid(
-            row=0, column=2, padx=5, pady=2, sticky="w"
-        )
-
-        # Create entry for each event
-        for i, event in enumerate(self.events):
-            row = i + 1
-            start_str = self.format_time(event.timestamp)
-            duration_min = event.duration.total_seconds() / 60
-            current_msg = event.data.get("message", "")
-
-            ttk.Label(scrollable_frame, text=start_str).grid(
-                row=row, column=0, padx=5, pady=2, sticky="w"
-            )
-            ttk.Label(scrollable_frame, text=f"{duration_min:.0f}m").grid(
-                row=row, column=1, padx=5, pady=2, sticky="w"
+        header = ttk.Frame(master)
+        header.grid(row=0, column=0, sticky="w")
+        for column, (text, width) in enumerate([("Time", 16 if self.buffer.multi_day else 8), ("Duration", 6),
+                                                ("Description", 50), ("Delete", 6)]):
+            ttk.Label(header, text=text, width=width, font=("", 9, "bold")).grid(
+                row=0, column=column, padx=5, pady=2, sticky="w"
             )
 
-            entry = EnhancedEntry(scrollable_frame, width=50)
-            entry.insert(0, current_msg)
-            entry.grid(row=row, column=2, padx=5, pady=2, sticky="ew")
-            self.entries.append(entry)
-
-        canvas.grid(row=0, column=0, sticky="nsew")
-        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.rows = VirtualList(master, self._make_row, self._bind_row, self._unbind_row,
+                                row_count=len(self.buffer), visible_rows=min(len(self.buffer), 15) or 1)
+        self.rows.grid(row=1, column=0, sticky="nsew")
 
         # Focus first entry
-        if self.entries:
-            return self.entries[0]
+        first = self.rows.widget_for(0)
+        if first is not None:
+            return first.entry
 
     def buttonbox(self):
         box = ttk.Frame(self)
@@ -481,11 +650,9 @@ class BatchEditDialog(simpledialog.Dialog):
         box.pack()
 
     def apply(self):
-        """Collect all edited values."""
-        self.result = []
-        for event, entry in zip(self.events, self.entries):
-            new_value = entry.get().strip()
-            self.result.append((event, new_value))
+        """Collect all edited values, None for rows marked for deletion."""
+        self.rows.flush()
+        self.result = self.buffer.result()
 
 
 def ask_batch_edit(title: str, events: list, format_time_func) -> list[tuple] | None:
@@ -497,15 +664,208 @@ def ask_batch_edit(title: str, events: list, format_time_func) -> list[tuple] |
         format_time_func: Function to format timestamps
 
     Returns:
-        List of (event, new_value) tuples, or None if cancelled
+        List of (event, new_value) tuples, with None as the new value of rows
+        marked for deletion, or None if cancelled
     """
     d = BatchEditDialog(title, events, format_time_func)
     return d.result
 
 
+class _ReviewRow(ttk.Frame):
+    """One recycled row of the backfill review dialog: select box, time, duration, entry and Split button."""
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.selected = tk.BooleanVar(value=True)
+        ttk.Checkbutton(self, variable=self.selected).grid(row=0, column=0, padx=5, pady=2)
+        self.time = ttk.Label(self, width=8)
+        self.time.grid(row=0, column=1, padx=5, pady=2, sticky="w")
+        self.duration = ttk.Label(self, width=8)
+        self.duration.grid(row=0, column=2, padx=5, pady=2, sticky="w")
+        self.entry = EnhancedEntry(self, width=50, abbreviations=abbreviations)
+        self.entry.grid(row=0, column=3, padx=5, pady=2, sticky="ew")
+        self.split = ttk.Button(self, text="Split", width=6)
+        self.split.grid(row=0, column=4, padx=5, pady=2)
+
+
+class BackfillReviewDialog(simpledialog.Dialog):
+    """Dialog for answering all unfilled AFK periods found by backfill at once.
+
+    Every period gets a row with its own entry and a Split button. Selected rows can
+    be filled with one description, marked as unknown or skipped in one go. Rows left
+    empty are not posted. Only the visible rows exist as widgets (see VirtualList),
+    so a long backfill opens as fast as a short one.
+    """
+
+    def __init__(self, title: str, events: list, history: list[str], format_time_func) -> None:
+        """Initialize the backfill review dialog.
+
+        Args:
+            title: Dialog window title
+            events: List of aw_core.Event objects (the AFK periods) to review
+            history: List of previous entries, for the split dialog
+            format_time_func: Function to format timestamps for display
+        """
+        self.events = events
+        self.history = history
+        self.format_time = format_time_func
+        self.values: list[str] = [""] * len(events)
+        self.selected: list[bool] = [True] * len(events)
+        self.splits: dict[int, list] = {}  # Row index -> list of ActivityLine objects
+        self.result: list[tuple] | None = None  # List of (event, description or activities) tuples
+        super().__init__(root, title)
+
+    def _make_row(self, parent) -> _ReviewRow:
+        row = _ReviewRow(parent)
+        row.split.configure(command=lambda: self.split_row(self.rows.index_of(row)))
+        return row
+
+    def _bind_row(self, row: _ReviewRow, index: int) -> None:
+        event = self.events[index]
+        row.selected.set(self.selected[index])
+        row.time.configure(text=self.format_time(event.timestamp))
+        row.duration.configure(text=format_duration(event.duration))
+        row.entry.configure(state=tk.NORMAL)
+        row.entry.set_text(self.values[index])
+        if index in self.splits:
+            row.entry.configure(state=tk.DISABLED)
+
+    def _unbind_row(self, row: _ReviewRow, index: int) -> None:
+        self.selected[index] = row.selected.get()
+        if index not in self.splits:
+            self.values[index] = row.entry.get()
+
+    def body(self, master):
+        master = ttk.Frame(master)
+        master.grid()
+
+        # Bulk actions on the selected rows
+        bulk = ttk.Frame(master)
+        bulk.grid(row=0, column=0, sticky="ew", pady=(0, 5))
+        self.select_all = tk.BooleanVar(value=True)
+        ttk.Checkbutton(bulk, text="All", variable=self.select_all, command=self.toggle_all).pack(side=tk.LEFT)
+        self.bulk_entry = EnhancedEntry(bulk, width=30)
+        self.bulk_entry.pack(side=tk.LEFT, padx=5)
+        self.bulk_entry.bind("<Return>", self.apply_to_selected)
+        ttk.Button(bulk, text="Apply to selected", command=self.apply_to_selected).pack(side=tk.LEFT, padx=2)
+        ttk.Button(bulk, text="Unknown", command=self.mark_selected_unknown).pack(side=tk.LEFT, padx=2)
+        ttk.Button(bulk, text="Skip", command=self.skip_selected).pack(side=tk.LEFT, padx=2)
+
+        header = ttk.Frame(master)
+        header.grid(row=1, column=0, sticky="w")
+        for column, (text, width) in enumerate([("", 2), ("Time", 8), ("Duration", 8), ("Description", 50)]):
+            ttk.Label(header, text=text, width=width, font=("", 9, "bold")).grid(
+                row=0, column=column, padx=5, pady=2, sticky="w"
+            )
+
+        self.rows = VirtualList(master, self._make_row, self._bind_row, self._unbind_row,
+                                row_count=len(self.events), visible_rows=min(len(self.events), 15) or 1)
+        self.rows.grid(row=2, column=0, sticky="nsew")
+
+        # Focus first entry
+        first = self.rows.widget_for(0)
+        if first is not None:
+            return first.entry
+
+    def _selected_rows(self) -> list[int]:
+        return [i for i, selected in enumerate(self.selected) if selected]
+
+    def _set_row(self, i: int, text: str) -> None:
+        self.splits.pop(i, None)
+        self.values[i] = text
+
+    def toggle_all(self) -> None:
+        self.selected = [self.select_all.get()] * len(self.events)
+        self.rows.refresh()
+
+    def apply_to_selected(self, event=None) -> None:  # noqa: ARG002
+        text = self.bulk_entry.get().strip()
+        if not text:
+            return
+        self.rows.flush()
+        for i in self._selected_rows():
+            self._set_row(i, text)
+        self.rows.refresh()
+
+    def mark_selected_unknown(self) -> None:
+        self.rows.flush()
+        for i in self._selected_rows():
+            self._set_row(i, "UNKNOWN")
+        self.rows.refresh()
+
+    def skip_selected(self) -> None:
+        self.rows.flush()
+        for i in self._selected_rows():
+            self._set_row(i, "")
+            self.selected[i] = False
+        self.rows.refresh()
+
+    def split_row(self, i: int | None) -> None:
+        # Import here to avoid circular dependency
+        from aw_watcher_afk_prompt.split_dialog import ask_split_activities
+
+        if i is None:
+            return
+        event = self.events[i]
+        prompt = f"{self.format_time(event.timestamp)} ({format_duration(event.duration)})"
+        result = ask_split_activities(self.title(), prompt, event.timestamp,
+                                      event.duration.total_seconds(), self.history, parent=self)
+        self.rows.flush()
+        if isinstance(result, str):
+            self._set_row(i, result)
+        elif result:
+            self._set_row(i, f"(split into {len(result)} activities)")
+            self.splits[i] = result
+        self.rows.refresh()
+
+    def buttonbox(self):
+        box = ttk.Frame(self)
+
+        w = ttk.Button(box, text="Save All", width=12, command=self.ok, default=tk.ACTIVE)
+        w.pack(side=tk.LEFT, padx=5, pady=5)
+        w = ttk.Button(box, text="Cancel", width=12, command=self.cancel)
+        w.pack(side=tk.LEFT, padx=5, pady=5)
+
+        self.bind("<Escape>", self.cancel)
+
+        box.pack()
+
+    def apply(self):
+        """Collect the answered rows."""
+        self.rows.flush()
+        self.result = []
+        for i, (event, value) in enumerate(zip(self.events, self.values)):
+            if i in self.splits:
+                self.result.append((event, self.splits[i]))
+            elif value := value.strip():
+                self.result.append((event, value))
+
+
+def ask_backfill_review(title: str, events: list, history: list[str], format_time_func) -> list[tuple] | None:
+    """Show the backfill review dialog for the given AFK periods.
+
+    Args:
+        title: Dialog title
+        events: List of AFK periods to review
+        history: List of previous entries, for the split dialog
+        format_time_func: Function to format timestamps
+
+    Returns:
+        List of (event, answer) tuples for the answered periods, where the answer is a
+        description or a list of ActivityLine objects; None if cancelled
+    """
+    d = BackfillReviewDialog(title, events, history, format_time_func)
+    return d.result
+
+
 def ask_string(title: str, prompt: str, history: list[str],
                afk_start=None, afk_duration_seconds=None,
-               initial_value: str | None = None) -> str | None | tuple:
+               initial_value: str | None = None,
+               split_activities: list | None = None,
+               suggestions: SuggestionIndex | None = None,
+               search_index: HistoryIndex | None = None,
+               predictions: list[str] | None = None,
+               context: Future[WindowContext] | None = None) -> str | None | tuple:
     """Ask for a string input, with optional split mode support.
 
     Args:
@@ -515,6 +875,11 @@ def ask_string(title: str, prompt: str, history: list[str],
         afk_start: Start time of AFK period (optional, enables split mode)
         afk_duration_seconds: Duration of AFK period in seconds (optional)
         initial_value: Pre-fill the entry with this value (for editing)
+        split_activities: ActivityLine objects to pre-fill split mode with (optional)
+        suggestions: Earlier messages, for inline completion and filtering the history (optional)
+        search_index: Every message ever posted, for the reverse search with Ctrl-R (optional)
+        predictions: The likeliest answers, best first; the first is pre-filled (optional)
+        context: The windows around the gap, being fetched; shown when they arrive (optional)
 
     Returns:
         String input from user, or None if cancelled
@@ -524,7 +889,8 @@ def ask_string(title: str, prompt: str, history: list[str],
     # Loop to handle switching between single and split modes
     initial_text = initial_value
     while True:
-        d = AWAfkPromptDialog(title, prompt, history, afk_start, afk_duration_seconds)
+        d = AWAfkPromptDialog(title, prompt, history, afk_start, afk_duration_seconds, suggestions, search_index,
+                              None if initial_text else predictions, context)
 
         # Pre-fill with initial value or text from split mode
         if initial_text:
@@ -542,7 +908,8 @@ def ask_string(title: str, prompt: str, history: list[str],
 
             # Show split dialog
             result = ask_split_activities(title, prompt, afk_start,
-                                             afk_duration_seconds, history)
+                                             afk_duration_seconds, history,
+                                             initial_activities=split_activities)
 
             # Check what the split dialog returned
             if result is None:
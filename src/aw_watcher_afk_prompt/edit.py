@@ -0,0 +1,290 @@
+"""Fetching, diffing and saving the entries of edit mode.
+
+Edit mode used to fetch at most 1000 events and write every changed row back with
+its own request. Here the range is fetched in concurrent day windows, each paged
+until it is exhausted, and the edits are reduced to a change set: only rows whose
+message changed, rows to delete and neighbouring rows that became identical (which
+are merged into one) go over the wire, updates in batched inserts.
+
+Retagging re-applies the category rules to the entries already posted the same
+way: reading the bucket page by page and writing back only the changed entries.
+
+Like report.py this module is used before and after the dialog and must not
+import tkinter.
+"""
+
+import datetime
+import logging
+from collections.abc import Callable, Hashable, Sequence
+from copy import deepcopy
+from dataclasses import dataclass, field
+
+import aw_core
+from aw_client.client import ActivityWatchClient
+
+from aw_watcher_afk_prompt.backfill import split_range
+from aw_watcher_afk_prompt.classify import Classifier
+from aw_watcher_afk_prompt.core import DATA_KEY, get_events_concurrently, get_utc_now
+from aw_watcher_afk_prompt.history import scan_events
+from aw_watcher_afk_prompt.utils import LOCAL_TIMEZONE
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+"""Events per request when fetching the entries to edit."""
+FETCH_WINDOW = datetime.timedelta(days=1)
+BATCH_SIZE = 500
+"""Updated events per insert request."""
+MERGE_TOLERANCE = datetime.timedelta(seconds=1)
+"""Entries with the same data at most this far apart are merged after an edit."""
+
+
+def _key(event: aw_core.Event) -> Hashable:
+    return event.id if event.id is not None else (event.timestamp, event.duration)
+
+
+def fetch_events(client: ActivityWatchClient, bucket_id: str, start: datetime.datetime, end: datetime.datetime,
+                 page_size: int = PAGE_SIZE, window: datetime.timedelta = FETCH_WINDOW) -> list[aw_core.Event]:
+    """Fetch all events of a bucket overlapping [start, end), oldest first.
+
+    Every window is fetched concurrently. A window that returns a full page is
+    fetched again up to the oldest event of that page, until a page comes back
+    short, so no events are silently cut off.
+
+    Args:
+        client: The ActivityWatch client
+        bucket_id: The bucket to fetch from
+        start: Start of the range
+        end: End of the range
+        page_size: Maximum number of events per request
+        window: Length of the windows fetched concurrently
+
+    Returns:
+        The events, deduplicated by id and sorted by timestamp
+    """
+    pending = dict(enumerate(split_range(start, end, window)))
+    events: dict[Hashable, aw_core.Event] = {}
+    requests = 0
+    while pending:
+        results = get_events_concurrently(client, {
+            i: (bucket_id, {"limit": page_size, "start": window_start, "end": window_end})
+            for i, (window_start, window_end) in pending.items()
+        })
+        requests += len(results)
+        next_pending = {}
+        for i, result in results.items():
+            if isinstance(result, Exception):
+                raise result
+            new = [event for event in result if _key(event) not in events]
+            events.update((_key(event), event) for event in result)
+            if len(result) < page_size:
+                continue
+            if not new:
+                logger.warning(f"Stopped paging {bucket_id} at {pending[i][1]}: a full page without new events")
+                continue
+            # The server returns the newest events first, so continue below the oldest one.
+            next_pending[i] = (pending[i][0], min(event.timestamp for event in result))
+        pending = next_pending
+    logger.debug(f"Fetched {len(events)} events from {bucket_id} in {requests} requests")
+    return sorted(events.values(), key=lambda event: event.timestamp)
+
+
+class EditBuffer:
+    """The edit state of the rows of edit mode, kept apart from the widgets.
+
+    The batch edit dialog only has widgets for the visible rows; everything typed
+    is saved here when a row scrolls out of view, so the dialog can show any
+    number of entries.
+    """
+
+    def __init__(self, events: Sequence[aw_core.Event]):
+        self.events = list(events)
+        self.values = [event.data.get(DATA_KEY, "") for event in self.events]
+        self.deleted = [False] * len(self.events)
+        self.days = [event.timestamp.astimezone(LOCAL_TIMEZONE).date() for event in self.events]
+        self.multi_day = len(set(self.days)) > 1
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def set(self, index: int, value: str, deleted: bool = False) -> None:
+        self.values[index] = value
+        self.deleted[index] = deleted
+
+    def is_dirty(self, index: int) -> bool:
+        return self.deleted[index] or self.values[index] != self.events[index].data.get(DATA_KEY, "")
+
+    def dirty_count(self) -> int:
+        return sum(self.is_dirty(i) for i in range(len(self)))
+
+    def result(self) -> list[tuple[aw_core.Event, str | None]]:
+        """The (event, new message or None to delete) pairs, for compute_changes()."""
+        return [(event, None if deleted else value.strip())
+                for event, value, deleted in zip(self.events, self.values, self.deleted, strict=True)]
+
+
+@dataclass
+class ChangeSet:
+    """The writes needed to save the edits of edit mode.
+
+    Attributes:
+        updates: Events to write back (by id) with their new message or duration
+        deletions: Events to delete, including the ones merged into a neighbour
+        merged: How many of the deletions are merges rather than deleted rows
+    """
+
+    updates: list[aw_core.Event] = field(default_factory=list)
+    deletions: list[aw_core.Event] = field(default_factory=list)
+    merged: int = 0
+
+    def __len__(self) -> int:
+        return len(self.updates) + len(self.deletions)
+
+    def summary(self) -> str:
+        changed = len(self.updates)
+        deleted = len(self.deletions) - self.merged
+        return f"{changed} updated, {deleted} deleted, {self.merged} merged"
+
+
+def compute_changes(edits: Sequence[tuple[aw_core.Event, str | None]],
+                    merge_tolerance: datetime.timedelta = MERGE_TOLERANCE,
+                    classifier: Classifier | None = None) -> ChangeSet:
+    """Compute the change set for the edited rows of edit mode.
+
+    A row is updated when its message changed and deleted when its new value is
+    None. When an edit leaves a row with the same data as the row before it and
+    the two touch (within merge_tolerance), the later row is merged into the
+    earlier one: the earlier one is extended and the later one deleted. Rows that
+    were already identical before the edit are left alone. Edited rows get the
+    category and tags of their new message, like posted answers do.
+
+    The events passed in are not modified.
+
+    Args:
+        edits: (event, new message or None to delete) pairs, as returned by ask_batch_edit
+        merge_tolerance: How far apart two rows may be to be merged
+        classifier: The category rules to re-apply to edited rows (optional)
+
+    Returns:
+        The change set; empty if nothing was edited
+    """
+    changes = ChangeSet()
+    updates: dict[int, aw_core.Event] = {}
+    last: aw_core.Event | None = None
+    last_edited = False
+
+    for event, new_value in sorted(edits, key=lambda edit: edit[0].timestamp):
+        if new_value is None:
+            if event.id is None:
+                logger.warning(f"Cannot delete the entry at {event.timestamp}: it has no id")
+            else:
+                changes.deletions.append(event)
+            continue
+
+        edited = new_value != event.data.get(DATA_KEY, "")
+        if edited:
+            event = deepcopy(event)
+            event.data[DATA_KEY] = new_value
+            if classifier is not None:
+                classifier.apply(event, new_value)
+
+        if (last is not None and (edited or last_edited) and event.id is not None
+                and last.data == event.data
+                and event.timestamp - (last.timestamp + last.duration) <= merge_tolerance):
+            if id(last) not in updates:
+                last = deepcopy(last)
+            last.duration = max(last.timestamp + last.duration, event.timestamp + event.duration) - last.timestamp
+            updates[id(last)] = last
+            changes.deletions.append(event)
+            changes.merged += 1
+            last_edited = True
+            continue
+
+        if edited:
+            updates[id(event)] = event
+        last, last_edited = event, edited
+
+    changes.updates = list(updates.values())
+    return changes
+
+
+def apply_changes(client: ActivityWatchClient, bucket_id: str, changes: ChangeSet, batch_size: int = BATCH_SIZE,
+                  progress: Callable[[int, int], None] | None = None) -> None:
+    """Write a change set to the server.
+
+    Updates go first, in inserts of up to batch_size events (the server replaces
+    events with the same id), then the deletions. That way a failure half way
+    never loses an entry, at worst a merged one is left behind.
+
+    Args:
+        client: The ActivityWatch client
+        bucket_id: The bucket the events belong to
+        changes: The change set from compute_changes()
+        batch_size: Maximum number of events per insert
+        progress: Called with (done, total) after every request
+    """
+    total = len(changes)
+    done = 0
+    try:
+        for i in range(0, len(changes.updates), batch_size):
+            batch = changes.updates[i:i + batch_size]
+            client.insert_events(bucket_id, batch)
+            done += len(batch)
+            if progress:
+                progress(done, total)
+        # The REST API has no batch delete; deletions are rare compared to updates.
+        for event in changes.deletions:
+            client.delete_event(bucket_id, event.id)
+            done += 1
+            if progress:
+                progress(done, total)
+    except Exception as e:
+        logger.error(f"Failed to save the edits after {done}/{total} changes: {e}")
+        raise
+    logger.info(f"Saved edits: {changes.summary()}")
+
+
+def retag(client: ActivityWatchClient, bucket_id: str, classifier: Classifier,
+          start: datetime.datetime | None = None, end: datetime.datetime | None = None,
+          page_size: int = PAGE_SIZE, batch_size: int = BATCH_SIZE,
+          progress: Callable[[int, int], None] | None = None) -> int:
+    """Re-apply the category rules to the entries of a bucket.
+
+    The bucket is read page by page, newest first, and only the entries whose
+    category or tags changed are written back, in inserts of up to batch_size
+    events (the server replaces events with the same id).
+
+    Args:
+        client: The ActivityWatch client
+        bucket_id: Our bucket
+        classifier: The category rules
+        start: Start of the range, or None for the whole bucket
+        end: End of the range (default: now)
+        page_size: Events per read
+        batch_size: Maximum number of events per insert
+        progress: Called with (entries read, entries updated) after every write
+
+    Returns:
+        The number of entries updated
+    """
+    read = updated = 0
+    pending: list[aw_core.Event] = []
+
+    def write(batch: list[aw_core.Event]) -> None:
+        nonlocal updated
+        client.insert_events(bucket_id, batch)
+        updated += len(batch)
+        if progress:
+            progress(read, updated)
+
+    for page in scan_events(client, bucket_id, start, end or get_utc_now(), page_size):
+        read += len(page)
+        pending.extend(event for event in page
+                       if event.id is not None and classifier.apply(event, event.data.get(DATA_KEY, "")))
+        while len(pending) >= batch_size:
+            write(pending[:batch_size])
+            pending = pending[batch_size:]
+    if pending:
+        write(pending)
+    logger.info(f"Retagged {updated} of {read} entries in {bucket_id}")
+    return updated
@@ -0,0 +1,284 @@
+"""Persistent search index over every message ever posted to our bucket.
+
+The in-memory history only covers the cache window. This index lives in an
+SQLite database in the config directory and holds every distinct message with
+its uses and every prefix of its lowercase words. It is filled once by a paged
+scan of the bucket, after that only the events since the last scan are fetched
+on startup, and every post adds its message right away.
+
+Lookups match every word of the query as a prefix of a word of the message
+("tea mee" finds "Team meeting"), most recently used first. The prefix table is
+indexed by (prefix, last use), so a lookup reads the matches of one word of the
+query in ranking order and stops after the first `limit` that match the other
+words; it does not depend on the size of the history and takes well under a
+millisecond even with years of entries.
+"""
+
+import datetime
+import logging
+import re
+import sqlite3
+import threading
+from collections.abc import Hashable, Iterable, Iterator
+from pathlib import Path
+
+import appdirs
+import aw_core
+from aw_client.client import ActivityWatchClient
+
+from aw_watcher_afk_prompt.core import DATA_KEY
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+"""Events per request when scanning the bucket."""
+RESCAN_MARGIN = datetime.timedelta(days=1)
+"""How far before the last scan to start the next one, to catch late or edited entries."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    message TEXT NOT NULL,
+    uses INTEGER NOT NULL DEFAULT 0,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_last_used ON messages (last_used);
+CREATE TABLE IF NOT EXISTS uses (
+    message_id INTEGER NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (message_id, used)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS prefixes (
+    prefix TEXT NOT NULL,
+    message_id INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (prefix, message_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS prefixes_ranked ON prefixes (prefix, last_used DESC);
+CREATE INDEX IF NOT EXISTS prefixes_message ON prefixes (message_id);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _key(event: aw_core.Event) -> Hashable:
+    return event.id if event.id is not None else (event.timestamp, event.duration)
+
+
+def tokenize(text: str) -> list[str]:
+    """The distinct lowercase words of a text, in order."""
+    return list(dict.fromkeys(re.findall(r"\w+", text.lower())))
+
+
+def _prefixes(text: str) -> set[str]:
+    return {token[:i] for token in tokenize(text) for i in range(1, len(token) + 1)}
+
+
+def scan_events(client: ActivityWatchClient, bucket_id: str, start: datetime.datetime | None,
+                end: datetime.datetime, page_size: int = PAGE_SIZE) -> Iterator[list[aw_core.Event]]:
+    """Read the events of a bucket in [start, end] (all before end if start is None), newest first.
+
+    Args:
+        client: The ActivityWatch client
+        bucket_id: The bucket to read
+        start: Start of the range, or None for the whole bucket
+        end: End of the range
+        page_size: Events per request
+
+    Yields:
+        Pages of events, without the events already yielded by an earlier page
+    """
+    seen: set[Hashable] = set()
+    while True:
+        kwargs = {"limit": page_size, "end": end}
+        if start is not None:
+            kwargs["start"] = start
+        page = client.get_events(bucket_id, **kwargs)
+        # Pages overlap by the events at their boundary
+        new = [event for event in page if _key(event) not in seen]
+        seen.update(_key(event) for event in new)
+        if new:
+            yield new
+        if len(page) < page_size:
+            return
+        oldest = min(event.timestamp for event in page)
+        if oldest >= end:
+            logger.warning(f"Stopped scanning {bucket_id} at {end}: a full page without older events")
+            return
+        end = oldest
+
+
+class HistoryIndex:
+    """Every message posted to our bucket, searchable by word prefixes."""
+
+    def __init__(self, path: Path | None = None, namespace: str | None = None):
+        """
+        Args:
+            path: The database file (default: history.sqlite3 in the config directory)
+            namespace: Keep a separate index per namespace (e.g. per aw-server endpoint)
+        """
+        if path is None:
+            config_dir = Path(appdirs.user_config_dir("aw-watcher-afk-prompt"))
+            config_dir.mkdir(parents=True, exist_ok=True)
+            path = config_dir / ("history.sqlite3" if namespace is None else f"history_{namespace}.sqlite3")
+        self.path = path
+        # The index is made on whichever thread connects to the server (a worker one
+        # with several [[servers]]) and used from the main and poller threads, so
+        # the connection is shared and every use of it holds the lock.
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def _add(self, message: str, used: datetime.datetime) -> None:
+        message = " ".join(message.split())
+        key = message.lower()
+        if not key:
+            return
+        timestamp = used.timestamp()
+        row = self._db.execute("SELECT id, last_used FROM messages WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            message_id = self._db.execute(
+                "INSERT INTO messages (key, message, last_used) VALUES (?, ?, ?)", (key, message, timestamp)
+            ).lastrowid
+            self._db.executemany("INSERT INTO prefixes (prefix, message_id, last_used) VALUES (?, ?, ?)",
+                                 [(prefix, message_id, timestamp) for prefix in _prefixes(key)])
+        else:
+            message_id, last_used = row
+            if timestamp > last_used:
+                # Keep the latest spelling
+                self._db.execute("UPDATE messages SET message = ?, last_used = ? WHERE id = ?",
+                                 (message, timestamp, message_id))
+                self._db.execute("UPDATE prefixes SET last_used = ? WHERE message_id = ?", (timestamp, message_id))
+        if self._db.execute("INSERT OR IGNORE INTO uses (message_id, used) VALUES (?, ?)",
+                            (message_id, timestamp)).rowcount:
+            self._db.execute("UPDATE messages SET uses = uses + 1 WHERE id = ?", (message_id,))
+
+    def add(self, message: str, used: datetime.datetime) -> None:
+        """Record a use of a message. Adding the same use twice counts it once."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._add(message, used)
+
+    def add_many(self, uses: Iterable[tuple[str, datetime.datetime]]) -> None:
+        """Record many (message, time used) pairs in one transaction."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            for message, used in uses:
+                self._add(message, used)
+
+    def search(self, query: str, limit: int = 20) -> list[str]:
+        """Messages with a word starting with each word of the query, most recently used first.
+
+        An empty query returns the most recently used messages.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            with self._lock:
+                rows = self._db.execute("SELECT message FROM messages ORDER BY last_used DESC LIMIT ?",
+                                        (limit,)).fetchall()
+            return [message for (message,) in rows]
+        # Walk the matches of the longest (likely the rarest) word in ranking order
+        first, *others = sorted(tokens, key=len, reverse=True)
+        conditions = "".join(
+            " AND EXISTS (SELECT 1 FROM prefixes q WHERE q.prefix = ? AND q.message_id = p.message_id)"
+            for _ in others)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT m.message FROM prefixes p INDEXED BY prefixes_ranked JOIN messages m ON m.id = p.message_id"
+                f" WHERE p.prefix = ?{conditions} ORDER BY p.last_used DESC LIMIT ?",
+                (first, *others, limit),
+            ).fetchall()
+        return [message for (message,) in rows]
+
+    @property
+    def scanned_until(self) -> datetime.datetime | None:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE name = 'scanned_until'").fetchone()
+        return datetime.datetime.fromisoformat(row[0]) if row else None
+
+    def sync(self, client: ActivityWatchClient, bucket_id: str, now: datetime.datetime | None = None,
+             page_size: int = PAGE_SIZE) -> int:
+        """Add the messages posted since the last scan (or ever, on the first run).
+
+        Returns:
+            The number of events scanned
+        """
+        now = now or datetime.datetime.now(datetime.UTC)
+        start = self.scanned_until - RESCAN_MARGIN if self.scanned_until else None
+        scanned = 0
+        for page in scan_events(client, bucket_id, start, now, page_size):
+            self.add_many((event.data.get(DATA_KEY, ""), event.timestamp + event.duration) for event in page)
+            scanned += len(page)
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('scanned_until', ?)",
+                             (now.isoformat(),))
+        logger.info(f"History index: scanned {scanned} events, {len(self)} distinct messages")
+        return scanned
+
+
+class ReverseSearch:
+    """The state of a shell-style reverse search (Ctrl-R) over a HistoryIndex.
+
+    Kept apart from the dialog so it can be tested without Tk. Typing narrows the
+    query, next() steps to the next older match of the same query.
+    """
+
+    def __init__(self, index: HistoryIndex, original: str = "", limit: int = 50):
+        """
+        Args:
+            index: The index to search
+            original: The text of the entry before the search, restored on cancel
+            limit: Maximum number of matches to step through
+        """
+        self.index = index
+        self.original = original
+        self.limit = limit
+        self.query = ""
+        self.matches: list[str] = []
+        self.position = 0
+        self._search()
+
+    def _search(self) -> None:
+        self.matches = self.index.search(self.query, self.limit)
+        self.position = 0
+
+    @property
+    def current(self) -> str | None:
+        """The match shown, or None if nothing matches the query."""
+        return self.matches[self.position] if self.matches else None
+
+    @property
+    def label(self) -> str:
+        failed = "failed " if self.current is None else ""
+        return f"({failed}reverse-i-search)`{self.query}':"
+
+    def type(self, text: str) -> None:
+        self.query += text
+        self._search()
+
+    def backspace(self) -> None:
+        self.query = self.query[:-1]
+        self._search()
+
+    def next(self) -> bool:
+        """Step to the next older match.
+
+        Returns:
+            False if there is none (the current match stays)
+        """
+        if self.position + 1 >= len(self.matches):
+            return False
+        self.position += 1
+        return True
@@ -0,0 +1,122 @@
+"""Sorted interval index over events.
+
+Keeps events sorted by start time so that "which events overlap this time range"
+is a binary search plus a short scan, instead of a scan over everything we know.
+"""
+
+import bisect
+import datetime
+from collections.abc import Iterable, Iterator
+
+import aw_core
+
+from aw_watcher_afk_prompt import columnar
+
+
+class IntervalIndex:
+    """Events sorted by start time with logarithmic overlap lookups.
+
+    To find events overlapping a range we need every event starting before the range
+    end and ending after the range start. Since no event is longer than the longest
+    one in the index, only events starting less than that duration before the range
+    start can qualify, which bounds the scan by time instead of by count.
+    """
+
+    def __init__(self, events: Iterable[aw_core.Event] = ()):
+        self._events = sorted(events, key=lambda e: e.timestamp)
+        self._starts = [e.timestamp for e in self._events]
+        self._max_duration = max((e.duration for e in self._events), default=datetime.timedelta(0))
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self) -> Iterator[aw_core.Event]:
+        """Iterate from earliest to most recent."""
+        return iter(self._events)
+
+    def __reversed__(self) -> Iterator[aw_core.Event]:
+        return reversed(self._events)
+
+    def add(self, event: aw_core.Event) -> None:
+        """Insert an event, keeping the index sorted."""
+        index = bisect.bisect_right(self._starts, event.timestamp)
+        self._starts.insert(index, event.timestamp)
+        self._events.insert(index, event)
+        self._max_duration = max(self._max_duration, event.duration)
+
+    def overlapping(self, start: datetime.datetime, end: datetime.datetime) -> list[aw_core.Event]:
+        """Return the events overlapping the range [start, end), sorted by start."""
+        first = bisect.bisect_left(self._starts, start - self._max_duration)
+        last = bisect.bisect_left(self._starts, end)
+        return [e for e in self._events[first:last] if e.timestamp + e.duration > start]
+
+    def last_before(self, time: datetime.datetime) -> aw_core.Event | None:
+        """Return the most recent event starting before the given time."""
+        index = bisect.bisect_left(self._starts, time)
+        return self._events[index - 1] if index else None
+
+    def trim(self, before: datetime.datetime) -> None:
+        """Forget events that ended before the given time."""
+        # Events ending before `before` all start before it, so only that prefix needs checking.
+        cut = bisect.bisect_left(self._starts, before)
+        keep = [e for e in self._events[:cut] if e.timestamp + e.duration >= before]
+        self._events = keep + self._events[cut:]
+        self._starts = [e.timestamp for e in self._events]
+        self._max_duration = max((e.duration for e in self._events), default=datetime.timedelta(0))
+
+
+def overlaps_significantly(a: aw_core.Event, b: aw_core.Event, overlap_thresh: float = 0.95) -> bool:
+    """Check whether two events overlap by more than overlap_thresh of the shorter one.
+
+    We compare against the SMALLER of the two durations because gaps can extend over
+    time as new activity data comes in. If we compared against the larger duration,
+    we'd fail to recognize the same gap and ask the user again.
+    """
+    overlap = min(a.timestamp + a.duration, b.timestamp + b.duration) - max(a.timestamp, b.timestamp)
+    if overlap.total_seconds() <= 0:
+        return False
+    return overlap / min(a.duration, b.duration) > overlap_thresh
+
+
+class CoverageIndex(IntervalIndex):
+    """Every interval known to be handled: posted to the server, persisted locally or split-posted.
+
+    Answers "has this gap already been handled" for single gaps, and for a whole batch
+    of gaps in one merge pass over the index.
+    """
+
+    def covers(self, event: aw_core.Event, overlap_thresh: float = 0.95) -> bool:
+        """Check whether a handled interval overlaps significantly with the event."""
+        return any(
+            overlaps_significantly(handled, event, overlap_thresh)
+            for handled in self.overlapping(event.timestamp, event.timestamp + event.duration)
+        )
+
+    def covers_batch(self, events: list[aw_core.Event], overlap_thresh: float = 0.95) -> list[bool]:
+        """Like covers(), for many events at once.
+
+        Sweeps the events and the index together in start order, keeping the handled
+        intervals that are still open, so the cost is one pass over both plus the
+        overlapping pairs. Large batches go to the columnar engine if numpy is available.
+
+        Returns:
+            One flag per event, in the order of the input
+        """
+        result = [False] * len(events)
+        if not events or not self._events:
+            return result
+        if columnar.use_columnar(len(events) + len(self._events)):
+            return columnar.covered_events(events, self._events, overlap_thresh)
+        order = sorted(range(len(events)), key=lambda i: events[i].timestamp)
+        next_index = bisect.bisect_left(self._starts, events[order[0]].timestamp - self._max_duration)
+        open_intervals: list[aw_core.Event] = []
+        for i in order:
+            event = events[i]
+            start, end = event.timestamp, event.timestamp + event.duration
+            while next_index < len(self._events) and self._starts[next_index] < end:
+                open_intervals.append(self._events[next_index])
+                next_index += 1
+            # Starts only increase, so intervals ending before this start are done for good.
+            open_intervals = [h for h in open_intervals if h.timestamp + h.duration > start]
+            result[i] = any(overlaps_significantly(h, event, overlap_thresh) for h in open_intervals)
+        return result
@@ -0,0 +1,212 @@
+"""Guessing the answer to a prompt from the answers given at similar times.
+
+Many absences are routine: lunch around noon for about 40 minutes, the standup
+at 09:30 on weekdays. The PredictionModel counts the past answers per weekday,
+half-hour slot of the day and duration bucket, plus coarser combinations of
+them so that an answer given at 12:00 on Mondays is also offered at 12:00 on
+Tuesdays, only with less weight. Predicting is a handful of dictionary lookups,
+so it never delays the prompt.
+
+The counts are cached in the config directory. On startup only the events
+posted since the last scan are read from the bucket, and every post is counted
+right away and saved a moment later, so a batch of posts costs one write.
+"""
+
+import atexit
+import bisect
+import datetime
+import heapq
+import json
+import logging
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import appdirs
+import aw_core
+from aw_client.client import ActivityWatchClient
+
+from aw_watcher_afk_prompt.core import DATA_KEY
+from aw_watcher_afk_prompt.history import PAGE_SIZE, scan_events
+from aw_watcher_afk_prompt.utils import LOCAL_TIMEZONE, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+SLOT = datetime.timedelta(minutes=30)
+"""Width of the time-of-day buckets."""
+DURATION_BOUNDS = [datetime.timedelta(minutes=minutes) for minutes in (10, 20, 40, 80, 160)]
+"""Upper bounds of the duration buckets; longer absences share the last bucket."""
+SAVE_DELAY = 1.0
+"""Seconds to wait after the last post before writing the cache."""
+IGNORED = {"unknown"}
+"""Answers that say nothing about what one was doing."""
+
+# (feature, weight): an exact match counts most, the neighbouring slots least
+_FEATURES = [("wsd", 4.0), ("ws", 2.0), ("sd", 2.0), ("s", 1.0), ("sd-", 0.5), ("sd+", 0.5)]
+
+
+def _normalize(message: str) -> str:
+    return " ".join(message.split()).lower()
+
+
+def _keys(start: datetime.datetime, duration: datetime.timedelta) -> Iterator[tuple[str, float]]:
+    """The feature keys of an absence with their weights."""
+    local = start.astimezone(LOCAL_TIMEZONE)
+    weekday = local.weekday()
+    slot = (local.hour * 60 + local.minute) // int(SLOT.total_seconds() // 60)
+    slots = int(datetime.timedelta(days=1) / SLOT)
+    length = bisect.bisect_left(DURATION_BOUNDS, duration)
+    values = {
+        "wsd": f"w{weekday} s{slot} d{length}",
+        "ws": f"w{weekday} s{slot}",
+        "sd": f"s{slot} d{length}",
+        "s": f"s{slot}",
+        "sd-": f"s{(slot - 1) % slots} d{length}",
+        "sd+": f"s{(slot + 1) % slots} d{length}",
+    }
+    for feature, weight in _FEATURES:
+        yield values[feature], weight
+
+
+class PredictionModel:
+    """Counts of the past answers by weekday, time of day and duration."""
+
+    def __init__(self, path: Path | None = None, namespace: str | None = None, save_delay: float = SAVE_DELAY):
+        """
+        Args:
+            path: The cache file (default: prediction.json in the config directory)
+            namespace: Keep a separate model per namespace (e.g. per aw-server endpoint)
+            save_delay: Seconds to wait after the last post before saving
+        """
+        if path is None:
+            config_dir = Path(appdirs.user_config_dir("aw-watcher-afk-prompt"))
+            config_dir.mkdir(parents=True, exist_ok=True)
+            path = config_dir / ("prediction.json" if namespace is None else f"prediction_{namespace}.json")
+        self.path = path
+        self.counts: dict[str, dict[int, int]] = {}
+        """Feature key -> answer (index in messages) -> number of times it was given"""
+        self.messages: list[str] = []
+        """The distinct answers as last typed"""
+        self._ids: dict[str, int] = {}
+        """Normalized answer -> index in messages"""
+        self._totals: dict[str, int] = {}
+        """Feature key -> number of answers counted for it"""
+        self.scanned_until: datetime.datetime | None = None
+        self._posted: set[str] = set()
+        """Start times of the events counted after the last scan, not to count them again on the next one"""
+        self._save_delay = save_delay
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open() as f:
+                data = json.load(f)
+            # JSON object keys are strings
+            self.counts = {feature: {int(i): count for i, count in answers.items()}
+                           for feature, answers in data["counts"].items()}
+            self.messages = data["messages"]
+            self._posted = set(data["posted"])
+            if data["scanned_until"]:
+                self.scanned_until = datetime.datetime.fromisoformat(data["scanned_until"])
+        except (json.JSONDecodeError, OSError, KeyError, TypeError, ValueError) as e:
+            # A cache: start over and rescan the bucket
+            logger.warning(f"Failed to load the prediction model: {e}")
+            self.counts, self.messages, self._posted, self.scanned_until = {}, [], set(), None
+        self._ids = {_normalize(message): i for i, message in enumerate(self.messages)}
+        self._totals = {feature: sum(answers.values()) for feature, answers in self.counts.items()}
+
+    def flush(self) -> None:
+        """Write the model now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            data = {
+                "scanned_until": self.scanned_until.isoformat() if self.scanned_until else None,
+                "posted": sorted(self._posted),
+                "messages": list(self.messages),
+                "counts": {feature: dict(answers) for feature, answers in self.counts.items()},
+            }
+        try:
+            write_json_atomic(self.path, data, indent=None)
+        except OSError as e:
+            logger.warning(f"Failed to save the prediction model: {e}")
+
+    def _count(self, event: aw_core.Event) -> None:
+        message = " ".join(event.data.get(DATA_KEY, "").split())
+        key = _normalize(message)
+        if not key or key in IGNORED:
+            return
+        i = self._ids.setdefault(key, len(self.messages))
+        if i == len(self.messages):
+            self.messages.append(message)
+        else:
+            self.messages[i] = message
+        for feature, _ in _keys(event.timestamp, event.duration):
+            answers = self.counts.setdefault(feature, {})
+            answers[i] = answers.get(i, 0) + 1
+            self._totals[feature] = self._totals.get(feature, 0) + 1
+
+    def add(self, event: aw_core.Event) -> None:
+        """Count an answer just posted and schedule a save."""
+        with self._lock:
+            self._count(event)
+            if self.scanned_until is None or event.timestamp >= self.scanned_until:
+                self._posted.add(event.timestamp.isoformat())
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self._save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def sync(self, client: ActivityWatchClient, bucket_id: str, now: datetime.datetime | None = None,
+             page_size: int = PAGE_SIZE) -> int:
+        """Count the events posted since the last scan (or ever, on the first run) and save the model.
+
+        Returns:
+            The number of events counted
+        """
+        now = now or datetime.datetime.now(datetime.UTC)
+        counted = 0
+        for page in scan_events(client, bucket_id, self.scanned_until, now, page_size):
+            for event in page:
+                # The scan also returns the events overlapping its start, which were counted before
+                if self.scanned_until is not None and event.timestamp < self.scanned_until:
+                    continue
+                if event.timestamp.isoformat() in self._posted:
+                    continue
+                self._count(event)
+                counted += 1
+        self.scanned_until = now
+        self._posted.clear()
+        self.flush()
+        logger.info(f"Prediction model: counted {counted} new events, {len(self.messages)} distinct answers")
+        return counted
+
+    def predict(self, start: datetime.datetime, duration: datetime.timedelta, limit: int = 5) -> list[str]:
+        """The likeliest answers for an absence, best first.
+
+        Args:
+            start: Start of the absence
+            duration: Length of the absence
+            limit: Maximum number of answers
+
+        Returns:
+            The answers as last typed; empty if nothing was ever answered at a similar time
+        """
+        scores: dict[int, float] = {}
+        for feature, weight in _keys(start, duration):
+            answers = self.counts.get(feature)
+            if not answers:
+                continue
+            # The share of the answers given in this bucket, so busy buckets do not drown the others
+            weight /= self._totals[feature]
+            for i, count in answers.items():
+                scores[i] = scores.get(i, 0.0) + weight * count
+        best = heapq.nlargest(limit, scores, key=scores.__getitem__)
+        return [self.messages[i] for i in best]
@@ -0,0 +1,124 @@
+"""Listing unfilled AFK time without prompting.
+
+Used by the --list-gaps command line mode, which runs headless: nothing in here
+(or imported from here) may import tkinter.
+"""
+
+import csv
+import datetime
+import io
+import json
+from dataclasses import dataclass
+
+import aw_core
+
+from aw_watcher_afk_prompt.backfill import BackfillEngine
+from aw_watcher_afk_prompt.core import find_activity_gaps, is_afk
+from aw_watcher_afk_prompt.intervals import IntervalIndex
+from aw_watcher_afk_prompt.utils import LOCAL_TIMEZONE, format_duration
+
+FORMATS = ("table", "json", "csv")
+DAY_WINDOW = datetime.timedelta(days=1)
+
+
+@dataclass
+class GapRow:
+    """An unfilled AFK gap.
+
+    Attributes:
+        start: Start of the gap
+        end: End of the gap
+        sources: Names of the sources reporting away time during the gap (e.g. afk, lid);
+            empty if no source reported anything, e.g. while the computer was off
+        coverage: Fraction of the gap covered by answers in our bucket (0 to 1)
+    """
+
+    start: datetime.datetime
+    end: datetime.datetime
+    sources: list[str]
+    coverage: float
+
+    @property
+    def duration(self) -> datetime.timedelta:
+        return self.end - self.start
+
+    def as_dict(self) -> dict:
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "duration_seconds": self.duration.total_seconds(),
+            "sources": self.sources,
+            "coverage": round(self.coverage, 4),
+        }
+
+
+def covered_fraction(gap: aw_core.Event, posted: IntervalIndex) -> float:
+    """Fraction of the gap covered by the union of the posted events."""
+    gap_end = gap.timestamp + gap.duration
+    covered = datetime.timedelta(0)
+    reached = gap.timestamp
+    for event in posted.overlapping(gap.timestamp, gap_end):
+        start = max(event.timestamp, reached)
+        end = min(event.timestamp + event.duration, gap_end)
+        if end > start:
+            covered += end - start
+            reached = end
+    return covered / gap.duration if gap.duration else 1.0
+
+
+def list_gaps(engine: BackfillEngine, start: datetime.datetime, end: datetime.datetime,
+              durration_thresh: float, overlap_thresh: float = 0.95) -> list[GapRow]:
+    """List the gaps within [start, end) longer than durration_thresh seconds that are not answered.
+
+    A gap counts as answered when an answer in our bucket covers it by more than
+    overlap_thresh, the same rule that decides whether to prompt for it.
+    """
+    events, posted = engine.fetch(start, end)
+    away = IntervalIndex(e for e in events if is_afk(e))
+    gaps = [gap for gap in find_activity_gaps(events)
+            if gap.timestamp + gap.duration > start and gap.timestamp < end
+            and gap.duration.total_seconds() > durration_thresh]
+    answered = posted.covers_batch(gaps, overlap_thresh)
+    return [
+        GapRow(
+            start=gap.timestamp,
+            end=gap.timestamp + gap.duration,
+            sources=sorted({e.data.get("source", "afk") for e in away.overlapping(gap.timestamp,
+                                                                                   gap.timestamp + gap.duration)}),
+            coverage=covered_fraction(gap, posted),
+        )
+        for gap, is_answered in zip(gaps, answered, strict=True)
+        if not is_answered
+    ]
+
+
+def _local(time: datetime.datetime) -> str:
+    return time.astimezone(LOCAL_TIMEZONE).strftime("%Y-%m-%d %H:%M")
+
+
+def format_rows(rows: list[GapRow], fmt: str = "table") -> str:
+    """Render the rows as a plain text table, JSON or CSV."""
+    if fmt == "json":
+        return json.dumps([row.as_dict() for row in rows], indent=2)
+    if fmt == "csv":
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=["start", "end", "duration_seconds", "sources", "coverage"])
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row.as_dict(), "sources": ";".join(row.sources)})
+        return out.getvalue().rstrip("\n")
+    if fmt != "table":
+        raise ValueError(f"Unknown format: {fmt}. Use one of {', '.join(FORMATS)}.")
+
+    header = ("Start", "End", "Duration", "Sources", "Covered")
+    lines = [
+        (_local(row.start), _local(row.end), format_duration(row.duration),
+         ",".join(row.sources) or "-", f"{row.coverage:.0%}")
+        for row in rows
+    ]
+    widths = [max(len(line[i]) for line in [header, *lines]) for i in range(len(header))]
+    text = ["  ".join(cell.ljust(width) for cell, width in zip(line, widths, strict=True)).rstrip()
+            for line in [header, *lines]]
+    total = sum((row.duration for row in rows), datetime.timedelta(0))
+    text.append(f"{len(rows)} unfilled gaps, {format_duration(total)} in total")
+    return "\n".join(text)
@@ -0,0 +1,169 @@
+"""Answering routine AFK periods without asking, from rules in the config file.
+
+Some gaps never need a human: the nightly suspend, lunch in a fixed window,
+anything over 8 hours at night. Each ``[[rules]]`` table of the config names an
+answer and the conditions a gap must meet to get it:
+
+    [[rules]]
+    name = "night"
+    message = "sleep"
+    after = "20:00"         # the gap starts at or after this time of day...
+    before = "06:00"        # ...and before this one (may wrap around midnight)
+    min_duration = 480      # minutes
+    max_duration = 900      # minutes
+    weekdays = ["mon", "tue", "wed", "thu", "fri"]
+    source = "lid"          # a source that reported the away time (afk, lid, ...)
+    previous = "^work"      # regular expression for the answer before the gap
+
+All conditions are optional. A gap matched by rules that disagree on the answer
+is ambiguous and asked about as usual.
+
+The rules are compiled once into a table by weekday and hour of the gap start,
+so deciding a gap only checks the few rules that can apply to that hour.
+
+Like report.py this module must not import tkinter.
+"""
+
+import datetime
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from aw_watcher_afk_prompt.utils import LOCAL_TIMEZONE
+
+RULE_KEY = "rule"
+"""Event data field holding the name of the rule that answered the gap."""
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+MINUTES_PER_DAY = 24 * 60
+
+
+def _parse_time(value: str, key: str, name: str) -> int:
+    """Minute of the day of a "HH:MM" time."""
+    try:
+        hours, minutes = (int(part) for part in value.split(":"))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Rule {name!r}: {key} must be a time like \"12:30\", got {value!r}") from None
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or hours * 60 + minutes > MINUTES_PER_DAY:
+        raise ValueError(f"Rule {name!r}: {key} is not a time of day: {value!r}")
+    return hours * 60 + minutes
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One rule: the answer and the conditions a gap must meet to get it.
+
+    Attributes:
+        name: Name of the rule, stored as ``rule`` in the posted event
+        message: The answer to post
+        after: The gap must start at or after this minute of the day
+        before: The gap must start before this minute of the day; when before is
+            not later than after, the range wraps around midnight
+        min_duration: The gap must be at least this long
+        max_duration: The gap must be at most this long
+        weekdays: Weekdays (0 is Monday) the gap may start on
+        sources: The gap must have been reported away by one of these sources (empty: any)
+        previous: The answer before the gap must match this
+    """
+
+    name: str
+    message: str
+    after: int = 0
+    before: int = MINUTES_PER_DAY
+    min_duration: datetime.timedelta | None = None
+    max_duration: datetime.timedelta | None = None
+    weekdays: frozenset[int] = frozenset(range(7))
+    sources: frozenset[str] = frozenset()
+    previous: re.Pattern[str] | None = None
+
+    def starts_at(self, minute: int) -> bool:
+        """Whether a gap starting at this minute of the day is in the time range."""
+        if self.after < self.before:
+            return self.after <= minute < self.before
+        return minute >= self.after or minute < self.before
+
+    def matches(self, minute: int, duration: datetime.timedelta, sources: frozenset[str], previous: str) -> bool:
+        """Whether a gap meets the conditions; the weekday is checked by the engine."""
+        return (
+            self.starts_at(minute)
+            and (self.min_duration is None or duration >= self.min_duration)
+            and (self.max_duration is None or duration <= self.max_duration)
+            and (not self.sources or not self.sources.isdisjoint(sources))
+            and (self.previous is None or bool(self.previous.search(previous)))
+        )
+
+
+def rule_from_config(entry: dict[str, Any]) -> Rule:
+    """Create a rule from a ``[[rules]]`` table in the config file."""
+    try:
+        name = entry["name"]
+        message = entry["message"]
+    except KeyError as e:
+        raise ValueError(f"Rule config is missing the {e} key: {entry}") from None
+
+    weekdays = entry.get("weekdays", WEEKDAYS)
+    unknown = [day for day in weekdays if day.lower()[:3] not in WEEKDAYS]
+    if unknown:
+        raise ValueError(f"Rule {name!r}: unknown weekdays {unknown}, use {list(WEEKDAYS)}")
+    source = entry.get("source", ())
+    previous = entry.get("previous")
+    try:
+        previous_pattern = re.compile(previous, re.IGNORECASE) if previous else None
+    except re.error as e:
+        raise ValueError(f"Rule {name!r}: invalid previous pattern {previous!r}: {e}") from None
+    return Rule(
+        name=name,
+        message=message,
+        after=_parse_time(entry["after"], "after", name) if "after" in entry else 0,
+        before=_parse_time(entry["before"], "before", name) if "before" in entry else MINUTES_PER_DAY,
+        min_duration=datetime.timedelta(minutes=entry["min_duration"]) if "min_duration" in entry else None,
+        max_duration=datetime.timedelta(minutes=entry["max_duration"]) if "max_duration" in entry else None,
+        weekdays=frozenset(WEEKDAYS.index(day.lower()[:3]) for day in weekdays),
+        sources=frozenset((source,) if isinstance(source, str) else source),
+        previous=previous_pattern,
+    )
+
+
+class RuleEngine:
+    """Decides which gaps are answered by a rule."""
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = list(rules)
+        # The candidate rules for each weekday and hour of the gap start, in config order
+        self._table: list[tuple[Rule, ...]] = [
+            tuple(rule for rule in self.rules
+                  if weekday in rule.weekdays and any(rule.starts_at(hour * 60 + m) for m in range(60)))
+            for weekday in range(7) for hour in range(24)
+        ]
+        self.uses_sources = any(rule.sources for rule in self.rules)
+        """Whether any rule needs to know which sources reported a gap."""
+        self.uses_previous = any(rule.previous is not None for rule in self.rules)
+        """Whether any rule needs to know the answer before a gap."""
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RuleEngine | None":
+        """The rules of the config file, or None if there are none."""
+        rules = [rule_from_config(entry) for entry in config.get("rules", [])]
+        return cls(rules) if rules else None
+
+    def decide(self, start: datetime.datetime, duration: datetime.timedelta,
+               sources: frozenset[str] = frozenset(), previous: str = "") -> Rule | None:
+        """The rule answering a gap.
+
+        Args:
+            start: Start of the gap
+            duration: Length of the gap
+            sources: The sources that reported away time during the gap
+            previous: The answer given before the gap
+
+        Returns:
+            The first matching rule, or None if no rule matches or the matching
+            rules disagree on the answer
+        """
+        local = start.astimezone(LOCAL_TIMEZONE)
+        minute = local.hour * 60 + local.minute
+        matching = [rule for rule in self._table[local.weekday() * 24 + local.hour]
+                    if rule.matches(minute, duration, sources, previous)]
+        if not matching or any(rule.message != matching[0].message for rule in matching):
+            return None
+        return matching[0]
@@ -0,0 +1,159 @@
+"""Pluggable AFK input sources.
+
+An input source is anything that can tell us when the user was away: the regular
+aw-watcher-afk, aw-watcher-lid, a screensaver watcher, a second input watcher, or a
+custom status field in some other bucket.
+
+Each source declares:
+- how to find its bucket(s) among the buckets on the server
+- how to map its events to away/active intervals
+- how its events should be fetched
+
+Events from all sources are normalized to the canonical ``"afk"``/``"not-afk"``
+statuses, so the gap detection in core can merge any number of sources in one pass.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from typing import Any
+
+import aw_core
+
+AWAY = "afk"
+ACTIVE = "not-afk"
+
+FETCH_DYNAMIC_LIMIT = "dynamic-limit"
+"""Fetch the newest N events, doubling N until an activity boundary is found.
+
+Suited for heartbeat based watchers like aw-watcher-afk."""
+
+FETCH_WINDOW = "window"
+"""Fetch all events in the lookback time window with start/end.
+
+Suited for sparse, state-change based watchers (lid, screensaver) where a handful of
+events can cover a long time span."""
+
+FETCH_STRATEGIES = (FETCH_DYNAMIC_LIMIT, FETCH_WINDOW)
+
+
+@dataclass(frozen=True)
+class AfkSource:
+    """Description of one AFK input source.
+
+    Attributes:
+        name: Short name of the source, stored as ``source`` in normalized events
+        include: Substrings that must all be present in the bucket id
+        exclude: Substrings that must not be present in the bucket id
+        status_key: Event data field holding the status
+        away_values: Values of ``status_key`` that mean the user was away
+        required: Whether startup should fail if no bucket is found
+        fetch: Fetch strategy, one of FETCH_STRATEGIES
+        hint: Extra text for the error message when a required bucket is missing
+        multiple: Whether several buckets may match (e.g. one per host); the user is
+            then considered active whenever any of them says so
+    """
+
+    name: str
+    include: tuple[str, ...]
+    exclude: tuple[str, ...] = ()
+    status_key: str = "status"
+    away_values: frozenset[str] = frozenset({"afk", "system-afk"})
+    required: bool = False
+    fetch: str = FETCH_DYNAMIC_LIMIT
+    hint: str = ""
+    multiple: bool = False
+
+    def __post_init__(self) -> None:
+        if not self.include:
+            raise ValueError(f"Source {self.name!r} must match on at least one bucket substring")
+        if self.fetch not in FETCH_STRATEGIES:
+            raise ValueError(f"Unknown fetch strategy for source {self.name!r}: {self.fetch!r}")
+
+    def find_buckets(self, buckets: Iterable[str]) -> list[str]:
+        """Return all bucket ids belonging to this source."""
+        return [
+            bucket for bucket in buckets
+            if all(s in bucket for s in self.include)
+            and not any(s in bucket for s in self.exclude)
+        ]
+
+    def is_away(self, event: aw_core.Event) -> bool:
+        """Check whether an event from this source represents away time."""
+        return event.data.get(self.status_key) in self.away_values
+
+    def normalize(self, event: aw_core.Event, bucket_id: str | None = None) -> aw_core.Event:
+        """Map an event from this source to a canonical afk/not-afk event.
+
+        A new event is returned, the original is left untouched.
+        """
+        data = {"status": AWAY if self.is_away(event) else ACTIVE, "source": self.name}
+        if bucket_id is not None:
+            data["bucket"] = bucket_id
+        return aw_core.Event(id=event.id, timestamp=event.timestamp, duration=event.duration, data=data)
+
+
+AFK_WATCHER_SOURCE = AfkSource(
+    name="afk",
+    include=("aw-watcher-afk",),
+    exclude=(
+        "lid",
+        "afk-prompt",  # Exclude our own bucket
+        "ask-away",  # Exclude old bucket name
+    ),
+    required=True,
+    hint="Is aw-watcher-afk running?",
+)
+
+MULTI_HOST_AFK_WATCHER_SOURCE = replace(AFK_WATCHER_SOURCE, multiple=True)
+"""aw-watcher-afk on several hosts reporting to the same server, like a desktop and a laptop."""
+
+LID_WATCHER_SOURCE = AfkSource(
+    name="lid",
+    include=("lid",),
+)
+"""aw-watcher-lid, see https://github.com/tobixen/aw-watcher-lid"""
+
+
+def source_from_config(entry: dict[str, Any]) -> AfkSource:
+    """Create a source from a ``[[sources]]`` table in the config file.
+
+    Example:
+
+        [[sources]]
+        name = "screensaver"
+        bucket = "aw-watcher-screensaver"
+        status_key = "status"
+        away = ["locked"]
+        fetch = "window"
+    """
+    try:
+        name = entry["name"]
+        bucket = entry["bucket"]
+    except KeyError as e:
+        raise ValueError(f"Source config is missing the {e} key: {entry}") from None
+    include = (bucket,) if isinstance(bucket, str) else tuple(bucket)
+    exclude = entry.get("exclude", ())
+    return AfkSource(
+        name=name,
+        include=include,
+        exclude=(exclude,) if isinstance(exclude, str) else tuple(exclude),
+        status_key=entry.get("status_key", "status"),
+        away_values=frozenset(entry.get("away", ("afk", "system-afk"))),
+        required=entry.get("required", False),
+        fetch=entry.get("fetch", FETCH_DYNAMIC_LIMIT),
+        multiple=entry.get("multiple", False),
+    )
+
+
+def default_sources(enable_lid_events: bool = True, extra: Iterable[AfkSource] = (),
+                    multi_host: bool = False) -> list[AfkSource]:
+    """The sources to use: aw-watcher-afk, optionally aw-watcher-lid, then any extra sources.
+
+    With multi_host, every aw-watcher-afk bucket on the server is used instead of
+    insisting on exactly one.
+    """
+    sources = [MULTI_HOST_AFK_WATCHER_SOURCE if multi_host else AFK_WATCHER_SOURCE]
+    if enable_lid_events:
+        sources.append(LID_WATCHER_SOURCE)
+    sources.extend(extra)
+    return sources
@@ -0,0 +1,802 @@
+"""Data model for splitting an AFK period into multiple activities.
+
+Kept free of tkinter so that the split logic can be used (and tested) headless;
+the dialog itself lives in split_dialog.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+
+@dataclass
+class ActivityLine:
+    """Represents a single activity in a split AFK period.
+
+    Each activity has a description, start time, and duration. Activities are
+    sequential (no gaps or overlaps) within the parent AFK period.
+
+    Attributes:
+        description: User-provided description of the activity
+        start_time: When the activity started (datetime with timezone)
+        duration_minutes: How long the activity lasted (in minutes, integer)
+        duration_seconds: Additional seconds beyond duration_minutes (for internal precision)
+    """
+
+    description: str
+    start_time: datetime
+    duration_minutes: int
+    duration_seconds: int = 0  # Internal precision for sub-minute accuracy
+
+    @property
+    def end_time(self) -> datetime:
+        """Calculate the end time of this activity."""
+        return self.start_time + timedelta(minutes=self.duration_minutes, seconds=self.duration_seconds)
+
+    @property
+    def total_duration_seconds(self) -> float:
+        """Get total duration in seconds (including sub-minute precision)."""
+        return self.duration_minutes * 60 + self.duration_seconds
+
+    def __post_init__(self) -> None:
+        """Validate the activity line after initialization."""
+        if self.duration_minutes < 0:
+            raise ValueError(f"Duration cannot be negative: {self.duration_minutes}")
+        if self.duration_seconds < 0 or self.duration_seconds >= 60:
+            raise ValueError(f"Duration seconds must be in [0, 60): {self.duration_seconds}")
+
+
+@dataclass
+class SplitActivityData:
+    """Container for all activity lines in a split AFK period.
+
+    Maintains consistency constraints:
+    - No gaps between activities
+    - No overlaps between activities
+    - Total duration equals original AFK period duration
+    - First activity starts at AFK period start
+    - Last activity ends at AFK period end
+
+    Attributes:
+        original_start: Start time of the original AFK period
+        original_duration_seconds: Total duration of the original AFK period in seconds
+        activities: List of ActivityLine objects (must be chronologically ordered)
+    """
+
+    original_start: datetime
+    original_duration_seconds: float
+    activities: list[ActivityLine] = field(default_factory=list)
+
+    @property
+    def original_end(self) -> datetime:
+        """Calculate the end time of the original AFK period."""
+        return self.original_start + timedelta(seconds=self.original_duration_seconds)
+
+    def validate(self) -> list[str]:
+        """Validate the split activity data and return list of errors.
+
+        Returns:
+            List of error messages (empty if valid)
+        """
+        errors = []
+
+        if not self.activities:
+            errors.append("No activities defined")
+            return errors
+
+        # Check first activity starts at AFK period start
+        if self.activities[0].start_time != self.original_start:
+            errors.append(
+                f"First activity must start at AFK period start "
+                f"({self.original_start.isoformat()}), "
+                f"got {self.activities[0].start_time.isoformat()}"
+            )
+
+        # Check for gaps and overlaps between consecutive activities
+        for i in range(len(self.activities) - 1):
+            current = self.activities[i]
+            next_activity = self.activities[i + 1]
+
+            # Check minimum duration
+            if current.duration_minutes < 1:
+                errors.append(f"Activity {i+1} duration must be at least 1 minute")
+
+            # Check no gap between activities (allow ±1 second tolerance for rounding)
+            if current.end_time != next_activity.start_time:
+                gap_seconds = (next_activity.start_time - current.end_time).total_seconds()
+                if abs(gap_seconds) > 1.0:
+                    if gap_seconds > 0:
+                        errors.append(
+                            f"Gap detected between activity {i+1} and {i+2}: {gap_seconds:.1f} seconds"
+                        )
+                    else:
+                        errors.append(
+                            f"Overlap detected between activity {i+1} and {i+2}: {-gap_seconds:.1f} seconds"
+                        )
+
+        # Check last activity minimum duration
+        if self.activities and self.activities[-1].duration_minutes < 1:
+            errors.append(f"Activity {len(self.activities)} duration must be at least 1 minute")
+
+        # Check last activity ends at AFK period end (with 30 second tolerance for rounding)
+        if self.activities:
+            last_end = self.activities[-1].end_time
+            expected_end = self.original_end
+            diff_seconds = abs((last_end - expected_end).total_seconds())
+            if diff_seconds > 30.0:
+                errors.append(
+                    f"Last activity must end at AFK period end "
+                    f"({expected_end.isoformat()}), "
+                    f"got {last_end.isoformat()} (diff: {diff_seconds:.1f}s)"
+                )
+
+        # Check total duration matches original (with 30 second tolerance for rounding)
+        if self.activities:
+            total_seconds = sum(a.total_duration_seconds for a in self.activities)
+            diff = abs(total_seconds - self.original_duration_seconds)
+            if diff > 30.0:
+                errors.append(
+                    f"Total duration mismatch: expected {self.original_duration_seconds:.1f}s, "
+                    f"got {total_seconds:.1f}s (diff: {diff:.1f}s)"
+                )
+
+        return errors
+
+    def is_valid(self) -> bool:
+        """Check if all activities form a valid, consistent timeline.
+
+        Returns:
+            True if valid, False otherwise
+        """
+        return len(self.validate()) == 0
+
+
+class Timeline:
+    """The activities of a split AFK period as whole-second durations.
+
+    The dialog edits this instead of a list of ActivityLine objects. Each activity
+    is a number of seconds plus a description; the start offsets from the period
+    start are prefix sums of the durations, rebuilt on demand and only from the
+    first duration that changed. An edit changes at most two durations.
+
+    The sum of the durations is fixed when the timeline is made, so there are no
+    gaps or overlaps and the last activity always ends at the end of the period.
+    The number of activities shorter than a minute is kept up to date, which makes
+    validate() a constant-time check. ActivityLine objects are only made for
+    displaying and posting, by activity() and activities().
+
+    Attributes:
+        start: Start time of the AFK period
+        total_seconds: Length of the AFK period in whole seconds
+        descriptions: Description of each activity, edited in place by the dialog
+    """
+
+    def __init__(self, start: datetime, durations: list[int], descriptions: list[str] | None = None):
+        """Create a timeline from the activity durations.
+
+        Args:
+            start: Start time of the AFK period
+            durations: Length of each activity in whole seconds
+            descriptions: Optional list of descriptions (default: empty strings)
+        """
+        if descriptions is None:
+            descriptions = [""] * len(durations)
+        elif len(descriptions) != len(durations):
+            raise ValueError(f"Expected {len(durations)} descriptions, got {len(descriptions)}")
+        self.start = start
+        self.descriptions = list(descriptions)
+        self.total_seconds = sum(durations)
+        self._reset(durations)
+
+    def _reset(self, durations: list[int]) -> None:
+        """Replace all durations at once."""
+        self._durations = list(durations)
+        self._short = sum(1 for seconds in self._durations if seconds < 60)
+        # Start offsets of the activities; those from index _stale on are out of date
+        self._offsets = [0]
+        self._stale = 1
+
+    @staticmethod
+    def _equal_durations(total_seconds: int, num_activities: int) -> list[int]:
+        each = total_seconds // num_activities
+        return [each] * (num_activities - 1) + [total_seconds - each * (num_activities - 1)]
+
+    @classmethod
+    def split_equal(cls, start: datetime, duration_seconds: float, num_activities: int,
+                    descriptions: list[str] | None = None) -> "Timeline":
+        """Split an AFK period into equal-duration activities.
+
+        The last activity gets what is left of the period after the others.
+
+        Args:
+            start: Start time of the AFK period
+            duration_seconds: Total duration in seconds
+            num_activities: Number of activities to create
+            descriptions: Optional list of descriptions (default: empty strings)
+        """
+        if num_activities < 1:
+            raise ValueError("Must create at least 1 activity")
+        return cls(start, cls._equal_durations(int(duration_seconds), num_activities), descriptions)
+
+    @classmethod
+    def split_at(cls, start: datetime, duration_seconds: float, boundaries: list[datetime],
+                 descriptions: list[str] | None = None) -> "Timeline":
+        """Split an AFK period into activities starting at the given times.
+
+        Boundaries outside the period, or less than a minute after the previous
+        activity start, are dropped. Descriptions beyond the number of activities
+        are ignored, missing ones are empty.
+
+        Args:
+            start: Start time of the AFK period
+            duration_seconds: Total duration in seconds
+            boundaries: Start times of the second, third, ... activity
+            descriptions: Optional list of descriptions, one per activity
+        """
+        end = int(duration_seconds)
+        offsets = [0]
+        for boundary in sorted(boundaries):
+            offset = int((boundary - start).total_seconds())
+            if offset - offsets[-1] >= 60 and end - offset >= 60:
+                offsets.append(offset)
+        offsets.append(end)
+        descriptions = list(descriptions or [])[:len(offsets) - 1]
+        descriptions += [""] * (len(offsets) - 1 - len(descriptions))
+        return cls(start, [b - a for a, b in zip(offsets, offsets[1:])], descriptions)
+
+    @classmethod
+    def from_activities(cls, start: datetime, duration_seconds: float,
+                        activities: list[ActivityLine]) -> "Timeline":
+        """Take over the start times and descriptions of a list of activities.
+
+        The first activity is taken to start at the period start and the last one to
+        end at its end, whatever their own times say.
+
+        Args:
+            start: Start time of the AFK period
+            duration_seconds: Total duration in seconds
+            activities: Activities in chronological order
+        """
+        offsets = [0] + [int((a.start_time - start).total_seconds()) for a in activities[1:]] + [int(duration_seconds)]
+        return cls(start, [b - a for a, b in zip(offsets, offsets[1:])], [a.description for a in activities])
+
+    def __len__(self) -> int:
+        return len(self._durations)
+
+    def _set(self, index: int, seconds: int) -> None:
+        """Change one duration, keeping the short count and offsets in step."""
+        self._short += (seconds < 60) - (self._durations[index] < 60)
+        self._durations[index] = seconds
+        self._stale = min(self._stale, index + 1)
+
+    def _offset(self, index: int) -> int:
+        """Seconds from the period start to the start of an activity."""
+        if index >= self._stale:
+            del self._offsets[self._stale:]
+            offset = self._offsets[-1]
+            for seconds in self._durations[self._stale - 1:-1]:
+                offset += seconds
+                self._offsets.append(offset)
+            self._stale = len(self._durations)
+        return self._offsets[index]
+
+    def start_time(self, index: int) -> datetime:
+        """Start time of an activity."""
+        return self.start + timedelta(seconds=self._offset(index))
+
+    def activity(self, index: int) -> ActivityLine:
+        """An activity as an ActivityLine, for display."""
+        seconds = self._durations[index]
+        return ActivityLine(self.descriptions[index], self.start_time(index), seconds // 60, seconds % 60)
+
+    def activities(self, first: int = 0) -> list[ActivityLine]:
+        """The activities from index first on as ActivityLine objects."""
+        return [self.activity(i) for i in range(first, len(self._durations))]
+
+    def _check_index(self, index: int, lowest: int = 0) -> None:
+        if not lowest <= index < len(self._durations):
+            raise ValueError(f"Invalid index: {index}" + (f" (must be > {lowest - 1})" if lowest else ""))
+
+    def set_duration(self, index: int, minutes: int) -> int:
+        """Change the duration of an activity, keeping the seconds beyond the minutes.
+
+        The activities after it move; the last one takes up the difference. When the
+        last activity is changed, the one before it takes up the difference instead.
+
+        Args:
+            index: Index of the activity to adjust
+            minutes: New duration in minutes
+
+        Returns:
+            Index of the first activity whose start or duration changed
+        """
+        self._check_index(index)
+        if minutes < 1:
+            raise ValueError("Duration must be at least 1 minute")
+        if len(self._durations) == 1:
+            raise ValueError("A single activity lasts the whole AFK period")
+        seconds = minutes * 60 + self._durations[index] % 60
+        delta = seconds - self._durations[index]
+        other = index - 1 if index == len(self._durations) - 1 else len(self._durations) - 1
+        if self._durations[other] - delta < 60:
+            raise ValueError("Adjustment would make previous activity less than 1 minute" if other < index
+                             else "Adjusted duration would make last activity less than 1 minute")
+        self._set(index, seconds)
+        self._set(other, self._durations[other] - delta)
+        return min(index, other)
+
+    def set_start_time(self, index: int, new_start: datetime) -> int:
+        """Move the start of an activity (not the first one).
+
+        The activity before it ends at the new start. The activities after it move
+        along, keeping their durations; the last one takes up the difference.
+
+        Args:
+            index: Index of the activity to adjust (must be > 0)
+            new_start: New start time
+
+        Returns:
+            Index of the first activity whose start or duration changed
+        """
+        self._check_index(index, lowest=1)
+        previous = int((new_start - self.start).total_seconds()) - self._offset(index - 1)
+        if previous < 60:
+            raise ValueError("Adjusted duration would be less than 1 minute")
+        delta = previous - self._durations[index - 1]
+        last = len(self._durations) - 1
+        if self._durations[last] - delta < 60:
+            raise ValueError("Adjusted duration would make last activity less than 1 minute")
+        self._set(index - 1, previous)
+        self._set(last, self._durations[last] - delta)
+        return index - 1
+
+    def add(self, equal_distribution: bool = False) -> int:
+        """Add an empty activity at the end.
+
+        Args:
+            equal_distribution: Give all activities the same duration instead of
+                taking a minute from the last one
+
+        Returns:
+            Index of the first activity whose start or duration changed
+        """
+        if not self._durations:
+            raise ValueError("Cannot add activity to empty list")
+        if equal_distribution:
+            self.descriptions.append("")
+            self._reset(self._equal_durations(self.total_seconds, len(self.descriptions)))
+            return 0
+        if self._durations[-1] < 120:
+            raise ValueError("Last activity must have more than 1 minute to add a new line")
+        self._set(len(self._durations) - 1, self._durations[-1] - 60)
+        self._durations.append(60)
+        self.descriptions.append("")
+        return len(self._durations) - 2
+
+    def remove(self, index: int) -> int:
+        """Remove an activity, giving its time to the previous one (the next one for the first).
+
+        Removing the only activity leaves the timeline empty.
+
+        Returns:
+            Index of the first activity whose start or duration changed
+        """
+        self._check_index(index)
+        if len(self._durations) == 1:
+            self.descriptions.clear()
+            self._reset([])
+            return 0
+        neighbour = index - 1 if index else 1
+        self._set(neighbour, self._durations[neighbour] + self._durations[index])
+        self._short -= self._durations[index] < 60
+        del self._durations[index]
+        del self.descriptions[index]
+        self._stale = min(self._stale, max(index, 1))
+        return max(index - 1, 0)
+
+    def validate(self) -> list[str]:
+        """Check the invariants that edits cannot keep by construction.
+
+        Returns:
+            List of error messages (empty if valid)
+        """
+        if not self._durations:
+            return ["No activities defined"]
+        if self._short:
+            return [f"{self._short} {'activity is' if self._short == 1 else 'activities are'} "
+                    f"shorter than 1 minute"]
+        return []
+
+
+class TimeCalculator:
+    """Utility class for time calculations and consistency enforcement.
+
+    Handles automatic adjustment of activity times to maintain consistency
+    when user edits duration or start time fields. These functions take and
+    return whole lists of activities; the split dialog edits a Timeline instead.
+    """
+
+    @staticmethod
+    def split_equal(
+        start: datetime,
+        duration_seconds: float,
+        num_activities: int,
+        descriptions: list[str] | None = None
+    ) -> list[ActivityLine]:
+        """Split an AFK period into equal-duration activities.
+
+        Args:
+            start: Start time of the AFK period
+            duration_seconds: Total duration in seconds
+            num_activities: Number of activities to create
+            descriptions: Optional list of descriptions (default: empty strings)
+
+        Returns:
+            List of ActivityLine objects with equal durations
+        """
+        return Timeline.split_equal(start, duration_seconds, num_activities, descriptions).activities()
+
+    @staticmethod
+    def split_at(
+        start: datetime,
+        duration_seconds: float,
+        boundaries: list[datetime],
+        descriptions: list[str] | None = None
+    ) -> list[ActivityLine]:
+        """Split an AFK period into activities starting at the given times.
+
+        Boundaries outside the period, or less than a minute after the previous
+        activity start, are dropped, since every activity must last at least a minute.
+
+        Args:
+            start: Start time of the AFK period
+            duration_seconds: Total duration in seconds
+            boundaries: Start times of the second, third, ... activity
+            descriptions: Optional list of descriptions, one per activity (default: empty strings)
+
+        Returns:
+            List of ActivityLine objects, the last one ending at the end of the period
+        """
+        return Timeline.split_at(start, duration_seconds, boundaries, descriptions).activities()
+
+    @staticmethod
+    def adjust_duration(
+        activities: list[ActivityLine],
+        index: int,
+        new_duration_minutes: int,
+        original_end: datetime | None = None
+    ) -> list[ActivityLine]:
+        """Adjust the duration of an activity and update subsequent activities.
+
+        When a user changes the duration of an activity:
+        - All subsequent activities' start times shift accordingly
+        - If original_end is provided, the last activity's duration adjusts to maintain total consistency
+
+        Args:
+            activities: Current list of activities
+            index: Index of the activity to adjust
+            new_duration_minutes: New duration in minutes
+            original_end: Optional end time of original AFK period (for adjusting last activity)
+
+        Returns:
+            New list of activities with adjustments applied
+        """
+        if not activities or index < 0 or index >= len(activities):
+            raise ValueError(f"Invalid index: {index}")
+
+        if new_duration_minutes < 1:
+            raise ValueError("Duration must be at least 1 minute")
+
+        # Special case: if changing the LAST activity and original_end is provided,
+        # adjust the PREVIOUS activity instead to maintain total duration
+        if index == len(activities) - 1 and original_end is not None and len(activities) > 1:
+            # The last activity must end at original_end, so calculate its new start time
+            new_last_duration = timedelta(minutes=new_duration_minutes, seconds=activities[index].duration_seconds)
+            new_last_start = original_end - new_last_duration
+
+            # The previous activity must end at the new last activity's start
+            prev_activity = activities[index - 1]
+            prev_new_duration_seconds = (new_last_start - prev_activity.start_time).total_seconds()
+
+            if prev_new_duration_seconds < 60:
+                raise ValueError("Adjustment would make previous activity less than 1 minute")
+
+            prev_new_duration_minutes = int(prev_new_duration_seconds // 60)
+
+            # Recursively adjust the previous activity
+            # This will handle cascading changes if there are more activities
+            return TimeCalculator.adjust_duration(
+                activities,
+                index=index - 1,
+                new_duration_minutes=prev_new_duration_minutes,
+                original_end=original_end
+            )
+
+        # Create a copy to avoid mutating the original
+        new_activities = []
+        for i, activity in enumerate(activities):
+            if i < index:
+                # Activities before the changed one remain the same
+                new_activities.append(ActivityLine(
+                    description=activity.description,
+                    start_time=activity.start_time,
+                    duration_minutes=activity.duration_minutes,
+                    duration_seconds=activity.duration_seconds
+                ))
+            elif i == index:
+                # This is the activity being changed
+                new_activities.append(ActivityLine(
+                    description=activity.description,
+                    start_time=activity.start_time,
+                    duration_minutes=new_duration_minutes,
+                    duration_seconds=activity.duration_seconds
+                ))
+            elif i == len(activities) - 1 and original_end is not None:
+                # Last activity: adjust duration to reach original_end
+                prev_end = new_activities[-1].end_time
+                remaining_seconds = (original_end - prev_end).total_seconds()
+                if remaining_seconds < 60:
+                    raise ValueError("Adjusted duration would make last activity less than 1 minute")
+
+                new_activities.append(ActivityLine(
+                    description=activity.description,
+                    start_time=prev_end,
+                    duration_minutes=int(remaining_seconds // 60),
+                    duration_seconds=int(remaining_seconds % 60)
+                ))
+            else:
+                # Subsequent activities: shift start time based on previous activity's end
+                prev_end = new_activities[-1].end_time
+                new_activities.append(ActivityLine(
+                    description=activity.description,
+                    start_time=prev_end,
+                    duration_minutes=activity.duration_minutes,
+                    duration_seconds=activity.duration_seconds
+                ))
+
+        return new_activities
+
+    @staticmethod
+    def adjust_start_time(
+        activities: list[ActivityLine],
+        index: int,
+        new_start: datetime,
+        original_end: datetime | None = None
+    ) -> list[ActivityLine]:
+        """Adjust the start time of an activity and update related activities.
+
+        When a user changes the start time of an activity (not the first one):
+        - Previous activity's duration adjusts to reach the new start time
+        - All subsequent activities shift their start times accordingly
+        - If original_end is provided, the last activity's duration adjusts to maintain total consistency
+
+        Args:
+            activities: Current list of activities
+            index: Index of the activity to adjust (must be > 0)
+            new_start: New start time
+            original_end: Optional end time of original AFK period (for adjusting last activity)
+
+        Returns:
+            New list of activities with adjustments applied
+        """
+        if not activities or index <= 0 or index >= len(activities):
+            raise ValueError(f"Invalid index: {index} (must be > 0)")
+
+        # Create a copy to avoid mutating the original
+        new_activities = []
+        for i, activity in enumerate(activities):
+            if i < index - 1:
+                # Activities before the previous one remain the same
+                new_activities.append(ActivityLine(
+                    description=activity.description,
+                    start_time=activity.start_time,
+                    duration_minutes=activity.duration_minutes,
+                    duration_seconds=activity.duration_seconds
+                ))
+            elif i == index - 1:
+                # Previous activity: adjust duration to reach new start time
+                new_duration_seconds = (new_start - activity.start_time).total_seconds()
+                if new_duration_seconds < 60:
+                    raise ValueError("Adjusted duration would be less than 1 minute")
+
+                new_activities.append(ActivityLine(
+                    description=activity.description,
+                    start_time=activity.start_time,
+                    duration_minutes=int(new_duration_seconds // 60),
+                    duration_seconds=int(new_duration_seconds % 60)
+                ))
+            elif i == index:
+                # This is the activity being changed
+                if i == len(activities) - 1 and original_end is not None:
+                    # This is also the last activity: adjust duration to reach original_end
+                    remaining_seconds = (original_end - new_start).total_seconds()
+                    if remaining_seconds < 60:
+                        raise ValueError("Adjusted duration would make last activity less than 1 minute")
+
+                    new_activities.append(ActivityLine(
+                        description=activity.description,
+                        start_time=new_start,
+                        duration_minutes=int(remaining_seconds // 60),
+                        duration_seconds=int(remaining_seconds % 60)
+                    ))
+                else:
+                    # Not the last activity: keep original duration
+                    new_activities.append(ActivityLine(
+                        description=activity.description,
+                        start_time=new_start,
+                        duration_minutes=activity.duration_minutes,
+                        duration_seconds=activity.duration_seconds
+                    ))
+            elif i == len(activities) - 1 and original_end is not None:
+                # Last activity: adjust duration to reach original_end
+                prev_end = new_activities[-1].end_time
+                remaining_seconds = (original_end - prev_end).total_seconds()
+                if remaining_seconds < 60:
+                    raise ValueError("Adjusted duration would make last activity less than 1 minute")
+
+                new_activities.append(ActivityLine(
+                    description=activity.description,
+                    start_time=prev_end,
+                    duration_minutes=int(remaining_seconds // 60),
+                    duration_seconds=int(remaining_seconds % 60)
+                ))
+            else:
+                # Subsequent activities: shift start time based on previous activity's end
+                prev_end = new_activities[-1].end_time
+                new_activities.append(ActivityLine(
+                    description=activity.description,
+                    start_time=prev_end,
+                    duration_minutes=activity.duration_minutes,
+                    duration_seconds=activity.duration_seconds
+                ))
+
+        return new_activities
+
+    @staticmethod
+    def add_activity(
+        activities: list[ActivityLine],
+        original_end: datetime,
+        equal_distribution: bool = False,
+        original_start: datetime | None = None,
+        original_duration_seconds: float | None = None
+    ) -> list[ActivityLine]:
+        """Add a new activity line.
+
+        Args:
+            activities: Current list of activities
+            original_end: End time of the original AFK period
+            equal_distribution: If True, redistribute time equally among all activities
+            original_start: Required if equal_distribution is True
+            original_duration_seconds: Required if equal_distribution is True
+
+        Returns:
+            New list of activities with the added line
+        """
+        if not activities:
+            raise ValueError("Cannot add activity to empty list")
+
+        if equal_distribution:
+            if original_start is None or original_duration_seconds is None:
+                raise ValueError("original_start and original_duration_seconds required for equal distribution")
+
+            # Redistribute time equally
+            descriptions = [a.description for a in activities] + [""]
+            return TimeCalculator.split_equal(
+                original_start,
+                original_duration_seconds,
+                len(activities) + 1,
+                descriptions
+            )
+        else:
+            # Borrow 1 minute from last activity
+            last = activities[-1]
+            if last.duration_minutes <= 1:
+                raise ValueError("Last activity must have more than 1 minute to add a new line")
+
+            # Create new list with adjusted last activity
+            new_activities = activities[:-1] + [
+                ActivityLine(
+                    description=last.description,
+                    start_time=last.start_time,
+                    duration_minutes=last.duration_minutes - 1,
+                    duration_seconds=last.duration_seconds
+                )
+            ]
+
+            # Add new activity with 1 minute duration
+            new_start = new_activities[-1].end_time
+            remaining_seconds = (original_end - new_start).total_seconds()
+
+            new_activities.append(ActivityLine(
+                description="",
+                start_time=new_start,
+                duration_minutes=int(remaining_seconds // 60),
+                duration_seconds=int(remaining_seconds % 60)
+            ))
+
+            return new_activities
+
+    @staticmethod
+    def remove_activity(activities: list[ActivityLine], index: int) -> list[ActivityLine]:
+        """Remove an activity line and redistribute its duration.
+
+        The removed activity's duration is added to the previous activity
+        (or next activity if removing the first one).
+
+        Args:
+            activities: Current list of activities
+            index: Index of the activity to remove
+
+        Returns:
+            New list of activities with the removed line
+        """
+        if not activities or index < 0 or index >= len(activities):
+            raise ValueError(f"Invalid index: {index}")
+
+        if len(activities) == 1:
+            # Removing the last activity - return empty list (exits split mode)
+            return []
+
+        removed = activities[index]
+        new_activities = []
+
+        if index == 0:
+            # Removing first activity: add its duration to the next one
+            for i, activity in enumerate(activities):
+                if i == 0:
+                    continue  # Skip the removed activity
+                elif i == 1:
+                    # Next activity gets the removed activity's duration
+                    total_seconds = removed.total_duration_seconds + activity.total_duration_seconds
+                    new_activities.append(ActivityLine(
+                        description=activity.description,
+                        start_time=removed.start_time,  # Use removed activity's start time
+                        duration_minutes=int(total_seconds // 60),
+                        duration_seconds=int(total_seconds % 60)
+                    ))
+                else:
+                    # Subsequent activities shift start times
+                    prev_end = new_activities[-1].end_time
+                    new_activities.append(ActivityLine(
+                        description=activity.description,
+                        start_time=prev_end,
+                        duration_minutes=activity.duration_minutes,
+                        duration_seconds=activity.duration_seconds
+                    ))
+        else:
+            # Removing non-first activity: add its duration to the previous one
+            for i, activity in enumerate(activities):
+                if i == index:
+                    continue  # Skip the removed activity
+                elif i == index - 1:
+                    # Previous activity gets the removed activity's duration
+                    total_seconds = activity.total_duration_seconds + removed.total_duration_seconds
+                    new_activities.append(ActivityLine(
+                        description=activity.description,
+                        start_time=activity.start_time,
+                        duration_minutes=int(total_seconds // 60),
+                        duration_seconds=int(total_seconds % 60)
+                    ))
+                elif i > index:
+                    # Subsequent activities shift start times
+                    prev_end = new_activities[-1].end_time
+                    new_activities.append(ActivityLine(
+                        description=activity.description,
+                        start_time=prev_end,
+                        duration_minutes=activity.duration_minutes,
+                        duration_seconds=activity.duration_seconds
+                    ))
+                else:
+                    # Activities before removed one remain the same
+                    new_activities.append(ActivityLine(
+                        description=activity.description,
+                        start_time=activity.start_time,
+                        duration_minutes=activity.duration_minutes,
+                        duration_seconds=activity.duration_seconds
+                    ))
+
+        return new_activities
+
+
+# ============================================================================
+# UI Components
+# ============================================================================
@@ -0,0 +1,161 @@
+"""Ranked suggestions from the messages posted before.
+
+The prompt used to get the raw message of every recent event as its history:
+duplicates included, unranked, rebuilt for every prompt. The SuggestionIndex is
+built once per session from the recent events and updated with every post. It
+keeps one entry per distinct message (compared ignoring case and surrounding
+whitespace), ranked by how often and how recently it was used.
+"""
+
+import bisect
+import datetime
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+HALF_LIFE = datetime.timedelta(days=7)
+"""After this long without use a message ranks half as high."""
+
+
+def _normalize(message: str) -> str:
+    return " ".join(message.split()).lower()
+
+
+@dataclass
+class _Entry:
+    message: str
+    """The message as last typed, with whitespace collapsed"""
+    count: int
+    last_used: datetime.datetime
+
+
+def fuzzy_match(query: str, text: str) -> int | None:
+    """Match the query as a subsequence of the text ("mtg" matches "meeting").
+
+    Args:
+        query: Normalized query
+        text: Normalized text
+
+    Returns:
+        The number of characters skipped between the first and the last matched
+        character (lower is a better match), or None if the query does not match
+    """
+    position = text.find(query[0]) if query else 0
+    if position < 0:
+        return None
+    start = position
+    for char in query[1:]:
+        position = text.find(char, position + 1)
+        if position < 0:
+            return None
+    return position - start + 1 - len(query)
+
+
+class SuggestionIndex:
+    """Deduplicated messages ranked by frequency and recency ("frecency").
+
+    The score of a message is (1 + log(number of uses)) halved for every
+    HALF_LIFE since it was last used. Prefix lookups use a sorted list of the
+    normalized messages; fuzzy lookups scan the distinct messages, which are few
+    compared to the events they come from.
+    """
+
+    def __init__(self, half_life: datetime.timedelta = HALF_LIFE):
+        self.half_life = half_life
+        self._entries: dict[str, _Entry] = {}
+        self._sorted: list[str] = []
+        """The normalized messages, sorted, for prefix lookups"""
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[tuple[str, datetime.datetime]],
+                      half_life: datetime.timedelta = HALF_LIFE) -> "SuggestionIndex":
+        """Build an index from (message, time used) pairs."""
+        index = cls(half_life)
+        for message, used in messages:
+            index.add(message, used)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, message: str) -> bool:
+        return _normalize(message) in self._entries
+
+    def add(self, message: str, used: datetime.datetime) -> None:
+        """Record a use of a message."""
+        key = _normalize(message)
+        if not key:
+            return
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = _Entry(" ".join(message.split()), 1, used)
+            bisect.insort(self._sorted, key)
+            return
+        entry.count += 1
+        if used >= entry.last_used:
+            entry.last_used = used
+            entry.message = " ".join(message.split())
+
+    def score(self, message: str, now: datetime.datetime) -> float:
+        entry = self._entries.get(_normalize(message))
+        if entry is None:
+            return 0.0
+        age = max((now - entry.last_used) / self.half_life, 0)
+        return (1 + math.log(entry.count)) * 0.5 ** age
+
+    def _ranked(self, keys: Iterable[str], now: datetime.datetime) -> list[str]:
+        return sorted(keys, key=lambda key: self.score(key, now), reverse=True)
+
+    def _prefixed(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self._sorted, prefix)
+        end = bisect.bisect_right(self._sorted, prefix + "\U0010ffff")
+        return self._sorted[start:end]
+
+    def history(self, now: datetime.datetime | None = None) -> list[str]:
+        """All messages, the best ranked last (where Up in the prompt starts)."""
+        now = now or datetime.datetime.now(datetime.UTC)
+        return [self._entries[key].message for key in reversed(self._ranked(self._entries, now))]
+
+    def complete(self, text: str, now: datetime.datetime | None = None) -> str | None:
+        """The best ranked message starting with text (ignoring case), for inline completion.
+
+        Returns:
+            The message, or None if no message is longer than the text and starts with it
+        """
+        prefix = _normalize(text)
+        if not prefix:
+            return None
+        if text[-1:].isspace():
+            prefix += " "
+        now = now or datetime.datetime.now(datetime.UTC)
+        candidates = [key for key in self._prefixed(prefix) if len(key) > len(prefix)]
+        if not candidates:
+            return None
+        return self._entries[self._ranked(candidates, now)[0]].message
+
+    def suggest(self, query: str, limit: int = 10, now: datetime.datetime | None = None) -> list[str]:
+        """Messages matching the query, best first.
+
+        Messages starting with the query come first, then messages containing all
+        words of the query, then fuzzy (subsequence) matches; each group ranked by
+        score.
+        """
+        query = _normalize(query)
+        now = now or datetime.datetime.now(datetime.UTC)
+        if not query:
+            return [self._entries[key].message for key in self._ranked(self._entries, now)[:limit]]
+
+        prefixed = self._ranked(self._prefixed(query), now)
+        seen = set(prefixed)
+        words = query.split()
+        containing = self._ranked(
+            (key for key in self._entries if key not in seen and all(word in key for word in words)), now)
+        seen.update(containing)
+        fuzzy = []
+        compact = query.replace(" ", "")
+        for key in self._entries:
+            if key not in seen and (skipped := fuzzy_match(compact, key)) is not None:
+                fuzzy.append((skipped, -self.score(key, now), key))
+        fuzzy.sort()
+        keys = [*prefixed, *containing, *(key for *_, key in fuzzy)]
+        return [self._entries[key].message for key in keys[:limit]]
@@ -1,8 +1,13 @@
 """Utility functions for aw-watcher-afk-prompt."""
 
 import datetime
+import json
 import locale
+import os
+import tempfile
 from datetime import timedelta
+from pathlib import Path
+from typing import Any
 
 LOCAL_TIMEZONE = datetime.datetime.now().astimezone().tzinfo
 
@@ -83,3 +88,26 @@ def format_time_local(dt: datetime.datetime, include_seconds: bool = False) -> s
         return local_dt.strftime("%H:%M:%S")
     else:
         return local_dt.strftime("%H:%M")
+
+
+def write_json_atomic(path: Path, data: Any, indent: int = 4) -> None:
+    """Write data as JSON so that readers see either the old or the new file, never half of one.
+
+    The data is written to a temporary file in the same directory, which then
+    replaces the target in one rename.
+
+    Args:
+        path: The file to write
+        data: Anything json.dump() accepts
+        indent: Indentation of the JSON output
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
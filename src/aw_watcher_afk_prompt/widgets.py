@@ -17,13 +17,17 @@ class EnhancedEntry(ttk.Entry):
     - Ctrl+Backspace / Ctrl+w: Remove word before cursor
     - Ctrl+u: Remove text from cursor to start of line (clear line)
 
+    Given an abbreviation store (see aw_watcher_afk_prompt.abbreviations), it also
+    expands abbreviations when a space is typed after them.
+
     Usage:
-        entry = EnhancedEntry(parent, width=40)
+        entry = EnhancedEntry(parent, width=40, abbreviations=get_abbreviations())
         entry.grid(row=0, column=0)
     """
 
-    def __init__(self, master=None, **kwargs):
+    def __init__(self, master=None, abbreviations=None, **kwargs):
         super().__init__(master, **kwargs)
+        self.abbreviations = abbreviations
         self._bind_keyboard_shortcuts()
 
     def _bind_keyboard_shortcuts(self) -> None:
@@ -32,6 +36,27 @@ class EnhancedEntry(ttk.Entry):
         self.bind("<Control-BackSpace>", self._remove_word)
         self.bind("<Control-w>", self._remove_word)
 
+        if self.abbreviations is not None:
+            self.bind("<KeyRelease>", self._on_key_release, add="+")
+
+    def _on_key_release(self, event) -> None:
+        # Only a typed whitespace character can complete an abbreviation, skip everything else cheaply.
+        if event.char and event.char.isspace():
+            self.expand_abbreviation()
+
+    def expand_abbreviation(self) -> bool:
+        """Expand the abbreviation just typed before the cursor.
+
+        Returns:
+            Whether an abbreviation was expanded
+        """
+        expansion = self.abbreviations.expand(self.get(), self.index(tk.INSERT))
+        if expansion is None:
+            return False
+        self.delete(expansion.start, expansion.end)
+        self.insert(expansion.start, expansion.replacement)
+        return True
+
     def _remove_word(self, event=None):  # noqa: ARG002
         """Remove the word before the cursor.
 
@@ -59,3 +84,139 @@ class EnhancedEntry(ttk.Entry):
         """
         self.delete(0, tk.END)
         self.insert(0, text)
+
+
+class VirtualList(ttk.Frame):
+    """A scrollable list that only keeps the visible rows as widgets.
+
+    A fixed pool of row widgets is created once and recycled while scrolling: on
+    every scroll the rows are rebound to other indices of the caller's model.
+    Opening a list of ten thousand rows costs the same as a list of twenty.
+
+    The caller provides three callbacks:
+    - make_row(parent): create the widget of one row (usually a frame with
+      fixed-width children, so columns line up)
+    - bind_row(widget, index): show model row index in the widget
+    - unbind_row(widget, index): called before a row widget is rebound or the list
+      is flushed, to save edits back to the model (optional)
+
+    Usage:
+        rows = VirtualList(parent, make_row, bind_row, unbind_row, row_count=len(model))
+        rows.grid(row=0, column=0, sticky="nsew")
+    """
+
+    def __init__(self, master, make_row, bind_row, unbind_row=None, row_count: int = 0,
+                 visible_rows: int = 15, **kwargs):
+        super().__init__(master, **kwargs)
+        self.bind_row = bind_row
+        self.unbind_row = unbind_row
+        self.row_count = row_count
+        self.first = 0
+
+        self._wheel_tag = f"VirtualList{id(self)}"
+        self.bind_class(self._wheel_tag, "<MouseWheel>", lambda e: self.scroll(int(-1 * (e.delta / 120))))
+        # enable scroll on a track pad
+        self.bind_class(self._wheel_tag, "<Button-4>", lambda _: self.scroll(-1))
+        self.bind_class(self._wheel_tag, "<Button-5>", lambda _: self.scroll(1))
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, rowspan=max(visible_rows, 1), sticky="ns")
+        self.rows: list[tuple[tk.Widget, int | None]] = []
+        for i in range(visible_rows):
+            widget = make_row(self)
+            widget.grid(row=i, column=0, sticky="ew")
+            self._add_wheel_tag(widget)
+            self.rows.append((widget, None))
+        self.columnconfigure(0, weight=1)
+        self._bind_visible()
+
+    def _add_wheel_tag(self, widget: tk.Misc) -> None:
+        widget.bindtags((*widget.bindtags(), self._wheel_tag))
+        for child in widget.winfo_children():
+            self._add_wheel_tag(child)
+
+    @property
+    def visible_rows(self) -> int:
+        return len(self.rows)
+
+    def _max_first(self) -> int:
+        return max(self.row_count - self.visible_rows, 0)
+
+    def flush(self) -> None:
+        """Save the visible rows back to the model."""
+        if self.unbind_row is None:
+            return
+        for widget, index in self.rows:
+            if index is not None:
+                self.unbind_row(widget, index)
+
+    def _bind_visible(self) -> None:
+        for i, (widget, _) in enumerate(self.rows):
+            index = self.first + i
+            if index < self.row_count:
+                self.bind_row(widget, index)
+                widget.grid()
+                self.rows[i] = (widget, index)
+            else:
+                widget.grid_remove()
+                self.rows[i] = (widget, None)
+        if self.row_count:
+            self.scrollbar.set(self.first / self.row_count,
+                               min(self.first + self.visible_rows, self.row_count) / self.row_count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def refresh(self, row_count: int | None = None) -> None:
+        """Rebind the visible rows, e.g. after the model changed.
+
+        Unlike scrolling this does not save the visible rows first: the model is
+        assumed to be up to date.
+
+        Args:
+            row_count: The new number of rows (default: unchanged)
+        """
+        if row_count is not None:
+            self.row_count = row_count
+        self.first = min(self.first, self._max_first())
+        self._bind_visible()
+
+    def scroll_to(self, first: int) -> None:
+        """Show the rows from index first on."""
+        first = min(max(first, 0), self._max_first())
+        if first == self.first:
+            return
+        self.flush()
+        self.first = first
+        self._bind_visible()
+
+    def scroll(self, rows: int) -> None:
+        self.scroll_to(self.first + rows)
+
+    def see(self, index: int) -> tk.Widget | None:
+        """Scroll as little as possible to show the row, and return its widget."""
+        if index < self.first:
+            self.scroll_to(index)
+        elif index >= self.first + self.visible_rows:
+            self.scroll_to(index - self.visible_rows + 1)
+        return self.widget_for(index)
+
+    def widget_for(self, index: int) -> tk.Widget | None:
+        """The widget currently showing the row, or None if it is not visible."""
+        for widget, shown in self.rows:
+            if shown == index:
+                return widget
+        return None
+
+    def index_of(self, widget: tk.Misc) -> int | None:
+        """The model index shown by a row widget or one of its children."""
+        for row, index in self.rows:
+            if str(widget) == str(row) or str(widget).startswith(f"{row}."):
+                return index
+        return None
+
+    def _on_scrollbar(self, action: str, value: str, unit: str | None = None) -> None:
+        if action == tk.MOVETO:
+            self.scroll_to(round(float(value) * self.row_count))
+        elif action == tk.SCROLL:
+            step = self.visible_rows - 1 if unit == tk.PAGES else 1
+            self.scroll(int(value) * step)
@@ -0,0 +1,41 @@
+"""Shared test helpers."""
+
+from unittest.mock import Mock
+
+import aw_core
+
+Events = list[aw_core.Event] | dict[str, list[aw_core.Event]]
+
+
+def fake_get_events(events: Events):
+    """Mimic aw-server: events overlapping [start, end], newest first, at most limit.
+
+    Args:
+        events: The events of each bucket, or one list of events for any bucket.
+            They are read on every call, so tests may change them in between.
+    """
+
+    def get_events(bucket_id, limit=-1, start=None, end=None):
+        found = [e for e in (events if isinstance(events, list) else events.get(bucket_id, []))
+                 if (start is None or e.timestamp + e.duration >= start) and (end is None or e.timestamp <= end)]
+        found.sort(key=lambda e: e.timestamp, reverse=True)
+        return found if limit < 0 else found[:limit]
+
+    return get_events
+
+
+def fake_client(events: Events, hostname: str = "host", buckets: dict | None = None) -> Mock:
+    """A mock ActivityWatchClient reading the given events like aw-server.
+
+    Args:
+        events: The events of each bucket, or one list of events for any bucket
+        hostname: The client_hostname
+        buckets: What get_buckets() returns (default: the buckets of events)
+    """
+    client = Mock()
+    client.client_hostname = hostname
+    if buckets is None:
+        buckets = {bucket: {} for bucket in events} if isinstance(events, dict) else {}
+    client.get_buckets.return_value = buckets
+    client.get_events.side_effect = fake_get_events(events)
+    return client
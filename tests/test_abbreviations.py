@@ -0,0 +1,104 @@
+"""Tests for the abbreviation store."""
+
+import json
+import time
+
+from aw_watcher_afk_prompt.abbreviations import AbbreviationStore, AbbreviationTrie, Expansion
+
+
+def test_loads_and_sorts(tmp_path) -> None:
+    path = tmp_path / "abbreviations.json"
+    path.write_text(json.dumps({"mtg": "meeting", "brb": "be right back"}))
+
+    store = AbbreviationStore(path)
+
+    assert store["mtg"] == "meeting"
+    assert store.sorted_keys == ["brb", "mtg"]
+
+
+def test_keeps_keys_sorted_on_changes(tmp_path) -> None:
+    store = AbbreviationStore(tmp_path / "abbreviations.json", save_delay=60)
+
+    store["mtg"] = "meeting"
+    store["afk"] = "away"
+    store["lu"] = "lunch"
+    del store["afk"]
+    store.rename("lu", "ln", "lunch")
+
+    assert store.sorted_keys == ["ln", "mtg"]
+    assert store.index("mtg") == 1
+    assert dict(store) == {"ln": "lunch", "mtg": "meeting"}
+
+
+def test_filter_matches_abbreviation_and_expansion(tmp_path) -> None:
+    store = AbbreviationStore(tmp_path / "abbreviations.json", save_delay=60)
+    store.update({"mtg": "Meeting", "lu": "lunch", "pc": "phone call"})
+
+    assert store.filter("") == ["lu", "mtg", "pc"]
+    assert store.filter("MEET") == ["mtg"]
+    assert store.filter("l") == ["lu", "pc"]
+
+
+def test_saves_are_debounced(tmp_path) -> None:
+    path = tmp_path / "abbreviations.json"
+    store = AbbreviationStore(path, save_delay=0.05)
+
+    for i in range(100):
+        store[f"a{i}"] = f"expansion {i}"
+    assert not path.exists()
+
+    time.sleep(0.3)
+    assert len(json.loads(path.read_text())) == 100
+
+
+def test_flush_writes_pending_changes(tmp_path) -> None:
+    path = tmp_path / "abbreviations.json"
+    store = AbbreviationStore(path, save_delay=60)
+    store["mtg"] = "meeting"
+
+    store.flush()
+
+    assert json.loads(path.read_text()) == {"mtg": "meeting"}
+    assert AbbreviationStore(path)["mtg"] == "meeting"
+
+
+def test_trie_expands_word_before_typed_space() -> None:
+    trie = AbbreviationTrie({"mtg": "meeting", "lu": "lunch"})
+
+    assert trie.match("team mtg ", 9) == Expansion(5, 8, "meeting")
+    assert trie.match("team mtg", 8) is None  # no space typed yet
+    assert trie.match("team mtg  ", 10) is None
+    assert trie.match("xmtg ", 5) is None  # not a whole word
+    assert trie.match("what'lu ", 8) is None
+    assert trie.match("mtg and more", 4) == Expansion(0, 3, "meeting")  # cursor in the middle
+
+
+def test_trie_multi_word_and_longest_match() -> None:
+    trie = AbbreviationTrie({"o o o": "out of office", "o": "other"})
+
+    assert trie.match("was o o o ", 10) == Expansion(4, 9, "out of office")
+    assert trie.match("was o ", 6) == Expansion(4, 5, "other")
+
+
+def test_trie_preserves_case() -> None:
+    trie = AbbreviationTrie({"mtg": "team meeting", "NASA": "the space agency"})
+
+    assert trie.match("Mtg ", 4).replacement == "Team meeting"
+    assert trie.match("MTG ", 4).replacement == "TEAM MEETING"
+    assert trie.match("NASA ", 5).replacement == "the space agency"  # exact match, as stored
+    assert trie.match("nasa ", 5).replacement == "the space agency"
+
+
+def test_trie_incremental_updates(tmp_path) -> None:
+    store = AbbreviationStore(tmp_path / "abbreviations.json", save_delay=60)
+    store["mtg"] = "meeting"
+    assert store.expand("mtg ", 4).replacement == "meeting"
+
+    store.rename("mtg", "m", "meeting")
+    assert store.expand("mtg ", 4) is None
+    assert store.expand("m ", 2).replacement == "meeting"
+
+    del store["m"]
+    assert store.expand("m ", 2) is None
+    assert len(store.trie) == 0
+    assert store.trie._root == {}
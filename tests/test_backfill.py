@@ -0,0 +1,138 @@
+"""Tests for the windowed backfill engine."""
+
+import datetime
+from unittest.mock import Mock, patch
+
+import aw_core
+
+from aw_watcher_afk_prompt.backfill import BackfillEngine, split_range
+from aw_watcher_afk_prompt.core import AWAfkPromptClient
+from aw_watcher_afk_prompt.daemon import Endpoint, EndpointPoller
+from aw_watcher_afk_prompt.rules import RULE_KEY, RuleEngine, rule_from_config
+from tests.conftest import fake_client
+
+NOW = datetime.datetime(2025, 1, 15, 12, 0, tzinfo=datetime.UTC)
+AFK_BUCKET = "aw-watcher-afk_host"
+OWN_BUCKET = "aw-watcher-afk-prompt_host"
+
+
+def make_event(id: int, hours_ago: float, duration_hours: float, status: str | None = None) -> aw_core.Event:
+    return aw_core.Event(
+        id=id,
+        timestamp=NOW - datetime.timedelta(hours=hours_ago),
+        duration=datetime.timedelta(hours=duration_hours),
+        data={"status": status} if status else {"message": "answered"},
+    )
+
+
+def make_client(tmp_path, events_by_bucket, **kwargs) -> tuple[AWAfkPromptClient, Mock]:
+    mock_client = fake_client(events_by_bucket, buckets={AFK_BUCKET: {}, OWN_BUCKET: {}})
+    with patch("appdirs.user_config_dir", return_value=str(tmp_path)):
+        client = AWAfkPromptClient(mock_client, enable_lid_events=False, cache_window_minutes=60, **kwargs)
+    mock_client.get_events.reset_mock()
+    return client, mock_client
+
+
+def test_split_range() -> None:
+    windows = split_range(NOW - datetime.timedelta(hours=15), NOW, datetime.timedelta(hours=6))
+    assert [(NOW - s, NOW - e) for s, e in windows] == [
+        (datetime.timedelta(hours=15), datetime.timedelta(hours=9)),
+        (datetime.timedelta(hours=9), datetime.timedelta(hours=3)),
+        (datetime.timedelta(hours=3), datetime.timedelta(0)),
+    ]
+
+
+def test_finds_gaps_across_windows_and_days(tmp_path) -> None:
+    client, _ = make_client(tmp_path, {AFK_BUCKET: [
+        make_event(1, 100, 2, "not-afk"),
+        make_event(2, 98, 30, "afk"),
+        make_event(3, 68, 1, "not-afk"),  # a 30 hour gap spanning many windows
+        make_event(4, 10, 1, "not-afk"),
+        make_event(5, 5, 1, "not-afk"),
+    ]})
+
+    gaps = BackfillEngine.for_prompt_client(client).find_gaps(datetime.timedelta(days=7), durration_thresh=60, now=NOW)
+
+    assert [(NOW - g.timestamp, g.duration) for g in gaps] == [
+        (datetime.timedelta(hours=98), datetime.timedelta(hours=30)),
+        (datetime.timedelta(hours=67), datetime.timedelta(hours=57)),
+        (datetime.timedelta(hours=9), datetime.timedelta(hours=4)),
+    ]
+
+
+def test_gap_starting_before_range_keeps_its_start(tmp_path) -> None:
+    client, _ = make_client(tmp_path, {AFK_BUCKET: [
+        make_event(1, 40, 1, "not-afk"),
+        make_event(2, 2, 1, "not-afk"),
+    ]})
+
+    gaps = BackfillEngine.for_prompt_client(client).find_gaps(datetime.timedelta(hours=24), durration_thresh=60, now=NOW)
+
+    assert [(NOW - g.timestamp, g.duration) for g in gaps] == [
+        (datetime.timedelta(hours=39), datetime.timedelta(hours=37)),
+    ]
+
+
+def test_lead_in_grows_past_afk_heartbeats(tmp_path) -> None:
+    # A minute long afk heartbeat for each of the 50 minutes before the range
+    heartbeats = [make_event(i, 24 + (i - 1) / 60, 1 / 60, "afk") for i in range(2, 52)]
+    client, mock_client = make_client(tmp_path, {AFK_BUCKET: [make_event(1, 40, 1, "not-afk"), *heartbeats,
+                                                              make_event(60, 2, 1, "not-afk")]})
+
+    gaps = BackfillEngine.for_prompt_client(client).find_gaps(datetime.timedelta(hours=24), durration_thresh=60, now=NOW)
+
+    assert [(NOW - g.timestamp, g.duration) for g in gaps] == [
+        (datetime.timedelta(hours=39), datetime.timedelta(hours=37)),
+    ]
+    limits = [call.kwargs["limit"] for call in mock_client.get_events.call_args_list if "limit" in call.kwargs]
+    assert limits == [20, 40, 80]
+
+
+def test_answered_gaps_are_skipped(tmp_path) -> None:
+    client, _ = make_client(tmp_path, {
+        AFK_BUCKET: [make_event(1, 50, 1, "not-afk"), make_event(2, 30, 1, "not-afk"), make_event(3, 10, 1, "not-afk")],
+        OWN_BUCKET: [make_event(10, 49, 19)],
+    })
+
+    gaps = BackfillEngine.for_prompt_client(client).find_gaps(datetime.timedelta(days=3), durration_thresh=60, now=NOW)
+
+    assert [NOW - g.timestamp for g in gaps] == [datetime.timedelta(hours=29)]
+
+
+def test_fetches_every_window_with_bounds(tmp_path) -> None:
+    client, mock_client = make_client(tmp_path, {})
+
+    BackfillEngine.for_prompt_client(client, window=datetime.timedelta(hours=12)).find_gaps(
+        datetime.timedelta(days=2), durration_thresh=60, now=NOW)
+
+    calls = [(call.args[0], call.kwargs) for call in mock_client.get_events.call_args_list]
+    for bucket in (AFK_BUCKET, OWN_BUCKET):
+        starts = sorted(kwargs["start"] for b, kwargs in calls if b == bucket and "start" in kwargs)
+        assert starts == [NOW - datetime.timedelta(hours=h) for h in (48, 36, 24, 12)]
+    assert (AFK_BUCKET, {"end": NOW - datetime.timedelta(days=2), "limit": 20}) in calls
+
+
+def test_poller_backfill_queues_gaps(tmp_path) -> None:
+    client, _ = make_client(tmp_path, {AFK_BUCKET: [make_event(1, 30, 1, "not-afk"), make_event(2, 10, 1, "not-afk")]})
+    poller = EndpointPoller({Endpoint(): client})
+
+    with patch("aw_watcher_afk_prompt.backfill.get_utc_now", return_value=NOW):
+        assert poller.backfill(seconds=2 * 24 * 3600, durration_thresh=60) == 1
+    assert [p.event.duration for p in poller.pending()] == [datetime.timedelta(hours=19)]
+
+
+def test_poller_backfill_answers_gaps_by_rules(tmp_path) -> None:
+    rules = RuleEngine([rule_from_config({"name": "night", "message": "sleep", "min_duration": 600})])
+    client, mock_client = make_client(tmp_path, {AFK_BUCKET: [
+        make_event(1, 30, 1, "not-afk"), make_event(2, 10, 1, "not-afk"), make_event(3, 8.5, 0.5, "not-afk")]},
+        rules=rules)
+    poller = EndpointPoller({Endpoint(): client})
+
+    with patch("aw_watcher_afk_prompt.backfill.get_utc_now", return_value=NOW):
+        assert poller.backfill(seconds=2 * 24 * 3600, durration_thresh=60) == 1
+
+    # The 19 hour gap is answered by the rule, the half hour after it is asked about
+    assert [p.event.duration for p in poller.pending()] == [datetime.timedelta(minutes=30)]
+    posted = mock_client.insert_event.call_args.args[1]
+    assert (posted.duration, posted.data["message"], posted.data[RULE_KEY]) == (
+        datetime.timedelta(hours=19), "sleep", "night")
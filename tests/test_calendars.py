@@ -0,0 +1,187 @@
+"""Tests for the meetings read from local calendar files."""
+
+import datetime
+import os
+import time
+import zoneinfo
+
+from aw_watcher_afk_prompt import calendars
+from aw_watcher_afk_prompt.calendars import TITLE_KEY, CalendarIndex, parse_ics, split_by_meetings
+
+UTC = datetime.UTC
+NOW = datetime.datetime(2025, 1, 15, 12, 0, tzinfo=UTC)  # a Wednesday
+SINCE = NOW - datetime.timedelta(days=31)
+UNTIL = NOW + datetime.timedelta(days=7)
+
+
+def calendar(*events: str) -> str:
+    return "\r\n".join(["BEGIN:VCALENDAR", "VERSION:2.0", *events, "END:VCALENDAR"]) + "\r\n"
+
+
+def vevent(*lines: str) -> str:
+    return "\r\n".join(["BEGIN:VEVENT", *lines, "END:VEVENT"])
+
+
+def utc(day: int, hour: int, minute: int = 0) -> datetime.datetime:
+    return datetime.datetime(2025, 1, day, hour, minute, tzinfo=UTC)
+
+
+def titles(meetings) -> list[tuple[datetime.datetime, str]]:
+    return sorted((m.timestamp, m.data[TITLE_KEY]) for m in meetings)
+
+
+def test_parses_single_events() -> None:
+    text = calendar(
+        vevent("UID:1", "SUMMARY:Design review\\, part 2", "DTSTART:20250115T100000Z", "DTEND:20250115T110000Z",
+               "BEGIN:VALARM", "TRIGGER:-PT15M", "SUMMARY:Alarm", "END:VALARM"),
+        vevent("UID:2", "SUMMARY:1:1 with", "  Alex", "DTSTART;TZID=Europe/Oslo:20250115T140000", "DURATION:PT30M"),
+        vevent("UID:3", "SUMMARY:Holiday", "DTSTART;VALUE=DATE:20250115"),
+        vevent("UID:4", "SUMMARY:Cancelled", "STATUS:CANCELLED", "DTSTART:20250115T090000Z", "DURATION:PT1H"),
+    )
+
+    meetings = parse_ics(text, SINCE, UNTIL)
+
+    assert titles(meetings) == [(utc(15, 10), "Design review, part 2"), (utc(15, 13), "1:1 with Alex")]
+    assert meetings[1].duration == datetime.timedelta(minutes=30)
+
+
+def test_expands_weekly_recurrences_with_exceptions() -> None:
+    text = calendar(
+        vevent("UID:standup", "SUMMARY:Standup", "DTSTART:20250106T083000Z", "DTEND:20250106T084500Z",
+               "RRULE:FREQ=WEEKLY;BYDAY=MO,WE;COUNT=5", "EXDATE:20250108T083000Z"),
+        vevent("UID:standup", "RECURRENCE-ID:20250113T083000Z", "SUMMARY:Standup (moved)",
+               "DTSTART:20250113T100000Z", "DTEND:20250113T101500Z"),
+    )
+
+    assert titles(parse_ics(text, SINCE, UNTIL)) == [
+        (utc(6, 8, 30), "Standup"),
+        (utc(13, 10), "Standup (moved)"),
+        (utc(15, 8, 30), "Standup"),
+        (utc(20, 8, 30), "Standup"),
+    ]
+
+
+def test_expands_monthly_and_daily_recurrences_within_range() -> None:
+    text = calendar(
+        vevent("UID:a", "SUMMARY:Retro", "DTSTART:20240105T150000Z", "DURATION:PT1H", "RRULE:FREQ=MONTHLY;BYDAY=-1FR"),
+        vevent("UID:b", "SUMMARY:Lunch", "DTSTART:20200101T110000Z", "DURATION:PT30M",
+               "RRULE:FREQ=DAILY;UNTIL=20250116T235959Z"),
+    )
+
+    meetings = titles(parse_ics(text, NOW - datetime.timedelta(days=2), UNTIL))
+
+    assert [m for m in meetings if m[1] == "Retro"] == []  # the last Friday of January is the 31st
+    assert [m[0] for m in meetings if m[1] == "Lunch"] == [utc(14, 11), utc(15, 11), utc(16, 11)]
+    assert titles(parse_ics(text, utc(30, 0), utc(31, 23)))[0] == (utc(31, 15), "Retro")
+
+
+def test_recurrences_keep_their_wall_clock_time_across_dst(monkeypatch) -> None:
+    monkeypatch.setattr(calendars, "LOCAL_ZONE", zoneinfo.ZoneInfo("Europe/Oslo"))
+    text = calendar(
+        vevent("UID:a", "SUMMARY:Floating", "DTSTART:20250324T090000", "DURATION:PT1H", "RRULE:FREQ=WEEKLY;COUNT=2"),
+        vevent("UID:b", "SUMMARY:Unknown zone", "DTSTART;TZID=W. Europe Standard Time:20250324T100000",
+               "DURATION:PT1H", "RRULE:FREQ=WEEKLY;COUNT=2"),
+    )
+
+    meetings = titles(parse_ics(text, datetime.datetime(2025, 3, 20, tzinfo=UTC), datetime.datetime(2025, 4, 5, tzinfo=UTC)))
+
+    # Oslo moves from UTC+1 to UTC+2 on March 30
+    assert [m[0].isoformat() for m in meetings] == [
+        "2025-03-24T08:00:00+00:00", "2025-03-24T09:00:00+00:00",
+        "2025-03-31T07:00:00+00:00", "2025-03-31T08:00:00+00:00",
+    ]
+
+
+def test_weekly_intervals_count_weeks_from_wkst() -> None:
+    # The example of RFC 5545: the same rule lands on other days depending on WKST
+    rule = "RRULE:FREQ=WEEKLY;INTERVAL=2;COUNT=4;BYDAY=TU,SU;WKST="
+    since, until = datetime.datetime(1997, 8, 1, tzinfo=UTC), datetime.datetime(1997, 9, 10, tzinfo=UTC)
+
+    for week_start, days in (("MO", [5, 10, 19, 24]), ("SU", [5, 17, 19, 31])):
+        text = calendar(vevent("UID:a", "SUMMARY:Sync", "DTSTART:19970805T090000Z", "DURATION:PT1H", rule + week_start))
+        assert [m[0].day for m in titles(parse_ics(text, since, until))] == days  # all in August
+
+
+def test_until_is_read_in_the_timezone_of_dtstart(monkeypatch) -> None:
+    monkeypatch.setattr(calendars, "LOCAL_ZONE", datetime.timezone(datetime.timedelta(hours=5)))
+    text = calendar(
+        vevent("UID:a", "SUMMARY:Floating", "DTSTART:20250113T090000", "DURATION:PT30M",
+               "RRULE:FREQ=DAILY;UNTIL=20250115T083000"),
+        vevent("UID:b", "SUMMARY:Oslo", "DTSTART;TZID=Europe/Oslo:20250113T090000", "DURATION:PT30M",
+               "RRULE:FREQ=DAILY;UNTIL=20250115T080000Z"),
+        vevent("UID:c", "SUMMARY:Date", "DTSTART:20250113T120000Z", "DURATION:PT30M", "RRULE:FREQ=DAILY;UNTIL=20250114"),
+    )
+
+    meetings = titles(parse_ics(text, SINCE, UNTIL))
+
+    assert [m[0] for m in meetings if m[1] == "Floating"] == [utc(13, 4), utc(14, 4)]
+    assert [m[0] for m in meetings if m[1] == "Oslo"] == [utc(13, 8), utc(14, 8), utc(15, 8)]
+    assert [m[0] for m in meetings if m[1] == "Date"] == [utc(13, 12), utc(14, 12)]
+
+
+def test_index_only_parses_changed_files(tmp_path) -> None:
+    (tmp_path / "a.ics").write_text(calendar(vevent("UID:1", "SUMMARY:Review", "DTSTART:20250115T100000Z",
+                                                    "DURATION:PT1H")))
+    (tmp_path / "b.ics").write_text(calendar())
+    index = CalendarIndex([tmp_path], check_interval=0)
+
+    assert index.refresh(now=NOW)
+    assert not index.refresh(now=NOW)
+    assert titles(index.meetings(utc(15, 10, 30), utc(15, 12))) == [(utc(15, 10), "Review")]
+
+    path = tmp_path / "b.ics"
+    path.write_text(calendar(vevent("UID:2", "SUMMARY:Planning", "DTSTART:20250115T110000Z", "DURATION:PT1H")))
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert index.refresh(now=NOW)
+    assert titles(index.meetings(utc(15, 10, 30), utc(15, 12))) == [(utc(15, 10), "Review"), (utc(15, 11), "Planning")]
+
+    path.unlink()
+    assert index.refresh(now=NOW)
+    assert len(index.meetings(utc(15, 0), utc(16, 0))) == 1
+
+
+def test_meetings_only_read_the_background_refresh(tmp_path) -> None:
+    start = datetime.datetime.now(UTC).replace(microsecond=0) + datetime.timedelta(hours=1)
+    (tmp_path / "a.ics").write_text(calendar(vevent("UID:1", "SUMMARY:Review",
+                                                    f"DTSTART:{start.strftime('%Y%m%dT%H%M%SZ')}", "DURATION:PT1H")))
+    index = CalendarIndex([tmp_path], check_interval=0.01)
+
+    # The prompt path never reads the files itself
+    assert index.meetings(start, start + datetime.timedelta(hours=1)) == []
+
+    index.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not index.meetings(start, start + datetime.timedelta(hours=1)) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert titles(index.meetings(start, start + datetime.timedelta(hours=1))) == [(start, "Review")]
+    finally:
+        index.stop()
+
+
+def test_split_by_meetings() -> None:
+    meetings = parse_ics(calendar(
+        vevent("UID:1", "SUMMARY:Review", "DTSTART:20250115T100000Z", "DURATION:PT30M"),
+        vevent("UID:2", "SUMMARY:Planning", "DTSTART:20250115T103000Z", "DURATION:PT20M"),
+    ), SINCE, UNTIL)
+
+    lines = split_by_meetings(utc(15, 9, 50), 3600, meetings)
+
+    assert [(line.start_time, line.description, line.duration_minutes) for line in lines] == [
+        (utc(15, 9, 50), "", 10),
+        (utc(15, 10), "Review", 30),
+        (utc(15, 10, 30), "Planning", 20),
+    ]
+    assert lines[-1].end_time == utc(15, 10, 50)
+
+
+def test_split_by_meetings_keeps_asked_boundaries() -> None:
+    meetings = parse_ics(calendar(
+        vevent("UID:1", "SUMMARY:Review", "DTSTART:20250115T100000Z", "DURATION:PT1H"),
+    ), SINCE, UNTIL)
+
+    lines = split_by_meetings(utc(15, 10), 3600, meetings, boundaries=[utc(15, 10, 20)])
+
+    assert [(line.start_time, line.description) for line in lines] == [
+        (utc(15, 10), "Review"), (utc(15, 10, 20), "Review")]
+    assert lines[-1].end_time == utc(15, 11)
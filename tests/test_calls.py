@@ -0,0 +1,136 @@
+"""Tests for recognizing the gaps spent in video calls."""
+
+import datetime
+from unittest.mock import Mock
+
+import aw_core
+import pytest
+
+from aw_watcher_afk_prompt import core
+from aw_watcher_afk_prompt.calls import CallDetector
+from aw_watcher_afk_prompt.core import DATA_KEY, AWAfkPromptClient
+from tests.conftest import fake_client
+
+NOW = datetime.datetime(2025, 1, 15, 12, 0, tzinfo=datetime.UTC)
+AFK_BUCKET = "aw-watcher-afk_laptop"
+WINDOW_BUCKET = "aw-watcher-window_laptop"
+
+
+def at(minutes_ago: float) -> datetime.datetime:
+    return NOW - datetime.timedelta(minutes=minutes_ago)
+
+
+def window(minutes_ago: float, minutes: float, title: str, app: str = "Firefox") -> aw_core.Event:
+    return aw_core.Event(timestamp=at(minutes_ago), duration=datetime.timedelta(minutes=minutes),
+                         data={"app": app, "title": title})
+
+
+def status(minutes_ago: float, minutes: float, value: str) -> aw_core.Event:
+    return aw_core.Event(timestamp=at(minutes_ago), duration=datetime.timedelta(minutes=minutes),
+                         data={"status": value})
+
+
+def gap(minutes_ago: float, minutes: float) -> aw_core.Event:
+    return aw_core.Event(timestamp=at(minutes_ago), duration=datetime.timedelta(minutes=minutes))
+
+
+def test_patterns_match_titles_and_apps() -> None:
+    detector = CallDetector(apps=["^zoom\\.us$"])
+
+    assert detector.is_call(window(0, 1, "Meet - abc-defg-hij - Google Chrome"))
+    assert detector.is_call(window(0, 1, "Meeting in General | Microsoft Teams", app="Teams"))
+    assert detector.is_call(window(0, 1, "", app="zoom.us"))
+    assert not detector.is_call(window(0, 1, "Meeting notes - Google Docs"))
+    with pytest.raises(ValueError, match="Invalid call pattern"):
+        CallDetector(titles=["("])
+    assert CallDetector.from_config({"call_action": "off"}) is None
+
+
+def test_find_calls_bridges_short_switches() -> None:
+    detector = CallDetector()
+    calls = detector.find_calls([
+        window(60, 20, "Zoom Meeting", app="zoom.us"),
+        window(40, 1, "Slack | general"),
+        window(39, 19, "Zoom Meeting", app="zoom.us"),
+        window(10, 5, "Zoom Meeting", app="zoom.us"),
+    ])
+
+    assert [(c.timestamp, c.duration) for c in calls] == [
+        (at(60), datetime.timedelta(minutes=40)), (at(10), datetime.timedelta(minutes=5))]
+    assert calls[0].data == {"app": "zoom.us", "title": "Zoom Meeting"}
+    assert detector.covering(gap(45, 10), calls) is calls[0]
+    assert detector.covering(gap(22, 10), calls) is None  # mostly after the call
+
+
+def make_client(events_by_bucket: dict[str, list[aw_core.Event]], **kwargs) -> tuple[AWAfkPromptClient, Mock]:
+    mock_client = fake_client(events_by_bucket, hostname="laptop", buckets={AFK_BUCKET: {}, WINDOW_BUCKET: {}})
+    client = AWAfkPromptClient(mock_client, enable_lid_events=False, calls=CallDetector(**kwargs))
+    return client, mock_client
+
+
+def window_requests(mock_client: Mock) -> list[datetime.datetime]:
+    return [call.kwargs["start"] for call in mock_client.get_events.call_args_list if call.args[0] == WINDOW_BUCKET]
+
+
+@pytest.fixture
+def now(monkeypatch: pytest.MonkeyPatch) -> list[datetime.datetime]:
+    clock = [NOW]
+    monkeypatch.setattr(core, "get_utc_now", lambda: clock[0])
+    return clock
+
+
+def test_gaps_in_a_call_are_asked_about_once_it_is_over(now) -> None:
+    events = {
+        AFK_BUCKET: [status(40, 2, "not-afk"), status(38, 10, "afk"), status(28, 1, "not-afk"),
+                     status(27, 10, "afk"), status(17, 2, "not-afk")],
+        WINDOW_BUCKET: [window(40, 30, "Zoom Meeting", app="zoom.us")],
+    }
+    client, mock_client = make_client(events)
+
+    # Still in the call: the gaps are held back
+    events[WINDOW_BUCKET][0].duration = datetime.timedelta(minutes=25)
+    now[0] = at(15)
+    assert list(client.get_new_afk_events_to_note(3600, 60)) == []
+    assert len(window_requests(mock_client)) == 1
+
+    # The call is over
+    events[WINDOW_BUCKET][0].duration = datetime.timedelta(minutes=30)
+    events[WINDOW_BUCKET].append(window(10, 10, "core.py - Code", app="Code"))
+    events[AFK_BUCKET].append(status(15, 15, "not-afk"))
+    now[0] = NOW
+    gaps = list(client.get_new_afk_events_to_note(3600, 60))
+
+    assert [(g.timestamp, g.duration) for g in gaps] == [(at(38), datetime.timedelta(minutes=21))]
+    # The second poll only fetched the windows since the newest one it had
+    assert window_requests(mock_client) == [at(38), at(40)]
+
+
+def test_gaps_in_a_call_can_be_labelled(now) -> None:
+    events = {
+        AFK_BUCKET: [status(40, 2, "not-afk"), status(38, 10, "afk"), status(28, 1, "not-afk"),
+                     status(27, 10, "afk"), status(17, 17, "not-afk")],
+        WINDOW_BUCKET: [window(40, 15, "Meet - abc-defg-hij"), window(25, 25, "Inbox")],
+    }
+    client, mock_client = make_client(events, action="label", label="standup")
+
+    gaps = list(client.get_new_afk_events_to_note(3600, 60))
+
+    # The first gap was the call, the second one was not
+    assert [g.timestamp for g in gaps] == [at(27)]
+    posted = mock_client.insert_event.call_args.args[1]
+    assert (posted.timestamp, posted.data[DATA_KEY]) == (at(38), "standup")
+    assert client.state.has_event(gap(38, 10))
+
+
+def test_failed_call_labels_are_logged(now, caplog) -> None:
+    events = {
+        AFK_BUCKET: [status(40, 2, "not-afk"), status(38, 10, "afk"), status(28, 28, "not-afk")],
+        WINDOW_BUCKET: [window(40, 15, "Meet - abc-defg-hij"), window(25, 25, "Inbox")],
+    }
+    client, mock_client = make_client(events, action="label", label="standup")
+    mock_client.insert_event.side_effect = ConnectionError("server down")
+
+    assert list(client.get_new_afk_events_to_note(3600, 60)) == []
+
+    assert "Failed to post the call label 'standup'" in caplog.text
+    assert not client.state.has_event(gap(38, 10))
@@ -0,0 +1,104 @@
+"""Tests for tagging the posted answers with categories."""
+
+import datetime
+from unittest.mock import Mock
+
+import aw_core
+import pytest
+
+from aw_watcher_afk_prompt.classify import CATEGORY_KEY, TAGS_KEY, Classifier, category_from_config
+from aw_watcher_afk_prompt.core import DATA_KEY, AWAfkPromptClient
+from aw_watcher_afk_prompt.edit import retag
+
+START = datetime.datetime(2025, 1, 15, tzinfo=datetime.UTC)
+BUCKET = "aw-watcher-afk-prompt_laptop"
+
+CLASSIFIER = Classifier.from_config({"categories": [
+    {"name": "meetings", "match": ["meeting", "stand-?up"], "keywords": ["sync"], "tags": ["work"]},
+    {"name": "breaks", "keywords": ["lunch", "coffee"]},
+    {"name": "social", "match": ["with (alex|sam)"]},
+]})
+
+
+def make_event(id: int, minutes: float, message: str, **data) -> aw_core.Event:
+    return aw_core.Event(id=id, timestamp=START + datetime.timedelta(minutes=minutes),
+                         duration=datetime.timedelta(minutes=5), data={DATA_KEY: message, **data})
+
+
+def test_classify() -> None:
+    assert CLASSIFIER.classify("Team Meeting") == ("meetings", ["meetings", "work"])
+    assert CLASSIFIER.classify("standup") == ("meetings", ["meetings", "work"])
+    assert CLASSIFIER.classify("lunch with Alex") == ("breaks", ["breaks", "social"])
+    assert CLASSIFIER.classify("coffee sync with sam") == ("meetings", ["breaks", "meetings", "social", "work"])
+    # Keywords are whole words
+    assert CLASSIFIER.classify("syncing the repo") == (None, [])
+    assert CLASSIFIER.classify("") == (None, [])
+
+
+def test_backreferences_match_their_own_groups() -> None:
+    classifier = Classifier.from_config({"categories": [
+        {"name": "social", "match": ["with (alex|sam)"]},
+        {"name": "repeated", "match": [r"\b(\w+) \1\b"]},
+    ]})
+
+    assert classifier.classify("bye bye") == ("repeated", ["repeated"])
+    assert classifier.classify("chat with sam") == ("social", ["social"])
+    assert classifier.classify("with alex alex") == ("social", ["repeated", "social"])
+
+
+def test_invalid_categories() -> None:
+    with pytest.raises(ValueError, match="at least one"):
+        category_from_config({"name": "empty"})
+    with pytest.raises(ValueError, match="invalid pattern"):
+        category_from_config({"name": "broken", "match": ["("]})
+    assert Classifier.from_config({}) is None
+
+
+def test_apply_reports_changes() -> None:
+    event = make_event(1, 0, "lunch", split=True)
+
+    assert CLASSIFIER.apply(event, "lunch")
+    assert event.data == {DATA_KEY: "lunch", "split": True, CATEGORY_KEY: "breaks", TAGS_KEY: ["breaks"]}
+    assert not CLASSIFIER.apply(event, "lunch")
+    assert CLASSIFIER.apply(event, "reading")
+    assert event.data == {DATA_KEY: "lunch", "split": True}
+
+
+def test_posted_events_are_tagged() -> None:
+    mock_client = Mock()
+    mock_client.client_hostname = "laptop"
+    mock_client.get_buckets.return_value = {"aw-watcher-afk_laptop": {}, BUCKET: {}}
+    mock_client.get_events.return_value = []
+    client = AWAfkPromptClient(mock_client, enable_lid_events=False, classifier=CLASSIFIER)
+
+    client.post_event(aw_core.Event(timestamp=START, duration=datetime.timedelta(minutes=30)), "Sprint meeting")
+
+    posted = mock_client.insert_event.call_args.args[1]
+    assert (posted.data[CATEGORY_KEY], posted.data[TAGS_KEY]) == ("meetings", ["meetings", "work"])
+
+
+def test_retag_pages_and_batches() -> None:
+    events = [
+        make_event(1, 0, "lunch"),
+        make_event(2, 10, "lunch", category="breaks", tags=["breaks"]),  # up to date
+        make_event(3, 20, "reading", category="old", tags=["old"]),  # no longer matches
+        make_event(4, 30, "sync"),
+        make_event(5, 40, "unknown"),
+    ]
+
+    def get_events(bucket_id, limit=-1, start=None, end=None):
+        found = [e for e in events if e.timestamp <= end and (start is None or e.timestamp >= start)]
+        return sorted(found, key=lambda e: e.timestamp, reverse=True)[:limit]
+
+    client = Mock()
+    client.get_events.side_effect = get_events
+    progress = Mock()
+
+    updated = retag(client, BUCKET, CLASSIFIER, end=START + datetime.timedelta(hours=1), page_size=2, batch_size=2,
+                    progress=progress)
+
+    assert updated == 3
+    assert progress.call_args.args == (5, 3)
+    written = [[e.id for e in call.args[1]] for call in client.insert_events.call_args_list]
+    assert written == [[4, 3], [1]]
+    assert events[2].data == {DATA_KEY: "reading"}
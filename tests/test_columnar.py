@@ -0,0 +1,86 @@
+"""Tests for the numpy columnar engine, cross-checked against the streaming implementation."""
+
+import datetime
+import random
+
+import aw_core
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from aw_watcher_afk_prompt import columnar  # noqa: E402
+from aw_watcher_afk_prompt.core import AWAfkPromptState, find_activity_gaps, get_gaps, squash_overlaps  # noqa: E402
+from aw_watcher_afk_prompt.intervals import CoverageIndex  # noqa: E402
+
+START = datetime.datetime(2025, 1, 15, tzinfo=datetime.UTC)
+
+
+def random_events(rng: random.Random, count: int) -> list[aw_core.Event]:
+    events = []
+    for _ in range(count):
+        events.append(aw_core.Event(
+            timestamp=START + datetime.timedelta(seconds=rng.uniform(0, 7 * 24 * 3600), microseconds=rng.randrange(10**6)),
+            duration=datetime.timedelta(seconds=rng.choice([0, rng.uniform(1, 600), rng.uniform(600, 20000)])),
+            data={"status": rng.choice(["afk", "not-afk", "not-afk", "system-afk"])},
+        ))
+    return events
+
+
+def reference_gaps(events: list[aw_core.Event]) -> list[aw_core.Event]:
+    active = [e for e in events if e.duration.total_seconds() > 0 and e.data["status"] == "not-afk"]
+    return list(get_gaps(squash_overlaps(active)))
+
+
+def as_tuples(events: list[aw_core.Event]) -> list[tuple]:
+    return [(e.timestamp, e.duration) for e in events]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_activity_gaps_match_reference(seed: int) -> None:
+    events = random_events(random.Random(seed), 3000)
+    assert as_tuples(columnar.activity_gaps(events)) == as_tuples(reference_gaps(events))
+
+
+def test_activity_gaps_min_duration() -> None:
+    events = random_events(random.Random(42), 500)
+    expected = [g for g in reference_gaps(events) if g.duration.total_seconds() > 300]
+    assert as_tuples(columnar.activity_gaps(events, min_duration=300)) == as_tuples(expected)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_covered_matches_coverage_index(seed: int, monkeypatch) -> None:
+    rng = random.Random(seed)
+    handled = random_events(rng, 1500)
+    gaps = random_events(rng, 1500)
+    # Near duplicates of handled intervals, the case the 95% rule is about
+    gaps += [aw_core.Event(timestamp=h.timestamp + datetime.timedelta(seconds=rng.uniform(-5, 5)),
+                           duration=h.duration * rng.uniform(0.9, 1.2)) for h in handled[:300]]
+
+    monkeypatch.setattr(columnar, "COLUMNAR_THRESHOLD", 10**9)
+    expected = CoverageIndex(handled).covers_batch(gaps)
+
+    assert columnar.covered_events(gaps, handled) == expected
+    assert any(expected)
+
+
+def test_large_inputs_use_columnar_engine(monkeypatch) -> None:
+    events = random_events(random.Random(7), 100)
+    reference = as_tuples(find_activity_gaps(events))
+    calls = []
+    activity_gaps = columnar.activity_gaps
+    monkeypatch.setattr(columnar, "activity_gaps", lambda events: calls.append(len(events)) or activity_gaps(events))
+    monkeypatch.setattr(columnar, "COLUMNAR_THRESHOLD", 50)
+
+    assert as_tuples(find_activity_gaps(events)) == reference
+    assert calls == [100]
+
+
+def test_unseen_afk_events_same_with_either_engine(monkeypatch) -> None:
+    rng = random.Random(3)
+    events = random_events(rng, 2500)
+    state = AWAfkPromptState(random_events(rng, 200))
+
+    monkeypatch.setattr(columnar, "COLUMNAR_THRESHOLD", 10**9)
+    expected = as_tuples(state.get_unseen_afk_events(events, 1e9, 60))
+    monkeypatch.setattr(columnar, "COLUMNAR_THRESHOLD", 1)
+    assert as_tuples(state.get_unseen_afk_events(events, 1e9, 60)) == expected
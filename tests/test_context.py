@@ -0,0 +1,76 @@
+"""Tests for the windows shown around a gap in the prompt."""
+
+import datetime
+
+import aw_core
+
+from aw_watcher_afk_prompt.context import WindowContext, WindowContextProvider, find_window_bucket
+from tests.conftest import fake_client
+
+START = datetime.datetime(2025, 1, 15, 12, 0, tzinfo=datetime.UTC)
+END = START + datetime.timedelta(minutes=40)
+BUCKET = "aw-watcher-window_host"
+
+
+def window(minute: float, app: str, title: str = "", seconds: float = 30) -> aw_core.Event:
+    return aw_core.Event(timestamp=START + datetime.timedelta(minutes=minute), duration=datetime.timedelta(seconds=seconds),
+                         data={"app": app, "title": title})
+
+
+EVENTS = [
+    window(-30, "Slack", "general"),  # outside the slice
+    window(-10, "Firefox", "Jira"),
+    window(-5, "Code", "core.py"),
+    window(-4, "Code", "core.py"),
+    window(-1, "Firefox", "Calendar"),
+    window(41, "Thunderbird", "Inbox"),
+    window(43, "Slack", "general"),
+    window(44, "Code", "core.py"),
+    window(46, "Terminal", "pytest"),
+]
+
+
+def test_find_window_bucket_prefers_own_host() -> None:
+    buckets = {
+        "aw-watcher-window_laptop": {"hostname": "laptop"},
+        "aw-watcher-window_host": {"hostname": "host"},
+        "aw-watcher-afk_host": {"hostname": "host"},
+    }
+
+    assert find_window_bucket(buckets, "host") == "aw-watcher-window_host"
+    assert find_window_bucket({"aw-watcher-window_laptop": {"hostname": "laptop"}}, "host") == "aw-watcher-window_laptop"
+    assert find_window_bucket({}, "host") is None
+
+
+def test_fetch_returns_last_and_first_windows() -> None:
+    client = fake_client(EVENTS)
+    provider = WindowContextProvider(client, BUCKET, titles=3)
+
+    context = provider.fetch(START, END)
+
+    assert context.before == ["Firefox: Jira", "Code: core.py", "Firefox: Calendar"]
+    assert context.after == ["Thunderbird: Inbox", "Slack: general", "Code: core.py"]
+    assert [call.kwargs["start"] for call in client.get_events.call_args_list] == [
+        START - datetime.timedelta(minutes=15), END]
+
+
+def test_fetch_caches_finished_slices() -> None:
+    client = fake_client(EVENTS)
+    provider = WindowContextProvider(client, BUCKET)
+
+    assert provider.fetch(START, END) == provider.fetch(START, END)
+    assert client.get_events.call_count == 2
+
+    # The slice after a gap that just ended is still growing
+    now = datetime.datetime.now(datetime.UTC)
+    provider.fetch(now - datetime.timedelta(minutes=5), now)
+    provider.fetch(now - datetime.timedelta(minutes=5), now)
+    assert client.get_events.call_count == 6
+
+
+def test_fetch_async() -> None:
+    provider = WindowContextProvider(fake_client(EVENTS), BUCKET, titles=1)
+
+    assert provider.fetch_async(START, END).result(timeout=5) == WindowContext(["Firefox: Calendar"],
+                                                                               ["Thunderbird: Inbox"])
+    assert not WindowContext()
@@ -0,0 +1,127 @@
+"""Tests for watching several aw-server endpoints from one process."""
+
+import datetime
+from unittest.mock import Mock, patch
+
+import aw_core
+import pytest
+from requests.exceptions import ConnectionError
+
+from aw_watcher_afk_prompt.core import AWAfkPromptError, SeenEventsStore
+from aw_watcher_afk_prompt.daemon import (
+    Endpoint,
+    EndpointPoller,
+    PendingPrompt,
+    coalesce_prompts,
+    connect_endpoints,
+    endpoints_from_config,
+)
+
+
+def make_gap(minutes: int, duration_minutes: float = 10) -> aw_core.Event:
+    return aw_core.Event(
+        timestamp=datetime.datetime(2025, 1, 15, 12, minutes, tzinfo=datetime.UTC),
+        duration=datetime.timedelta(minutes=duration_minutes),
+    )
+
+
+def make_state(gaps: list[aw_core.Event]) -> Mock:
+    state = Mock()
+    state.get_new_afk_events_to_note.return_value = iter(gaps)
+    return state
+
+
+def test_default_endpoint() -> None:
+    assert endpoints_from_config({}) == [Endpoint()]
+    assert Endpoint().store_namespace is None
+
+
+def test_endpoints_from_config() -> None:
+    config = {"servers": [{"host": "localhost", "port": 5600}, {"host": "vm", "port": 5666, "testing": True}]}
+    endpoints = endpoints_from_config(config)
+    assert endpoints == [Endpoint("localhost", 5600), Endpoint("vm", 5666, testing=True)]
+    assert [e.name for e in endpoints] == ["localhost:5600", "vm:5666"]
+    assert [e.store_namespace for e in endpoints] == ["localhost_5600", "vm_5666"]
+
+
+def test_poller_queues_gaps_from_all_endpoints() -> None:
+    first, second = Endpoint("a", 1), Endpoint("b", 2)
+    states = {first: make_state([make_gap(0), make_gap(20)]), second: make_state([make_gap(10)])}
+    poller = EndpointPoller(states)
+
+    assert poller.poll(seconds=600, durration_thresh=300) == 3
+    pending = list(poller.pending())
+
+    assert [(p.endpoint, p.event.timestamp.minute) for p in pending] == [(first, 0), (first, 20), (second, 10)]
+    assert all(p.state is states[p.endpoint] for p in pending)
+    assert list(poller.pending()) == []
+
+
+def test_poller_survives_unreachable_endpoint() -> None:
+    broken = make_state([])
+    broken.get_new_afk_events_to_note.side_effect = ConnectionError("down")
+    poller = EndpointPoller({Endpoint("a", 1): broken, Endpoint("b", 2): make_state([make_gap(0)])})
+
+    assert poller.poll(seconds=600, durration_thresh=300) == 1
+
+
+def test_coalesce_prompts_merges_close_gaps() -> None:
+    first, second = Endpoint("a", 1), Endpoint("b", 2)
+    state = Mock()
+    prompts = [
+        PendingPrompt(first, state, make_gap(0, 9.5)),  # back for 30 seconds...
+        PendingPrompt(second, state, make_gap(5)),  # another server is not merged with
+        PendingPrompt(first, state, make_gap(10)),  # ...and gone again
+        PendingPrompt(first, state, make_gap(40)),
+    ]
+
+    merged = coalesce_prompts(prompts, datetime.timedelta(minutes=1))
+
+    assert [(p.endpoint, p.event.timestamp.minute, p.event.duration) for p in merged] == [
+        (first, 0, datetime.timedelta(minutes=20)),
+        (second, 5, datetime.timedelta(minutes=10)),
+        (first, 40, datetime.timedelta(minutes=10)),
+    ]
+    assert merged[0].parts == [prompts[0].event, prompts[2].event]
+    assert merged[1].parts == []
+
+
+def test_pending_holds_gaps_until_merge_distance_passed() -> None:
+    endpoint = Endpoint("a", 1)
+    state = make_state([make_gap(0, 9.5)])
+    poller = EndpointPoller({endpoint: state})
+    right_after = datetime.datetime(2025, 1, 15, 12, 10, tzinfo=datetime.UTC)
+
+    poller.poll(seconds=600, durration_thresh=300)
+    assert list(poller.pending(merge_distance=60, now=right_after)) == []
+
+    # Away again right after coming back; the held gap is also detected again
+    state.get_new_afk_events_to_note.return_value = iter([make_gap(0, 9.5), make_gap(10)])
+    poller.poll(seconds=600, durration_thresh=300)
+    pending = list(poller.pending(merge_distance=60, now=right_after + datetime.timedelta(minutes=15)))
+
+    assert [(p.event.timestamp.minute, p.event.duration) for p in pending] == [(0, datetime.timedelta(minutes=20))]
+    assert len(pending[0].parts) == 2
+
+
+def test_connect_endpoints_skips_unreachable() -> None:
+    good, bad = Endpoint("a", 1), Endpoint("b", 2)
+    state = Mock()
+
+    def connect(endpoint):
+        if endpoint == bad:
+            raise AWAfkPromptError("Could not get a connection to the server.")
+        return state
+
+    assert connect_endpoints([good, bad], connect) == {good: state}
+    with pytest.raises(AWAfkPromptError):
+        connect_endpoints([bad, Endpoint("c", 3)], lambda endpoint: connect(bad))
+
+
+def test_seen_events_store_namespaces(tmp_path) -> None:
+    event = aw_core.Event(timestamp=datetime.datetime.now(datetime.UTC), duration=datetime.timedelta(minutes=10))
+    with patch("appdirs.user_config_dir", return_value=str(tmp_path)):
+        SeenEventsStore(namespace="vm_5600").add(event)
+        assert SeenEventsStore(namespace="vm_5600").has_overlap(event)
+        assert not SeenEventsStore(namespace="localhost_5600").has_overlap(event)
+        assert not SeenEventsStore().has_overlap(event)
@@ -0,0 +1,138 @@
+"""Tests for fetching, diffing and saving the entries of edit mode."""
+
+import datetime
+from unittest.mock import Mock
+
+import aw_core
+import pytest
+
+from aw_watcher_afk_prompt.classify import Category, Classifier
+from aw_watcher_afk_prompt.edit import EditBuffer, apply_changes, compute_changes, fetch_events
+from tests.conftest import fake_client
+
+DAY = datetime.datetime(2025, 1, 15, tzinfo=datetime.UTC)
+BUCKET = "aw-watcher-afk-prompt_host"
+
+
+def make_event(id: int, minute: float, duration_minutes: float = 10, message: str = "work") -> aw_core.Event:
+    return aw_core.Event(
+        id=id,
+        timestamp=DAY + datetime.timedelta(minutes=minute),
+        duration=datetime.timedelta(minutes=duration_minutes),
+        data={"status": "afk", "message": message},
+    )
+
+
+def test_fetch_pages_through_full_windows() -> None:
+    events = [make_event(i, i * 0.5, 0.5) for i in range(2500)]  # about 21 hours of heartbeats
+    client = fake_client(events)
+
+    fetched = fetch_events(client, BUCKET, DAY, DAY + datetime.timedelta(days=1), page_size=1000)
+
+    assert [e.id for e in fetched] == list(range(2500))
+    assert client.get_events.call_count == 3
+
+
+def test_fetch_splits_range_into_concurrent_windows() -> None:
+    events = [make_event(i, i * 60 * 24, 10) for i in range(7)]  # one per day
+    client = fake_client(events)
+
+    fetched = fetch_events(client, BUCKET, DAY, DAY + datetime.timedelta(days=7))
+
+    assert [e.id for e in fetched] == list(range(7))
+    assert client.get_events.call_count == 7
+
+
+def test_compute_changes_only_includes_edited_rows() -> None:
+    events = [make_event(1, 0), make_event(2, 30), make_event(3, 60)]
+
+    changes = compute_changes([(events[0], "work"), (events[1], "lunch"), (events[2], "work")])
+
+    assert [(e.id, e.data["message"]) for e in changes.updates] == [(2, "lunch")]
+    assert changes.deletions == []
+    assert events[1].data["message"] == "work"  # the fetched events are not modified
+
+
+def test_compute_changes_deletes_rows() -> None:
+    events = [make_event(1, 0), make_event(2, 30)]
+
+    changes = compute_changes([(events[0], None), (events[1], "work")])
+
+    assert changes.updates == []
+    assert [e.id for e in changes.deletions] == [1]
+    assert changes.summary() == "0 updated, 1 deleted, 0 merged"
+
+
+def test_compute_changes_merges_rows_made_identical() -> None:
+    events = [make_event(1, 0, message="meeting"), make_event(2, 10, message="lunch"),
+              make_event(3, 20, message="lunch"), make_event(4, 40, message="meeting")]
+
+    changes = compute_changes([(events[0], "meeting"), (events[1], "meeting"),
+                               (events[2], "meeting"), (events[3], "meeting")])
+
+    [merged] = changes.updates
+    assert (merged.id, merged.duration) == (1, datetime.timedelta(minutes=30))
+    assert [e.id for e in changes.deletions] == [2, 3]  # 4 does not touch the others
+    assert changes.merged == 2
+    assert events[0].duration == datetime.timedelta(minutes=10)
+
+
+def test_compute_changes_leaves_identical_neighbours_alone() -> None:
+    events = [make_event(1, 0), make_event(2, 10)]
+
+    assert not compute_changes([(event, "work") for event in events])
+
+
+def test_compute_changes_retags_edited_rows() -> None:
+    classifier = Classifier([Category("meetings", ("meeting",), ("work",)), Category("breaks", ("lunch",))])
+    events = [make_event(1, 0, message="meeting"), make_event(2, 10, message="lunch"), make_event(3, 30)]
+    classifier.apply(events[0], "meeting")
+    classifier.apply(events[1], "lunch")
+
+    changes = compute_changes([(events[0], "meeting"), (events[1], "meeting"), (events[2], "lunch")],
+                              classifier=classifier)
+
+    # The row edited to "meeting" got the tags of the first row and was merged into it
+    assert [e.id for e in changes.deletions] == [2]
+    assert [(e.id, e.data["category"], e.data["tags"]) for e in changes.updates] == [
+        (1, "meetings", ["meetings", "work"]), (3, "breaks", ["breaks"])]
+    assert events[1].data["category"] == "breaks"
+
+
+def test_apply_changes_batches_updates() -> None:
+    events = [make_event(i, i * 10) for i in range(5)]
+    changes = compute_changes([(event, f"task {event.id}") for event in events[:4]] + [(events[4], None)])
+    client = Mock()
+    progress = Mock()
+
+    apply_changes(client, BUCKET, changes, batch_size=3, progress=progress)
+
+    assert [len(call.args[1]) for call in client.insert_events.call_args_list] == [3, 1]
+    client.delete_event.assert_called_once_with(BUCKET, 4)
+    assert [call.args for call in progress.call_args_list] == [(3, 5), (4, 5), (5, 5)]
+
+
+def test_apply_changes_raises_on_failure() -> None:
+    changes = compute_changes([(make_event(1, 0), "lunch")])
+    client = Mock()
+    client.insert_events.side_effect = ConnectionError("server down")
+
+    with pytest.raises(ConnectionError):
+        apply_changes(client, BUCKET, changes)
+
+
+def test_edit_buffer_result_feeds_compute_changes() -> None:
+    events = [make_event(1, 0), make_event(2, 30), make_event(3, 60)]
+    buffer = EditBuffer(events)
+
+    buffer.set(1, " lunch ")
+    buffer.set(2, "work", deleted=True)
+
+    assert buffer.dirty_count() == 2
+    assert buffer.result() == [(events[0], "work"), (events[1], "lunch"), (events[2], None)]
+    assert compute_changes(buffer.result()).summary() == "1 updated, 1 deleted, 0 merged"
+
+
+def test_edit_buffer_detects_multi_day_ranges() -> None:
+    assert not EditBuffer([make_event(1, 600), make_event(2, 605)]).multi_day
+    assert EditBuffer([make_event(1, 600), make_event(2, 600 + 3 * 24 * 60)]).multi_day
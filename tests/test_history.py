@@ -0,0 +1,137 @@
+"""Tests for the persistent full-history search index."""
+
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import aw_core
+
+from aw_watcher_afk_prompt.core import AWAfkPromptState
+from aw_watcher_afk_prompt.history import HistoryIndex, ReverseSearch, tokenize
+from tests.conftest import fake_client
+
+NOW = datetime.datetime(2025, 1, 15, 12, 0, tzinfo=datetime.UTC)
+BUCKET = "aw-watcher-afk-prompt_host"
+
+
+def days_ago(days: float) -> datetime.datetime:
+    return NOW - datetime.timedelta(days=days)
+
+
+def make_event(days: float, message: str) -> aw_core.Event:
+    return aw_core.Event(timestamp=days_ago(days), duration=datetime.timedelta(minutes=10),
+                         data={"status": "afk", "message": message})
+
+
+def make_index(tmp_path) -> HistoryIndex:
+    index = HistoryIndex(tmp_path / "history.sqlite3")
+    index.add_many([
+        ("lunch", days_ago(400)),
+        ("Team meeting", days_ago(30)),
+        ("team  meeting ", days_ago(2)),
+        ("teaching", days_ago(5)),
+        ("phone call with the team", days_ago(1)),
+        ("", days_ago(0)),
+    ])
+    return index
+
+
+def test_tokenize() -> None:
+    assert tokenize("Team meeting, team call") == ["team", "meeting", "call"]
+
+
+def test_search_matches_word_prefixes_most_recent_first(tmp_path) -> None:
+    index = make_index(tmp_path)
+
+    assert index.search("tea") == ["phone call with the team", "team meeting", "teaching"]
+    assert index.search("tea mee") == ["team meeting"]
+    assert index.search("LUN") == ["lunch"]
+    assert index.search("eeting") == []
+    assert index.search("", limit=2) == ["phone call with the team", "team meeting"]
+
+
+def test_add_deduplicates_messages_and_uses(tmp_path) -> None:
+    index = make_index(tmp_path)
+    index.add("team meeting", days_ago(2))  # already known
+    index.add("Lunch", days_ago(0))
+
+    assert len(index) == 4
+    assert index.search("lu") == ["Lunch"]  # the latest spelling
+    assert index.search("", limit=1) == ["Lunch"]
+
+
+def test_index_persists(tmp_path) -> None:
+    make_index(tmp_path).close()
+
+    assert HistoryIndex(tmp_path / "history.sqlite3").search("lunch") == ["lunch"]
+
+
+def test_sync_pages_through_the_whole_bucket(tmp_path) -> None:
+    events = [make_event(i, f"task {i}") for i in range(250)]
+    client = fake_client(events)
+    index = HistoryIndex(tmp_path / "history.sqlite3")
+
+    assert index.sync(client, BUCKET, now=NOW, page_size=100) == 250
+
+    assert len(index) == 250
+    assert client.get_events.call_count == 3
+    assert index.search("task 249") == ["task 249"]
+    assert index.scanned_until == NOW
+
+
+def test_sync_only_fetches_since_the_last_scan(tmp_path) -> None:
+    events = [make_event(i, f"task {i}") for i in range(10, 250)]
+    client = fake_client(events)
+    index = HistoryIndex(tmp_path / "history.sqlite3")
+    index.sync(client, BUCKET, now=days_ago(5))
+    events.append(make_event(1, "new task"))
+    client.get_events.reset_mock()
+
+    index.sync(client, BUCKET, now=NOW)
+
+    assert client.get_events.call_args.kwargs["start"] == days_ago(6)
+    assert index.search("new") == ["new task"]
+
+
+def test_state_adds_posted_messages(tmp_path) -> None:
+    index = HistoryIndex(tmp_path / "history.sqlite3")
+    state = AWAfkPromptState([], history=index)
+
+    state.record_posted(make_event(0, "reading"))
+
+    assert index.search("rea") == ["reading"]
+
+
+def test_index_made_on_one_thread_is_used_from_others(tmp_path) -> None:
+    # With several [[servers]] the index is made on a connection worker thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        index = pool.submit(make_index, tmp_path).result()
+
+    index.add("reading", days_ago(0))
+    threads = [threading.Thread(target=index.add, args=(f"task {i}", days_ago(i / 10))) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert index.search("rea") == ["reading"]
+    assert len(index.search("task")) == 8
+
+
+
+
+def test_reverse_search_steps_through_older_matches(tmp_path) -> None:
+    search = ReverseSearch(make_index(tmp_path), original="typed")
+    search.type("te")
+
+    assert search.current == "phone call with the team"
+    assert search.next() and search.current == "team meeting"
+    assert search.next() and search.current == "teaching"
+    assert not search.next() and search.current == "teaching"
+
+    search.type("x")
+    assert search.current is None
+    assert search.label == "(failed reverse-i-search)`tex':"
+    search.backspace()
+    assert search.current == "phone call with the team"
+    assert search.label == "(reverse-i-search)`te':"
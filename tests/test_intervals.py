@@ -0,0 +1,112 @@
+"""Tests for the sorted interval index."""
+
+import datetime
+from unittest.mock import Mock, patch
+
+import aw_core
+
+from aw_watcher_afk_prompt.core import AWAfkPromptClient, AWAfkPromptState, SeenEventsStore
+from aw_watcher_afk_prompt.intervals import CoverageIndex, IntervalIndex
+
+START = datetime.datetime(2025, 1, 15, tzinfo=datetime.UTC)
+
+
+def make_event(minutes: float, duration_minutes: float, message: str = "") -> aw_core.Event:
+    return aw_core.Event(
+        timestamp=START + datetime.timedelta(minutes=minutes),
+        duration=datetime.timedelta(minutes=duration_minutes),
+        data={"message": message},
+    )
+
+
+def at(minutes: float) -> datetime.datetime:
+    return START + datetime.timedelta(minutes=minutes)
+
+
+def test_events_are_kept_sorted() -> None:
+    index = IntervalIndex([make_event(30, 5), make_event(0, 5)])
+    index.add(make_event(10, 5))
+    assert [e.timestamp for e in index] == [at(0), at(10), at(30)]
+    assert len(index) == 3
+
+
+def test_overlapping() -> None:
+    index = IntervalIndex([make_event(0, 5, "a"), make_event(10, 5, "b"), make_event(20, 5, "c")])
+    assert [e.data["message"] for e in index.overlapping(at(4), at(11))] == ["a", "b"]
+    assert index.overlapping(at(5), at(10)) == []
+
+
+def test_last_before() -> None:
+    index = IntervalIndex([make_event(0, 5, "a"), make_event(10, 5, "b")])
+    assert index.last_before(at(10)).data["message"] == "a"
+    assert index.last_before(at(11)).data["message"] == "b"
+    assert index.last_before(at(0)) is None
+
+
+def test_overlapping_finds_long_event_starting_long_before() -> None:
+    index = IntervalIndex([make_event(0, 600, "night"), make_event(610, 5, "short")])
+    assert [e.data["message"] for e in index.overlapping(at(500), at(505))] == ["night"]
+
+
+def test_trim() -> None:
+    index = IntervalIndex([make_event(0, 5, "a"), make_event(0, 60, "long"), make_event(30, 5, "b")])
+    index.trim(at(20))
+    assert [e.data["message"] for e in index] == ["long", "b"]
+    assert [e.data["message"] for e in index.overlapping(at(0), at(100))] == ["long", "b"]
+
+
+def test_covers() -> None:
+    coverage = CoverageIndex([make_event(0, 10), make_event(60, 600)])
+    assert coverage.covers(make_event(0.1, 10))
+    assert coverage.covers(make_event(100, 5))  # contained in a longer handled interval
+    assert not coverage.covers(make_event(5, 10))
+    assert not coverage.covers(make_event(20, 10))
+
+
+def test_covers_batch_matches_covers() -> None:
+    coverage = CoverageIndex([make_event(i * 7, (i % 5) + 1) for i in range(200)] + [make_event(300, 240)])
+    gaps = [make_event(i * 3.5, (i % 4) + 0.5) for i in range(400)]
+    gaps += [make_event(0, 1400), make_event(310, 2)]  # overlapping and out of order
+    assert coverage.covers_batch(gaps) == [coverage.covers(gap) for gap in gaps]
+    assert any(coverage.covers_batch(gaps))
+    assert CoverageIndex().covers_batch(gaps) == [False] * len(gaps)
+
+
+def test_state_coverage_merges_posted_and_persisted(tmp_path) -> None:
+    with patch("appdirs.user_config_dir", return_value=str(tmp_path)):
+        store = SeenEventsStore(max_age_days=100000)
+        store.add(make_event(100, 10))
+        state = AWAfkPromptState([make_event(0, 10)], store)
+
+    assert state.has_event(make_event(0, 10))
+    assert state.has_event(make_event(100, 10))
+    assert not state.has_event(make_event(50, 10))
+
+    state.record_posted(make_event(50, 10))
+    assert state.has_event(make_event(50, 10))
+    state.trim(at(90))
+    assert [e.timestamp for e in state.recent_events] == []
+    assert state.has_event(make_event(50, 10))
+
+
+def test_has_event_beyond_old_count_limit() -> None:
+    """Answers older than the last 100 posts are still found."""
+    state = AWAfkPromptState([make_event(i * 10, 5, str(i)) for i in range(500)])
+    assert state.has_event(make_event(0, 5))
+    assert not state.has_event(make_event(6, 3))
+
+
+def test_client_hydrates_cache_window(tmp_path) -> None:
+    mock_client = Mock()
+    mock_client.client_hostname = "host"
+    mock_client.get_buckets.return_value = {"aw-watcher-afk_host": {}, "aw-watcher-afk-prompt_host": {}}
+    mock_client.get_events.return_value = [make_event(10, 5, "b"), make_event(0, 5, "a")]
+
+    with patch("appdirs.user_config_dir", return_value=str(tmp_path)):
+        client = AWAfkPromptClient(mock_client, enable_lid_events=False, cache_window_minutes=120)
+
+    call = mock_client.get_events.call_args
+    assert call.args == ("aw-watcher-afk-prompt_host",)
+    assert "limit" not in call.kwargs
+    assert datetime.timedelta(minutes=119) < datetime.datetime.now(datetime.UTC) - call.kwargs["start"]
+    assert [e.data["message"] for e in client.state.recent_events] == ["a", "b"]
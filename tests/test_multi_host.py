@@ -0,0 +1,132 @@
+"""Tests for merging afk buckets from several hosts and incremental bucket fetching."""
+
+import datetime
+from unittest.mock import Mock
+
+import aw_core
+import pytest
+
+from aw_watcher_afk_prompt.core import AWAfkPromptClient, AWAfkPromptError, BucketCursor
+from tests.conftest import fake_client
+
+NOW = datetime.datetime(2025, 1, 15, 12, 0, tzinfo=datetime.UTC)
+
+BUCKETS = {
+    "aw-watcher-afk_desktop": {},
+    "aw-watcher-afk_laptop": {},
+    "aw-watcher-afk-prompt_laptop": {},
+}
+
+
+def make_event(id: int, minutes_ago: float, duration_minutes: float, status: str) -> aw_core.Event:
+    return aw_core.Event(
+        id=id,
+        timestamp=NOW - datetime.timedelta(minutes=minutes_ago),
+        duration=datetime.timedelta(minutes=duration_minutes),
+        data={"status": status},
+    )
+
+
+def make_client(events_by_bucket: dict[str, list[aw_core.Event]]) -> tuple[AWAfkPromptClient, Mock]:
+    mock_client = fake_client(events_by_bucket, hostname="laptop", buckets=BUCKETS)
+    return AWAfkPromptClient(mock_client, enable_lid_events=False, multi_host=True), mock_client
+
+
+def test_several_afk_buckets_is_an_error_without_multi_host() -> None:
+    mock_client = Mock()
+    mock_client.client_hostname = "laptop"
+    mock_client.get_buckets.return_value = BUCKETS
+    mock_client.get_events.return_value = []
+    with pytest.raises(AWAfkPromptError, match="too many afk buckets"):
+        AWAfkPromptClient(mock_client, enable_lid_events=False)
+
+
+def test_multi_host_uses_all_afk_buckets() -> None:
+    client, _ = make_client({})
+    assert sorted(client.afk_bucket_ids) == ["aw-watcher-afk_desktop", "aw-watcher-afk_laptop"]
+
+
+def test_active_on_any_host_means_active() -> None:
+    """Being away from the desktop while working on the laptop is not a gap."""
+    client, _ = make_client({
+        "aw-watcher-afk_desktop": [make_event(1, 60, 20, "not-afk"), make_event(2, 40, 40, "afk")],
+        "aw-watcher-afk_laptop": [make_event(3, 45, 45, "not-afk")],
+    })
+    events, _ = client._fetch_events_with_dynamic_limit(window_start=NOW - datetime.timedelta(hours=2))
+
+    assert not client._is_currently_afk(events)
+    assert list(client.state.get_unseen_afk_events(events, 1e9, 60)) == []
+
+
+def test_gap_is_computed_over_union_of_hosts() -> None:
+    client, _ = make_client({
+        "aw-watcher-afk_desktop": [make_event(1, 60, 20, "not-afk"), make_event(2, 40, 40, "afk")],
+        "aw-watcher-afk_laptop": [make_event(3, 30, 10, "afk"), make_event(4, 20, 20, "not-afk")],
+    })
+    events, _ = client._fetch_events_with_dynamic_limit(window_start=NOW - datetime.timedelta(hours=2))
+
+    gaps = list(client.state.get_unseen_afk_events(events, 1e9, 60))
+    assert len(gaps) == 1
+    assert gaps[0].timestamp == NOW - datetime.timedelta(minutes=40)
+    assert gaps[0].duration == datetime.timedelta(minutes=20)
+
+
+def test_polls_only_fetch_new_events() -> None:
+    """After the first fetch, each bucket is only asked for events since its cursor."""
+    client, mock_client = make_client({
+        "aw-watcher-afk_desktop": [make_event(1, 60, 20, "not-afk")],
+        "aw-watcher-afk_laptop": [make_event(2, 30, 10, "not-afk")],
+    })
+    window_start = NOW - datetime.timedelta(hours=2)
+    client._fetch_events_with_dynamic_limit(window_start=window_start)
+    mock_client.get_events.reset_mock()
+
+    client._fetch_events_with_dynamic_limit(window_start=window_start)
+
+    starts = {call.args[0]: call.kwargs for call in mock_client.get_events.call_args_list}
+    assert starts == {
+        "aw-watcher-afk_desktop": {"start": NOW - datetime.timedelta(minutes=60)},
+        "aw-watcher-afk_laptop": {"start": NOW - datetime.timedelta(minutes=30)},
+    }
+
+
+def test_limit_grows_until_the_gap_start_is_found() -> None:
+    """Starting up during a long AFK period, the limit doubles until the last activity is fetched."""
+    afk = [make_event(1, 62, 2, "not-afk")] + [make_event(i + 2, 60 - 2 * i, 2, "afk") for i in range(30)]
+    mock_client = fake_client({"aw-watcher-afk_laptop": afk}, hostname="laptop")
+    client = AWAfkPromptClient(mock_client, enable_lid_events=False)
+    mock_client.get_events.reset_mock()
+
+    events, limit = client._fetch_events_with_dynamic_limit(window_start=NOW - datetime.timedelta(hours=2))
+
+    assert limit == 40
+    assert [call.kwargs for call in mock_client.get_events.call_args_list] == [
+        {"limit": 10}, {"limit": 20}, {"limit": 40}]
+    assert events[0].data["status"] == "not-afk"
+    assert len(events) == 31
+
+    # Once the boundary is known the next poll continues from the cursor
+    mock_client.get_events.reset_mock()
+    client._fetch_events_with_dynamic_limit(window_start=NOW - datetime.timedelta(hours=2))
+    assert [call.kwargs for call in mock_client.get_events.call_args_list] == [
+        {"start": NOW - datetime.timedelta(minutes=2)}]
+
+
+class TestBucketCursor:
+    def test_update_replaces_extended_heartbeat(self) -> None:
+        cursor = BucketCursor("bucket")
+        cursor.update([make_event(1, 10, 5, "not-afk")])
+        cursor.update([make_event(1, 10, 8, "not-afk")])
+        assert [e.duration for e in cursor.events()] == [datetime.timedelta(minutes=8)]
+        assert cursor.cursor == NOW - datetime.timedelta(minutes=10)
+
+    def test_trim_keeps_last_activity_boundary(self) -> None:
+        cursor = BucketCursor("bucket")
+        cursor.update([
+            make_event(1, 300, 10, "not-afk"),
+            make_event(2, 290, 10, "not-afk"),
+            make_event(3, 280, 270, "afk"),
+            make_event(4, 10, 10, "not-afk"),
+        ])
+        cursor.trim(NOW - datetime.timedelta(minutes=30))
+        assert [e.id for e in cursor.events()] == [2, 3, 4]
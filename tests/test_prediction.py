@@ -0,0 +1,89 @@
+"""Tests for the time-of-day/duration model pre-filling the prompt."""
+
+import datetime
+
+import aw_core
+
+from aw_watcher_afk_prompt.core import AWAfkPromptState
+from aw_watcher_afk_prompt.prediction import PredictionModel
+from aw_watcher_afk_prompt.utils import LOCAL_TIMEZONE
+from tests.conftest import fake_client
+
+MONDAY = datetime.datetime(2025, 1, 13, tzinfo=LOCAL_TIMEZONE)
+BUCKET = "aw-watcher-afk-prompt_host"
+
+
+def at(day: int, hour: int, minute: int = 0) -> datetime.datetime:
+    return MONDAY + datetime.timedelta(days=day, hours=hour, minutes=minute)
+
+
+def make_event(start: datetime.datetime, minutes: float, message: str) -> aw_core.Event:
+    return aw_core.Event(timestamp=start, duration=datetime.timedelta(minutes=minutes),
+                         data={"status": "afk", "message": message})
+
+
+def routine_week() -> list[aw_core.Event]:
+    events = []
+    for day in range(5):
+        events.append(make_event(at(day, 9, 30), 15, "standup"))
+        events.append(make_event(at(day, 12), 40, "Lunch"))
+    events.append(make_event(at(2, 12, 10), 35, "dentist"))
+    events.append(make_event(at(3, 12, 5), 40, "UNKNOWN"))
+    return events
+
+
+def make_model(tmp_path, events: list[aw_core.Event], days: int = 7) -> PredictionModel:
+    model = PredictionModel(tmp_path / "prediction.json")
+    model.sync(fake_client(events), BUCKET, now=at(days, 0))
+    return model
+
+
+def test_predicts_the_routine_answer(tmp_path) -> None:
+    model = make_model(tmp_path, routine_week())
+
+    assert model.predict(at(7, 12, 3), datetime.timedelta(minutes=38))[:2] == ["Lunch", "dentist"]
+    assert model.predict(at(7, 9, 31), datetime.timedelta(minutes=12))[0] == "standup"
+    assert model.predict(at(7, 3), datetime.timedelta(minutes=12)) == []
+
+
+def test_ignores_unknown_answers(tmp_path) -> None:
+    model = make_model(tmp_path, routine_week())
+
+    assert "UNKNOWN" not in model.predict(at(3, 12, 5), datetime.timedelta(minutes=40))
+
+
+def test_model_is_cached_and_synced_incrementally(tmp_path) -> None:
+    events = routine_week()
+    make_model(tmp_path, events)
+    events.append(make_event(at(8, 15), 20, "coffee"))
+    client = fake_client(events)
+
+    model = PredictionModel(tmp_path / "prediction.json")
+    assert model.sync(client, BUCKET, now=at(9, 0)) == 1
+
+    assert client.get_events.call_args.kwargs["start"] == at(7, 0)
+    assert model.predict(at(9, 15), datetime.timedelta(minutes=20)) == ["coffee"]
+
+
+def test_posted_answers_are_not_counted_twice(tmp_path) -> None:
+    events = routine_week()
+    model = make_model(tmp_path, events)
+    posted = make_event(at(8, 15), 20, "coffee")
+    model.add(posted)
+    model.flush()
+    events.append(posted)
+
+    assert PredictionModel(tmp_path / "prediction.json").sync(fake_client(events), BUCKET, now=at(9, 0)) == 0
+    assert [model.messages[i] for i in model.counts["w1 s30 d1"]] == ["coffee"]
+
+
+def test_state_counts_posted_answers(tmp_path) -> None:
+    model = PredictionModel(tmp_path / "prediction.json")
+    state = AWAfkPromptState([], prediction=model)
+
+    state.record_posted(make_event(at(0, 12), 40, "lunch"))
+    model.flush()
+
+    cached = PredictionModel(tmp_path / "prediction.json")
+    assert cached.predict(at(1, 12), datetime.timedelta(minutes=40)) == ["lunch"]
+
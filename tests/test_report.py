@@ -0,0 +1,114 @@
+"""Tests for listing unfilled AFK gaps (--list-gaps)."""
+
+import csv
+import datetime
+import io
+import json
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+import aw_core
+
+from aw_watcher_afk_prompt.__main__ import main
+from aw_watcher_afk_prompt.backfill import BackfillEngine
+from aw_watcher_afk_prompt.report import GapRow, format_rows, list_gaps
+from aw_watcher_afk_prompt.sources import AFK_WATCHER_SOURCE, LID_WATCHER_SOURCE
+
+DAY = datetime.datetime(2025, 1, 15, tzinfo=datetime.UTC)
+AFK_BUCKET = "aw-watcher-afk_host"
+LID_BUCKET = "aw-watcher-lid_host"
+OWN_BUCKET = "aw-watcher-afk-prompt_host"
+
+
+def make_event(hour: float, duration_hours: float, status: str | None = None) -> aw_core.Event:
+    return aw_core.Event(
+        timestamp=DAY + datetime.timedelta(hours=hour),
+        duration=datetime.timedelta(hours=duration_hours),
+        data={"status": status} if status else {"message": "answered"},
+    )
+
+
+EVENTS = {
+    AFK_BUCKET: [
+        make_event(8, 1, "not-afk"),
+        make_event(9, 1, "afk"),
+        make_event(10, 2, "not-afk"),
+        make_event(12, 1, "afk"),
+        make_event(13, 3, "not-afk"),
+        make_event(17, 1, "not-afk"),  # 16-17: no data at all, e.g. powered off
+        make_event(19, 1, "not-afk"),
+    ],
+    LID_BUCKET: [make_event(12.5, 0.5, "system-afk")],
+    OWN_BUCKET: [make_event(11.75, 0.5), make_event(18, 1)],  # half of the first answer is in the gap
+}
+
+
+def get_events(bucket_id, limit=-1, start=None, end=None):
+    events = EVENTS.get(bucket_id, [])
+    if start is not None:
+        events = [e for e in events if e.timestamp + e.duration > start]
+    if end is not None:
+        events = [e for e in events if e.timestamp < end]
+    events = sorted(events, key=lambda e: e.timestamp, reverse=True)
+    return events if limit < 0 else events[:limit]
+
+
+def make_engine() -> BackfillEngine:
+    client = MagicMock()
+    client.get_events.side_effect = get_events
+    return BackfillEngine(client, OWN_BUCKET, {AFK_BUCKET: AFK_WATCHER_SOURCE, LID_BUCKET: LID_WATCHER_SOURCE})
+
+
+def test_list_gaps() -> None:
+    rows = list_gaps(make_engine(), DAY, DAY + datetime.timedelta(days=1), durration_thresh=60)
+
+    assert [(row.start.hour, row.end.hour) for row in rows] == [(9, 10), (12, 13), (16, 17)]
+    assert [row.sources for row in rows] == [["afk"], ["afk", "lid"], []]
+    assert [row.coverage for row in rows] == [0, 0.25, 0]
+
+
+def test_format_rows() -> None:
+    rows = [GapRow(DAY, DAY + datetime.timedelta(minutes=90), ["afk", "lid"], 0.5)]
+
+    table = format_rows(rows, "table")
+    assert "Start" in table.splitlines()[0]
+    assert "afk,lid" in table and "50%" in table
+    assert table.splitlines()[-1] == "1 unfilled gaps, 1 hour 30 minutes in total"
+
+    assert json.loads(format_rows(rows, "json")) == [{
+        "start": "2025-01-15T00:00:00+00:00",
+        "end": "2025-01-15T01:30:00+00:00",
+        "duration_seconds": 5400.0,
+        "sources": ["afk", "lid"],
+        "coverage": 0.5,
+    }]
+
+    [row] = csv.DictReader(io.StringIO(format_rows(rows, "csv")))
+    assert row["sources"] == "afk;lid"
+    assert row["duration_seconds"] == "5400.0"
+
+
+def test_list_gaps_command(capsys) -> None:
+    client = MagicMock()
+    client.__enter__.return_value = client
+    client.client_hostname = "host"
+    client.get_buckets.return_value = {AFK_BUCKET: {}, LID_BUCKET: {}, OWN_BUCKET: {}}
+    client.get_events.side_effect = get_events
+    argv = ["aw-watcher-afk-prompt", "--list-gaps", "--from", "2025-01-15", "--format", "json"]
+
+    with patch.object(sys, "argv", argv), patch("aw_watcher_afk_prompt.__main__.setup_logging"), \
+            patch("aw_watcher_afk_prompt.__main__.load_config", return_value={"length": 5}), \
+            patch("aw_watcher_afk_prompt.__main__.ActivityWatchClient", return_value=client):
+        main()
+
+    assert [row["start"] for row in json.loads(capsys.readouterr().out)] == [
+        "2025-01-15T09:00:00+00:00", "2025-01-15T12:00:00+00:00", "2025-01-15T16:00:00+00:00",
+    ]
+    day_windows = [call.kwargs for call in client.get_events.call_args_list if call.args[0] == OWN_BUCKET]
+    assert day_windows == [{"start": DAY, "end": DAY + datetime.timedelta(days=1)}]
+
+
+def test_main_module_does_not_import_tk() -> None:
+    code = "import sys, aw_watcher_afk_prompt.__main__; sys.exit('tkinter' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], check=False).returncode == 0
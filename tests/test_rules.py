@@ -0,0 +1,96 @@
+"""Tests for answering routine gaps with rules from the config file."""
+
+import datetime
+from unittest.mock import Mock
+
+import aw_core
+import pytest
+
+from aw_watcher_afk_prompt import core
+from aw_watcher_afk_prompt.core import DATA_KEY, AWAfkPromptClient
+from aw_watcher_afk_prompt.rules import RULE_KEY, RuleEngine, rule_from_config
+from aw_watcher_afk_prompt.utils import LOCAL_TIMEZONE
+
+WEDNESDAY = datetime.datetime(2025, 1, 15, tzinfo=LOCAL_TIMEZONE)
+
+
+def at(hour: int, minute: int = 0, days: int = 0) -> datetime.datetime:
+    return WEDNESDAY + datetime.timedelta(days=days, hours=hour, minutes=minute)
+
+
+def minutes(value: float) -> datetime.timedelta:
+    return datetime.timedelta(minutes=value)
+
+
+ENGINE = RuleEngine.from_config({"rules": [
+    {"name": "night", "message": "sleep", "after": "20:00", "before": "06:00", "min_duration": 480},
+    {"name": "lunch", "message": "lunch", "after": "11:30", "before": "13:30", "min_duration": 20,
+     "max_duration": 90, "weekdays": ["mon", "tue", "wed", "thu", "fri"]},
+    {"name": "suspend", "message": "suspended", "source": "lid", "after": "11:00", "before": "12:00"},
+    {"name": "standup", "message": "standup", "previous": "^work on", "after": "09:30", "before": "09:45"},
+]})
+
+
+def decide(start: datetime.datetime, duration: datetime.timedelta, **kwargs) -> str | None:
+    rule = ENGINE.decide(start, duration, **kwargs)
+    return rule.name if rule else None
+
+
+def test_time_weekday_and_duration_conditions() -> None:
+    assert decide(at(22, 30), minutes(9 * 60)) == "night"
+    assert decide(at(2), minutes(8 * 60)) == "night"  # wraps around midnight
+    assert decide(at(19, 59), minutes(9 * 60)) is None
+    assert decide(at(22), minutes(60)) is None
+
+    assert decide(at(12, 10), minutes(40)) == "lunch"
+    assert decide(at(12, 10), minutes(120)) is None
+    assert decide(at(12, 10), minutes(40)) == decide(at(12, 10, days=1), minutes(40)) == "lunch"
+    assert decide(at(12, 10, days=3), minutes(40)) is None  # Saturday
+
+
+def test_source_and_previous_answer_conditions() -> None:
+    assert decide(at(9, 35), minutes(15), previous="Work on the report") == "standup"
+    assert decide(at(9, 35), minutes(15), previous="lunch") is None
+    assert decide(at(11, 10), minutes(5), sources=frozenset({"afk", "lid"})) == "suspend"
+    assert decide(at(11, 10), minutes(5), sources=frozenset({"afk"})) is None
+
+
+def test_disagreeing_rules_are_ambiguous() -> None:
+    # Both lunch and suspend match a lid closed gap at 11:40
+    assert decide(at(11, 40), minutes(30), sources=frozenset({"lid"})) is None
+    assert decide(at(11, 40), minutes(30)) == "lunch"
+
+
+def test_invalid_rules() -> None:
+    with pytest.raises(ValueError, match="missing the 'message' key"):
+        rule_from_config({"name": "x"})
+    with pytest.raises(ValueError, match="must be a time"):
+        rule_from_config({"name": "x", "message": "y", "after": "noon"})
+    with pytest.raises(ValueError, match="unknown weekdays"):
+        rule_from_config({"name": "x", "message": "y", "weekdays": ["someday"]})
+    assert RuleEngine.from_config({}) is None
+
+
+def test_matching_gaps_are_posted_without_prompt(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = at(14, 30)
+    monkeypatch.setattr(core, "get_utc_now", lambda: now)
+
+    def status(start: datetime.datetime, end: datetime.datetime, value: str) -> aw_core.Event:
+        return aw_core.Event(timestamp=start, duration=end - start, data={"status": value})
+
+    afk = [status(at(11), at(12), "not-afk"), status(at(12), at(12, 45), "afk"),
+           status(at(12, 45), at(13, 35), "not-afk"), status(at(13, 35), at(14), "afk"),
+           status(at(14), now, "not-afk")]
+    mock_client = Mock()
+    mock_client.client_hostname = "laptop"
+    mock_client.get_buckets.return_value = {"aw-watcher-afk_laptop": {}}
+    mock_client.get_events.side_effect = lambda bucket_id, **kwargs: (
+        list(reversed(afk)) if bucket_id == "aw-watcher-afk_laptop" else [])
+    client = AWAfkPromptClient(mock_client, enable_lid_events=False, rules=ENGINE)
+
+    gaps = list(client.get_new_afk_events_to_note(4 * 3600, 60))
+
+    # 13:35 is past the lunch window, that one is asked about
+    assert [gap.timestamp for gap in gaps] == [at(13, 35)]
+    posted = mock_client.insert_event.call_args.args[1]
+    assert (posted.timestamp, posted.data[DATA_KEY], posted.data[RULE_KEY]) == (at(12), "lunch", "lunch")
@@ -0,0 +1,137 @@
+"""Tests for pluggable AFK input sources."""
+
+import datetime
+from unittest.mock import Mock
+
+import aw_core
+import pytest
+
+from aw_watcher_afk_prompt.core import AWAfkPromptClient, AWAfkPromptError, resolve_source_buckets
+from aw_watcher_afk_prompt.sources import (
+    AFK_WATCHER_SOURCE,
+    FETCH_WINDOW,
+    LID_WATCHER_SOURCE,
+    AfkSource,
+    default_sources,
+    source_from_config,
+)
+
+BUCKETS = {
+    "aw-watcher-afk_host": {},
+    "aw-watcher-lid_host": {},
+    "aw-watcher-afk-prompt_host": {},
+    "aw-watcher-screensaver_host": {},
+}
+
+SCREENSAVER = AfkSource(name="screensaver", include=("screensaver",), away_values=frozenset({"locked"}),
+                        fetch=FETCH_WINDOW)
+
+
+def make_event(minutes: int, duration_minutes: int, **data) -> aw_core.Event:
+    start = datetime.datetime(2025, 1, 15, 12, 0, tzinfo=datetime.UTC)
+    return aw_core.Event(
+        timestamp=start + datetime.timedelta(minutes=minutes),
+        duration=datetime.timedelta(minutes=duration_minutes),
+        data=data,
+    )
+
+
+def test_afk_source_excludes_own_and_lid_buckets() -> None:
+    assert AFK_WATCHER_SOURCE.find_buckets(BUCKETS) == ["aw-watcher-afk_host"]
+    assert LID_WATCHER_SOURCE.find_buckets(BUCKETS) == ["aw-watcher-lid_host"]
+
+
+def test_normalize_maps_custom_status() -> None:
+    locked = SCREENSAVER.normalize(make_event(0, 5, status="locked"))
+    unlocked = SCREENSAVER.normalize(make_event(5, 5, status="unlocked"))
+    assert locked.data == {"status": "afk", "source": "screensaver"}
+    assert unlocked.data == {"status": "not-afk", "source": "screensaver"}
+
+
+def test_normalize_does_not_modify_original() -> None:
+    event = make_event(0, 5, status="system-afk")
+    LID_WATCHER_SOURCE.normalize(event)
+    assert event.data == {"status": "system-afk"}
+
+
+def test_source_from_config() -> None:
+    source = source_from_config({"name": "screensaver", "bucket": "screensaver", "away": ["locked"],
+                                 "fetch": "window"})
+    assert source == SCREENSAVER
+
+
+def test_source_from_config_requires_name_and_bucket() -> None:
+    with pytest.raises(ValueError, match="missing"):
+        source_from_config({"name": "screensaver"})
+
+
+def test_source_rejects_unknown_fetch_strategy() -> None:
+    with pytest.raises(ValueError, match="fetch strategy"):
+        AfkSource(name="x", include=("x",), fetch="sometimes")
+
+
+def test_resolve_source_buckets() -> None:
+    resolved = resolve_source_buckets(default_sources(extra=[SCREENSAVER]), BUCKETS)
+    assert resolved == {
+        "aw-watcher-afk_host": AFK_WATCHER_SOURCE,
+        "aw-watcher-lid_host": LID_WATCHER_SOURCE,
+        "aw-watcher-screensaver_host": SCREENSAVER,
+    }
+
+
+def test_resolve_source_buckets_missing_required() -> None:
+    with pytest.raises(AWAfkPromptError, match="Cannot find the afk bucket"):
+        resolve_source_buckets(default_sources(), {"aw-watcher-lid_host": {}})
+
+
+def make_mock_client() -> Mock:
+    mock_client = Mock()
+    mock_client.client_hostname = "host"
+    mock_client.get_buckets.return_value = BUCKETS
+    mock_client.get_events.return_value = []
+    return mock_client
+
+
+def test_client_takes_the_lid_bucket_from_the_sources() -> None:
+    client = AWAfkPromptClient(make_mock_client(), sources=default_sources(extra=[SCREENSAVER]))
+    assert client.afk_bucket_ids == ["aw-watcher-afk_host"]
+    assert client.lid_bucket_id == "aw-watcher-lid_host"
+
+    client = AWAfkPromptClient(make_mock_client(), sources=default_sources(enable_lid_events=False))
+    assert client.lid_bucket_id is None
+
+
+def test_client_requires_an_afk_source() -> None:
+    with pytest.raises(AWAfkPromptError, match="must include the 'afk' source"):
+        AWAfkPromptClient(make_mock_client(), sources=[SCREENSAVER])
+
+
+def test_fetch_merges_all_sources() -> None:
+    """Events from every source end up normalized in one sorted list."""
+    afk_events = [make_event(0, 10, status="not-afk"), make_event(10, 20, status="afk")]
+    screensaver_events = [make_event(12, 15, status="locked")]
+
+    mock_client = Mock()
+    mock_client.client_hostname = "host"
+    mock_client.get_buckets.return_value = BUCKETS
+
+    def get_events(bucket_id, limit=-1, start=None, end=None):
+        if bucket_id == "aw-watcher-afk_host":
+            return afk_events
+        if bucket_id == "aw-watcher-screensaver_host":
+            assert start is not None  # Window sources are fetched by time
+            return screensaver_events
+        return []
+
+    mock_client.get_events.side_effect = get_events
+
+    client = AWAfkPromptClient(mock_client, sources=default_sources(enable_lid_events=False, extra=[SCREENSAVER]))
+    events, _ = client._fetch_events_with_dynamic_limit(
+        window_start=datetime.datetime(2025, 1, 15, 11, 0, tzinfo=datetime.UTC)
+    )
+
+    assert [(e.data["source"], e.data["status"]) for e in events] == [
+        ("afk", "not-afk"),
+        ("afk", "afk"),
+        ("screensaver", "afk"),
+    ]
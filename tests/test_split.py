@@ -8,6 +8,7 @@ from aw_watcher_afk_prompt.split_dialog import (
     ActivityLine,
     SplitActivityData,
     TimeCalculator,
+    Timeline,
 )
 
 
@@ -288,6 +289,31 @@ class TestTimeCalculatorSplitEqual:
             TimeCalculator.split_equal(start, 1800, 2, ["only one"])
 
 
+class TestTimeCalculatorSplitAt:
+    """Test TimeCalculator.split_at() method."""
+
+    def test_split_at_boundaries(self) -> None:
+        """Activities start at the given boundaries and cover the whole period."""
+        start = datetime(2025, 1, 15, 14, 0, 0, tzinfo=UTC)
+        boundary = start + timedelta(minutes=12, seconds=30)
+
+        activities = TimeCalculator.split_at(start, 30 * 60, [boundary])
+
+        assert [a.start_time for a in activities] == [start, boundary]
+        assert (activities[0].duration_minutes, activities[0].duration_seconds) == (12, 30)
+        assert activities[-1].end_time == start + timedelta(minutes=30)
+        assert SplitActivityData(start, 30 * 60, activities).is_valid()
+
+    def test_split_at_drops_too_close_boundaries(self) -> None:
+        """Boundaries leaving less than a minute for an activity are dropped."""
+        start = datetime(2025, 1, 15, 14, 0, 0, tzinfo=UTC)
+        boundaries = [start + timedelta(seconds=20), start + timedelta(minutes=10), start + timedelta(minutes=29.5)]
+
+        activities = TimeCalculator.split_at(start, 30 * 60, boundaries)
+
+        assert [a.start_time for a in activities] == [start, start + timedelta(minutes=10)]
+
+
 class TestTimeCalculatorAdjustDuration:
     """Test TimeCalculator.adjust_duration() method."""
 
@@ -616,3 +642,90 @@ class TestTimeCalculatorIntegration:
             activities=activities
         )
         assert data.is_valid()
+
+
+class TestTimeline:
+    """Test the Timeline model the split dialog edits."""
+
+    start = datetime(2025, 1, 15, 14, 0, 0, 250000, tzinfo=UTC)
+
+    def spans(self, timeline: Timeline) -> list[tuple[timedelta, int]]:
+        """Start offsets and durations in seconds of all activities."""
+        return [(a.start_time - self.start, a.total_duration_seconds) for a in timeline.activities()]
+
+    def test_split_equal_matches_time_calculator(self) -> None:
+        """Test the timeline splits like TimeCalculator.split_equal always did."""
+        timeline = Timeline.split_equal(self.start, 37 * 60 + 35.7, 3, ["a", "b", "c"])
+
+        assert self.spans(timeline) == [(timedelta(0), 751), (timedelta(seconds=751), 751),
+                                        (timedelta(seconds=1502), 753)]
+        assert [a.description for a in timeline.activities()] == ["a", "b", "c"]
+        assert timeline.validate() == []
+
+    def test_set_duration_moves_later_activities(self) -> None:
+        """Test the activities after the changed one move and the last one takes up the difference."""
+        timeline = Timeline.split_equal(self.start, 40 * 60, 4)
+
+        assert timeline.set_duration(1, 15) == 1
+        assert self.spans(timeline) == [(timedelta(0), 600), (timedelta(minutes=10), 900),
+                                        (timedelta(minutes=25), 600), (timedelta(minutes=35), 300)]
+
+        # Changing the last activity takes the difference from the one before it
+        assert timeline.set_duration(3, 8) == 2
+        assert self.spans(timeline)[2:] == [(timedelta(minutes=25), 420), (timedelta(minutes=32), 480)]
+
+        with pytest.raises(ValueError, match="previous activity less than 1 minute"):
+            timeline.set_duration(3, 15)
+        with pytest.raises(ValueError, match="last activity less than 1 minute"):
+            timeline.set_duration(0, 18)
+
+    def test_set_start_time(self) -> None:
+        """Test moving a start changes the previous activity and moves the ones after it."""
+        timeline = Timeline.split_equal(self.start, 30 * 60, 3)
+
+        assert timeline.set_start_time(1, self.start + timedelta(minutes=15)) == 0
+        assert self.spans(timeline) == [(timedelta(0), 900), (timedelta(minutes=15), 600),
+                                        (timedelta(minutes=25), 300)]
+
+        with pytest.raises(ValueError, match="must be > 0"):
+            timeline.set_start_time(0, self.start)
+        with pytest.raises(ValueError, match="less than 1 minute"):
+            timeline.set_start_time(2, self.start + timedelta(minutes=15, seconds=30))
+
+    def test_add_and_remove(self) -> None:
+        """Test adding borrows a minute from the last activity and removing gives the time back."""
+        timeline = Timeline.split_at(self.start, 30 * 60, [self.start + timedelta(minutes=10)], ["a", "b"])
+
+        assert timeline.add() == 1
+        assert self.spans(timeline)[1:] == [(timedelta(minutes=10), 1140), (timedelta(minutes=29), 60)]
+        assert timeline.remove(0) == 0
+        assert self.spans(timeline) == [(timedelta(0), 1740), (timedelta(minutes=29), 60)]
+        assert timeline.descriptions == ["b", ""]
+        assert timeline.add(equal_distribution=True) == 0
+        assert [seconds for _, seconds in self.spans(timeline)] == [600, 600, 600]
+
+        assert timeline.remove(1) == 0
+        assert timeline.remove(1) == 0
+        assert timeline.remove(0) == 0
+        assert len(timeline) == 0
+        assert timeline.validate() == ["No activities defined"]
+
+    def test_validate_counts_short_activities(self) -> None:
+        """Test short activities are tracked through the edits."""
+        timeline = Timeline.split_equal(self.start, 100, 2)
+
+        assert timeline.validate() == ["2 activities are shorter than 1 minute"]
+        timeline.add(equal_distribution=True)
+        assert timeline.validate() == ["3 activities are shorter than 1 minute"]
+        timeline.remove(1)
+        timeline.remove(1)
+        assert timeline.validate() == []
+
+    def test_from_activities(self) -> None:
+        """Test a timeline takes over the boundaries and descriptions of activity lines."""
+        activities = TimeCalculator.split_at(self.start, 30 * 60, [self.start + timedelta(minutes=12, seconds=30)],
+                                             ["lunch", "call"])
+        timeline = Timeline.from_activities(self.start, 30 * 60, activities)
+
+        assert timeline.activities() == activities
+        assert SplitActivityData(self.start, 30 * 60, timeline.activities()).is_valid()
@@ -1,9 +1,10 @@
 """Integration tests for posting split events to ActivityWatch."""
 
 from datetime import UTC, datetime, timedelta
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import aw_core
+import pytest
 
 from aw_watcher_afk_prompt.core import AWAfkPromptClient
 from aw_watcher_afk_prompt.split_dialog import ActivityLine
@@ -263,3 +264,50 @@ def test_post_split_events_with_seconds() -> None:
 
     second_event = mock_client.insert_event.call_args_list[1][0][1]
     assert second_event.duration == timedelta(minutes=2, seconds=52)
+
+
+def make_backfill_client(tmp_path) -> tuple[AWAfkPromptClient, Mock]:
+    mock_client = Mock()
+    mock_client.client_hostname = "test_host"
+    mock_client.get_buckets.return_value = {
+        "aw-watcher-afk_test_host": {"type": "afkstatus"},
+        "aw-watcher-afk-prompt_test_host": {"type": "afktask"},
+    }
+    mock_client.get_events.return_value = []
+    with patch("appdirs.user_config_dir", return_value=str(tmp_path)):
+        client = AWAfkPromptClient(mock_client, enable_lid_events=False)
+    return client, mock_client
+
+
+def test_post_answers_uses_one_batched_insert(tmp_path) -> None:
+    """Answers from the backfill review, plain and split, go out in a single request."""
+    client, mock_client = make_backfill_client(tmp_path)
+    first = aw_core.Event(timestamp=datetime.now(UTC) - timedelta(hours=5), duration=timedelta(minutes=30))
+    second_start = datetime.now(UTC) - timedelta(hours=2)
+    second = aw_core.Event(timestamp=second_start, duration=timedelta(minutes=20))
+    activities = [
+        ActivityLine("lunch", second_start, 10, 0),
+        ActivityLine("walk", second_start + timedelta(minutes=10), 10, 0),
+    ]
+
+    client.post_answers([(first, "meeting"), (second, activities)])
+
+    mock_client.insert_events.assert_called_once()
+    mock_client.insert_event.assert_not_called()
+    bucket_id, events = mock_client.insert_events.call_args[0]
+    assert bucket_id == "aw-watcher-afk-prompt_test_host"
+    assert [e.data["message"] for e in events] == ["meeting", "lunch", "walk"]
+    assert client.state.has_event(first)
+    assert client.state.has_event(second)
+    assert [e.data.get("message") for e in client.state.recent_events if e.data] == ["meeting", "lunch", "walk"]
+
+
+def test_post_answers_marks_nothing_on_failure(tmp_path) -> None:
+    client, mock_client = make_backfill_client(tmp_path)
+    mock_client.insert_events.side_effect = Exception("Network error")
+    event = aw_core.Event(timestamp=datetime(2025, 1, 15, 9, 0, tzinfo=UTC), duration=timedelta(minutes=30))
+
+    with pytest.raises(Exception, match="Network error"):
+        client.post_answers([(event, "meeting")])
+
+    assert not client.state.has_event(event)
@@ -0,0 +1,80 @@
+"""Tests for the ranked message suggestions."""
+
+import datetime
+
+import aw_core
+
+from aw_watcher_afk_prompt.core import AWAfkPromptState
+from aw_watcher_afk_prompt.suggestions import SuggestionIndex, fuzzy_match
+
+NOW = datetime.datetime(2025, 1, 15, 12, 0, tzinfo=datetime.UTC)
+
+
+def days_ago(days: float) -> datetime.datetime:
+    return NOW - datetime.timedelta(days=days)
+
+
+def make_index() -> SuggestionIndex:
+    return SuggestionIndex.from_messages([
+        ("lunch", days_ago(30)),
+        ("lunch", days_ago(29)),
+        ("lunch", days_ago(28)),
+        ("Team meeting", days_ago(1)),
+        ("team  meeting ", days_ago(0.5)),
+        ("phone call", days_ago(0.1)),
+        ("", days_ago(0)),
+    ])
+
+
+def test_deduplicates_ignoring_case_and_whitespace() -> None:
+    index = make_index()
+
+    assert len(index) == 3
+    assert "TEAM MEETING" in index
+    assert index.history(now=NOW)[-1] == "team meeting"  # the most recent spelling, best ranked last
+
+
+def test_ranks_by_frequency_and_recency() -> None:
+    index = make_index()
+
+    assert index.history(now=NOW) == ["lunch", "phone call", "team meeting"]
+    # Used much more often, lunch wins once everything is equally old
+    index.add("lunch", NOW)
+    assert index.suggest("", now=NOW)[0] == "lunch"
+
+
+def test_complete_prefers_best_ranked_prefix() -> None:
+    index = make_index()
+    index.add("team lunch", days_ago(20))
+
+    assert index.complete("te", now=NOW) == "team meeting"
+    assert index.complete("Team l", now=NOW) == "team lunch"
+    assert index.complete("team ", now=NOW) == "team meeting"
+    assert index.complete("team meeting", now=NOW) is None
+    assert index.complete("", now=NOW) is None
+
+
+def test_suggest_orders_prefix_word_and_fuzzy_matches() -> None:
+    index = make_index()
+    index.add("meeting notes", days_ago(40))
+
+    assert index.suggest("meet", now=NOW) == ["meeting notes", "team meeting"]
+    assert index.suggest("pc", now=NOW) == ["phone call"]
+    assert index.suggest("xyz", now=NOW) == []
+
+
+def test_fuzzy_match() -> None:
+    assert fuzzy_match("mtg", "meeting") == 4
+    assert fuzzy_match("mtg", "mtg") == 0
+    assert fuzzy_match("gtm", "meeting") is None
+
+
+def test_state_updates_suggestions_on_post() -> None:
+    posted = aw_core.Event(timestamp=days_ago(1), duration=datetime.timedelta(minutes=30), data={"message": "lunch"})
+    state = AWAfkPromptState([posted])
+    assert state.suggestions.history() == ["lunch"]
+
+    state.record_posted(aw_core.Event(timestamp=days_ago(0.5), duration=datetime.timedelta(minutes=10),
+                                      data={"message": "coffee"}))
+
+    assert state.suggestions.history()[-1] == "coffee"
@@ -1,8 +1,12 @@
 """Tests for utils module."""
 
+import json
 from datetime import UTC, datetime, timedelta, timezone
+from unittest.mock import patch
 
-from aw_watcher_afk_prompt.utils import LOCAL_TIMEZONE, format_duration, format_time_local
+import pytest
+
+from aw_watcher_afk_prompt.utils import LOCAL_TIMEZONE, format_duration, format_time_local, write_json_atomic
 
 
 class TestFormatTimeLocal:
@@ -95,3 +99,22 @@ class TestFormatDuration:
         """Test the specific case from the bug report (1643 minutes)."""
         result = format_duration(timedelta(minutes=1643))
         assert result == "1 day 3 hours"
+
+
+class TestWriteJsonAtomic:
+    """Tests for the write_json_atomic function."""
+
+    def test_writes_json(self, tmp_path) -> None:
+        path = tmp_path / "data.json"
+        write_json_atomic(path, {"a": 1})
+        assert json.loads(path.read_text()) == {"a": 1}
+
+    def test_failed_write_keeps_old_file(self, tmp_path) -> None:
+        path = tmp_path / "data.json"
+        path.write_text('{"old": true}')
+
+        with patch("json.dump", side_effect=OSError("disk full")), pytest.raises(OSError):
+            write_json_atomic(path, {"new": True})
+
+        assert json.loads(path.read_text()) == {"old": True}
+        assert list(tmp_path.iterdir()) == [path]  # no temporary file left behind
@@ -128,3 +128,235 @@ class TestEnhancedEntry:
 
         var.set("updated")
         assert entry.get() == "updated"
+
+
+class TestVirtualList:
+    """Tests for the VirtualList widget."""
+
+    @staticmethod
+    def make_list(root, model, visible_rows=5):
+        from aw_watcher_afk_prompt.widgets import EnhancedEntry, VirtualList
+
+        def bind_row(entry, index):
+            entry.set_text(model[index])
+
+        def unbind_row(entry, index):
+            model[index] = entry.get()
+
+        return VirtualList(root, EnhancedEntry, bind_row, unbind_row, row_count=len(model), visible_rows=visible_rows)
+
+    def test_only_visible_rows_are_widgets(self, root):
+        model = [f"row {i}" for i in range(10000)]
+        rows = self.make_list(root, model)
+        assert len(rows.rows) == 5
+        assert [widget.get() for widget, _ in rows.rows] == model[:5]
+
+    def test_scrolling_recycles_rows_and_saves_edits(self, root):
+        model = [f"row {i}" for i in range(100)]
+        rows = self.make_list(root, model)
+        rows.widget_for(0).set_text("edited")
+
+        rows.scroll_to(50)
+        assert [index for _, index in rows.rows] == [50, 51, 52, 53, 54]
+        assert rows.widget_for(0) is None
+        assert model[0] == "edited"
+
+        rows.scroll_to(0)
+        assert rows.widget_for(0).get() == "edited"
+
+    def test_see_scrolls_minimally(self, root):
+        rows = self.make_list(root, [str(i) for i in range(100)])
+        widget = rows.see(7)
+        assert rows.first == 3
+        assert rows.index_of(widget) == 7
+
+    def test_short_lists_hide_unused_rows(self, root):
+        model = ["a", "b"]
+        rows = self.make_list(root, model)
+        assert [index for _, index in rows.rows] == [0, 1, None, None, None]
+        model.append("c")
+        rows.refresh(len(model))
+        assert [index for _, index in rows.rows] == [0, 1, 2, None, None]
+
+
+class TestActivityLineWidget:
+    """Tests for the lines of the split dialog."""
+
+    @staticmethod
+    def make_line(root, changes, is_first=False):
+        from datetime import UTC, datetime
+
+        from aw_watcher_afk_prompt.split_dialog import ActivityLine, ActivityLineWidget
+
+        activity = ActivityLine("lunch", datetime(2025, 1, 15, 12, 0, tzinfo=UTC), 30)
+        line = ActivityLineWidget(root, on_change_callback=lambda *args, **kwargs: changes.append((args, kwargs)),
+                                  on_remove_callback=lambda index: None)
+        line.show(0 if is_first else 1, activity)
+        return line, activity
+
+    def test_update_only_touches_changed_values(self, root):
+        from dataclasses import replace
+
+        changes = []
+        line, activity = self.make_line(root, changes)
+
+        assert not line.update_from_activity(activity, is_first=False)
+        assert line.update_from_activity(replace(activity, duration_minutes=45), is_first=False)
+        assert line.get_duration_minutes() == 45
+        assert line.get_description() == "lunch"
+        assert changes == []  # updates from the dialog do not call back
+
+    def test_edits_call_back_with_current_index(self, root):
+        changes = []
+        line, activity = self.make_line(root, changes)
+        assert not line.show(3, activity)
+
+        line.desc_var.set("coffee")
+        line.flush()
+        assert changes == [((3,), {"field": "description", "value": "coffee"})]
+
+    def test_keystrokes_are_debounced(self, root):
+        changes = []
+        line, _ = self.make_line(root, changes)
+
+        for text in ("c", "co", "cof"):
+            line.desc_var.set(text)
+        line.duration_var.set(1)
+        line.duration_var.set(15)
+        assert changes == []
+
+        line.flush()
+        assert changes == [((1,), {"field": "description", "value": "cof"}),
+                           ((1,), {"field": "duration", "value": 15})]
+        line.flush()
+        assert len(changes) == 2
+
+    def test_first_line_start_is_read_only(self, root):
+        changes = []
+        line, activity = self.make_line(root, changes)
+        line.show(0, activity)
+
+        assert str(line.start_entry.cget("state")) == "readonly"
+        line.start_var.set("12:10")
+        line.flush()
+        assert changes == []
+
+
+class TestSplitActivityDialog:
+    """Tests for the split dialog."""
+
+    def test_cancel_drops_pending_edits(self, root, monkeypatch):
+        from datetime import UTC, datetime
+
+        from aw_watcher_afk_prompt.split_dialog import EDIT_DEBOUNCE_MS, SplitActivityDialog
+
+        changes = []
+        monkeypatch.setattr(SplitActivityDialog, "on_activity_changed", lambda self, *args, **kwargs: changes.append(args))
+        # Return from the constructor instead of waiting for the dialog to close
+        monkeypatch.setattr(SplitActivityDialog, "wait_window", lambda self, window=None: None)
+        dialog = SplitActivityDialog(root, "Split", "", datetime(2025, 1, 15, 12, 0, tzinfo=UTC), 1800, [])
+
+        dialog.rows.widget_for(1).duration_var.set(20)
+        dialog.cancel()
+        root.after(EDIT_DEBOUNCE_MS + 100, root.quit)
+        root.mainloop()
+
+        assert changes == []
+
+    def test_destroy_before_the_body_is_built(self, root, monkeypatch):
+        from datetime import UTC, datetime
+
+        from aw_watcher_afk_prompt.split_dialog import SplitActivityDialog
+
+        monkeypatch.setattr(SplitActivityDialog, "body", lambda self, master: None)
+        monkeypatch.setattr(SplitActivityDialog, "wait_window", lambda self, window=None: None)
+        dialog = SplitActivityDialog(root, "Split", "", datetime(2025, 1, 15, 12, 0, tzinfo=UTC), 1800, [])
+
+        dialog.destroy()
+        assert not hasattr(dialog, "rows")
+
+    def test_long_splits_scroll_and_keep_edits(self, root, monkeypatch):
+        from datetime import UTC, datetime
+
+        from aw_watcher_afk_prompt.split_dialog import VISIBLE_LINES, SplitActivityDialog, Timeline
+
+        start = datetime(2025, 1, 15, 12, 0, tzinfo=UTC)
+        activities = Timeline.split_equal(start, 100 * 300, 100).activities()
+        monkeypatch.setattr(SplitActivityDialog, "wait_window", lambda self, window=None: None)
+        dialog = SplitActivityDialog(root, "Split", "", start, 100 * 300, [], initial_activities=activities)
+
+        assert len(dialog.rows.rows) == VISIBLE_LINES
+        dialog.rows.widget_for(1).desc_var.set("coffee")
+        dialog.rows.scroll_to(90)
+        dialog.rows.widget_for(99).duration_var.set(3)
+        dialog.flush_edits()
+        dialog.destroy()
+
+        assert dialog.timeline.descriptions[1] == "coffee"
+        assert [a.duration_minutes for a in dialog.timeline.activities(98)] == [7, 3]
+
+
+class TestBackfillReviewDialog:
+    """Tests for the backfill review dialog."""
+
+    def test_bulk_actions_reach_rows_scrolled_out_of_view(self, root, monkeypatch):
+        from datetime import UTC, datetime, timedelta
+
+        import aw_core
+
+        from aw_watcher_afk_prompt.dialog import BackfillReviewDialog
+
+        start = datetime(2025, 1, 15, 8, 0, tzinfo=UTC)
+        events = [aw_core.Event(timestamp=start + timedelta(minutes=30 * i), duration=timedelta(minutes=10))
+                  for i in range(100)]
+        # Return from the constructor instead of waiting for the dialog to close
+        monkeypatch.setattr(BackfillReviewDialog, "wait_window", lambda self, window=None: None)
+        dialog = BackfillReviewDialog("Backfill", events, [], str)
+
+        assert dialog.rows.visible_rows == 15
+        dialog.rows.widget_for(0).selected.set(False)
+        dialog.bulk_entry.set_text("meeting")
+        dialog.apply_to_selected()
+        dialog.rows.scroll_to(90)
+        dialog.apply()
+        dialog.destroy()
+
+        assert [event for event, _ in dialog.result] == events[1:]
+        assert {answer for _, answer in dialog.result} == {"meeting"}
+
+
+class TestAWAfkPromptDialog:
+    """Tests for the prompt dialog."""
+
+    @staticmethod
+    def make_dialog(monkeypatch):
+        from datetime import UTC, datetime
+
+        from aw_watcher_afk_prompt.dialog import AWAfkPromptDialog
+        from aw_watcher_afk_prompt.suggestions import SuggestionIndex
+
+        suggestions = SuggestionIndex.from_messages([("meeting with bob", datetime(2025, 1, 15, 12, 0, tzinfo=UTC))])
+        # Return from the constructor instead of waiting for the dialog to close
+        monkeypatch.setattr(AWAfkPromptDialog, "wait_window", lambda self, window=None: None)
+        return AWAfkPromptDialog("AFK", "What were you doing?", [], suggestions=suggestions)
+
+    @staticmethod
+    def type_text(dialog, text):
+        dialog.entry.insert("end", text)
+        dialog.complete_inline()
+
+    def test_enter_drops_a_pending_completion(self, root, monkeypatch):
+        dialog = self.make_dialog(monkeypatch)
+        self.type_text(dialog, "meeting")
+        assert dialog.entry.get() == "meeting with bob"
+
+        dialog.ok()
+        assert dialog.result == "meeting"
+
+    def test_tab_accepts_the_completion(self, root, monkeypatch):
+        dialog = self.make_dialog(monkeypatch)
+        self.type_text(dialog, "meeting")
+
+        dialog.accept_completion()
+        dialog.ok()
+        assert dialog.result == "meeting with bob"